@@ -0,0 +1,82 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Measure latency of the first requests served by a freshly started application.
+
+Requests are sent concurrently to the health endpoint, which runs one query, with and without the application startup
+event that opens database connections ahead of time. Requires a database configured with RDS_* environment variables.
+
+Usage: python -m benchmarks.app_cold_start
+"""
+
+import asyncio
+import time
+
+from httpx import AsyncClient
+
+from benchmarks.utils import Timings
+from benchmarks.utils import report
+from notification.app import create_app
+from notification.app import shutdown_event
+from notification.app import startup_event
+from notification.config import get_settings
+
+REQUESTS = 100
+
+
+async def send_first_requests(warm_up: bool) -> tuple[Timings, float]:
+    """Return durations of the first requests and the time spent in the startup event."""
+
+    settings = get_settings()
+    app = create_app()
+
+    start = time.perf_counter()
+    if warm_up:
+        await startup_event(settings)
+    startup_duration = time.perf_counter() - start
+
+    timings = Timings()
+
+    async def send_request(client: AsyncClient) -> None:
+        start = time.perf_counter()
+        response = await client.get('/v1/health/')
+        timings.durations.append(time.perf_counter() - start)
+        assert response.status_code == 204
+
+    async with AsyncClient(app=app, base_url='http://notification') as client:
+        await asyncio.gather(*[send_request(client) for _ in range(REQUESTS)])
+
+    await shutdown_event(settings)
+
+    return timings, startup_duration
+
+
+async def main() -> None:
+    settings = get_settings()
+    rows = []
+
+    for name, warm_up in (('lazy engine', False), ('warmed up pool', True)):
+        timings, startup_duration = await send_first_requests(warm_up)
+        rows.append(
+            [
+                name,
+                startup_duration * 1000,
+                timings.percentile(50) * 1000,
+                timings.percentile(95) * 1000,
+                max(timings.durations) * 1000,
+            ]
+        )
+
+    report(
+        f'First {REQUESTS} concurrent requests (ms), pool size {settings.RDS_POOL_SIZE}, '
+        f'warm-up {settings.RDS_POOL_WARM_UP_CONNECTIONS} connections',
+        ['application', 'startup', 'p50', 'p95', 'max'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
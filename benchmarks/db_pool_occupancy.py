@@ -0,0 +1,118 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Measure connection pool occupancy under a burst of mixed valid and invalid requests.
+
+Valid requests list user notifications and invalid ones are rejected by parameters validation. The burst is sent
+with connections released right after the last statement and with release disabled, when connections are returned
+only after the response is sent. Requires a migrated database configured with RDS_* environment variables.
+
+Usage: python -m benchmarks.db_pool_occupancy
+"""
+
+import asyncio
+import random
+import time
+from unittest import mock
+
+from httpx import AsyncClient
+
+from benchmarks.utils import Timings
+from benchmarks.utils import get_db_session
+from benchmarks.utils import report
+from benchmarks.utils import seed_notifications
+from benchmarks.utils import truncate_notifications
+from notification.app import create_app
+from notification.app import shutdown_event
+from notification.app import startup_event
+from notification.components.crud import CRUD
+from notification.config import get_settings
+from notification.dependencies import get_db_engine
+
+REQUESTS = 2000
+CONCURRENCY = 100
+INVALID_SHARE = 0.5
+POOL_SIZE = 10
+
+
+async def sample_occupancy(samples: list[int], done: asyncio.Event) -> None:
+    pool = get_db_engine.instance.sync_engine.pool
+    while not done.is_set():
+        samples.append(pool.checkedout())
+        await asyncio.sleep(0.001)
+
+
+async def send_burst() -> tuple[Timings, list[int]]:
+    """Return durations of valid requests and sampled number of checked out connections."""
+
+    settings = get_settings().copy(update={'RDS_POOL_SIZE': POOL_SIZE, 'RDS_POOL_MAX_OVERFLOW': 0})
+    app = create_app()
+    await startup_event(settings)
+
+    timings = Timings()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def send_request(client: AsyncClient, index: int) -> None:
+        params = {'recipient_username': f'user-{index % 100}', 'project_code_any': f'project-{index % 100}'}
+        valid = random.random() >= INVALID_SHARE
+        if not valid:
+            params['page_size'] = -1
+
+        async with semaphore:
+            start = time.perf_counter()
+            await client.get('/v1/all/notifications/user', params=params)
+            if valid:
+                timings.durations.append(time.perf_counter() - start)
+
+    samples = []
+    done = asyncio.Event()
+    sampler = asyncio.create_task(sample_occupancy(samples, done))
+
+    async with AsyncClient(app=app, base_url='http://notification') as client:
+        await asyncio.gather(*[send_request(client, index) for index in range(REQUESTS)])
+
+    done.set()
+    await sampler
+    await shutdown_event(settings)
+
+    return timings, samples
+
+
+async def main() -> None:
+    settings = get_settings()
+    rows = []
+
+    async with get_db_session(settings) as session:
+        await truncate_notifications(session)
+        await seed_notifications(session, 100_000, users=100, projects=100)
+
+    for name, release in (('after response', False), ('after last statement', True)):
+        with mock.patch.object(CRUD, 'release', CRUD.release if release else mock.AsyncMock()):
+            timings, samples = await send_burst()
+
+        rows.append(
+            [
+                name,
+                sum(samples) / len(samples),
+                max(samples),
+                timings.percentile(50) * 1000,
+                timings.percentile(95) * 1000,
+            ]
+        )
+
+    async with get_db_session(settings) as session:
+        await truncate_notifications(session)
+
+    report(
+        f'Pool occupancy, {REQUESTS} requests ({INVALID_SHARE:.0%} invalid), {CONCURRENCY} concurrent, '
+        f'pool size {POOL_SIZE}',
+        ['connections returned', 'mean checked out', 'max checked out', 'p50 (ms)', 'p95 (ms)'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
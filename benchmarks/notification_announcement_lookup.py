@@ -0,0 +1,85 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Compare maintenance notification lookup by announcement id stored in data and in the indexed column.
+
+Lookup by data is how notifications were found before announcement_id column was introduced, so seeded rows keep
+announcement id in both places. Requires a migrated database configured with RDS_* environment variables.
+
+Usage: python -m benchmarks.notification_announcement_lookup
+"""
+
+import asyncio
+import random
+from functools import partial
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from benchmarks.utils import get_db_session
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import seed_notifications
+from benchmarks.utils import truncate_notifications
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.models import Notification
+from notification.components.notification.models import NotificationType
+from notification.config import get_settings
+
+ROWS = 5_000_000
+MAINTENANCE_ROWS = 1000
+REPEAT = 20
+
+
+async def retrieve_by_data(crud: NotificationCRUD, announcement_ids: list[UUID]) -> None:
+    announcement_id = random.choice(announcement_ids)
+    statement = select(Notification).where(Notification.data.contains({'announcement_id': str(announcement_id)}))
+    (await crud.scalars(statement)).one()
+    await crud.commit()
+
+
+async def retrieve_by_column(crud: NotificationCRUD, announcement_ids: list[UUID]) -> None:
+    await crud.retrieve_by_announcement_id(random.choice(announcement_ids))
+    await crud.commit()
+
+
+async def main() -> None:
+    settings = get_settings()
+
+    async with get_db_session(settings) as session:
+        await truncate_notifications(session)
+        await seed_notifications(session, ROWS, users=100_000, projects=1000)
+        await seed_notifications(session, MAINTENANCE_ROWS, users=1, projects=1, type_=NotificationType.MAINTENANCE)
+        await session.execute(
+            text(
+                '''
+                UPDATE notifications SET data = data || jsonb_build_object('announcement_id', announcement_id)
+                WHERE announcement_id IS NOT NULL
+                '''
+            )
+        )
+        await session.commit()
+
+        crud = NotificationCRUD(session)
+        announcement_ids = (
+            await session.scalars(select(Notification.announcement_id).where(Notification.announcement_id.is_not(None)))
+        ).all()
+
+        by_data = await measure(partial(retrieve_by_data, crud, announcement_ids), REPEAT)
+        by_column = await measure(partial(retrieve_by_column, crud, announcement_ids), REPEAT)
+
+        await truncate_notifications(session)
+
+    rows = [
+        ['data', by_data.percentile(50) * 1000, by_data.percentile(95) * 1000],
+        ['column', by_column.percentile(50) * 1000, by_column.percentile(95) * 1000],
+    ]
+    report(f'Lookup latency (ms), {ROWS + MAINTENANCE_ROWS} rows', ['lookup by', 'p50', 'p95'], rows)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Compare throughput of per-row and bulk notification creation.
+
+Each request is simulated the same way POST /v1/all/notifications/ handles it: all entries of the batch are written in
+one transaction. Requires a migrated database configured with RDS_* environment variables.
+
+Usage: python -m benchmarks.notification_bulk_create
+"""
+
+import asyncio
+from functools import partial
+
+from benchmarks.utils import get_db_session
+from benchmarks.utils import get_notification_factory
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import truncate_notifications
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.schemas import NotificationCreateSchema
+from notification.config import get_settings
+
+REPEAT_BY_BATCH_SIZE = {1: 1000, 100: 50, 10_000: 3}
+
+
+async def create_per_row(crud: NotificationCRUD, entries: list[NotificationCreateSchema]) -> None:
+    for entry in entries:
+        await crud.create(entry)
+    await crud.commit()
+
+
+async def create_in_bulk(crud: NotificationCRUD, entries: list[NotificationCreateSchema], chunk_size: int) -> None:
+    await crud.bulk_create(entries, chunk_size=chunk_size)
+    await crud.commit()
+
+
+async def main() -> None:
+    settings = get_settings()
+    factory = get_notification_factory()
+    rows = []
+
+    async with get_db_session(settings) as session:
+        crud = NotificationCRUD(session)
+
+        for batch_size, repeat in REPEAT_BY_BATCH_SIZE.items():
+            entries = [factory.generate_pipeline() for _ in range(batch_size)]
+
+            per_row = await measure(partial(create_per_row, crud, entries), repeat)
+            bulk = await measure(
+                partial(create_in_bulk, crud, entries, settings.NOTIFICATIONS_BULK_CREATE_CHUNK_SIZE), repeat
+            )
+            rows.append([batch_size, per_row.per_second, bulk.per_second, bulk.per_second / per_row.per_second])
+
+            await truncate_notifications(session)
+
+    report('Requests per second', ['batch size', 'per-row', 'bulk', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Compare throughput of per-row, multi-row insert and COPY notification creation for large batches.
+
+Usage: python -m benchmarks.notification_copy_create
+"""
+
+import asyncio
+from functools import partial
+
+from benchmarks.notification_bulk_create import create_in_bulk
+from benchmarks.notification_bulk_create import create_per_row
+from benchmarks.utils import get_db_session
+from benchmarks.utils import get_notification_factory
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import truncate_notifications
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.schemas import NotificationCreateSchema
+from notification.config import get_settings
+
+BATCH_SIZES = (10_000, 50_000)
+REPEAT = 3
+
+
+async def create_with_copy(crud: NotificationCRUD, entries: list[NotificationCreateSchema]) -> None:
+    await crud.copy_create(entries)
+    await crud.commit()
+
+
+async def main() -> None:
+    settings = get_settings()
+    factory = get_notification_factory()
+    rows = []
+
+    async with get_db_session(settings) as session:
+        crud = NotificationCRUD(session)
+
+        for batch_size in BATCH_SIZES:
+            entries = [factory.generate_pipeline() for _ in range(batch_size)]
+            functions = [
+                partial(create_per_row, crud, entries),
+                partial(create_in_bulk, crud, entries, settings.NOTIFICATIONS_BULK_CREATE_CHUNK_SIZE),
+                partial(create_with_copy, crud, entries),
+            ]
+
+            row = [batch_size]
+            for function in functions:
+                timings = await measure(function, REPEAT)
+                row.append(batch_size * timings.per_second)
+                await truncate_notifications(session)
+            rows.append(row)
+
+    report('Rows per second', ['batch size', 'per-row', 'bulk', 'copy'], rows)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Compare latency of building a notification list response through models and schemas and through the database.
+
+Model path paginates models, converts them into the list response schema and serialises it the same way FastAPI does
+for the response model. Database path paginates JSON documents built by the database and joins them into the response.
+Requires a migrated database configured with RDS_* environment variables.
+
+Usage: python -m benchmarks.notification_list_serialisation
+"""
+
+import asyncio
+from functools import partial
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_cloned_field
+from fastapi.utils import create_response_field
+
+from benchmarks.utils import get_db_session
+from benchmarks.utils import get_notification_factory
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import truncate_notifications
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import NotificationFiltering
+from notification.components.notification.models import Target
+from notification.components.notification.models import TargetType
+from notification.components.notification.schemas import NotificationListResponseSchema
+from notification.components.pagination import Pagination
+from notification.components.sorting import Sorting
+from notification.components.sorting import SortingOrder
+from notification.config import get_settings
+
+USERNAME = 'user-1'
+PAGE_SIZE = 100
+TARGETS = 500
+REPEAT = 200
+
+PAGINATION = Pagination(page_size=PAGE_SIZE)
+SORTING = Sorting(field='created_at', order=SortingOrder.DESC)
+FILTERING = NotificationFiltering(recipient_username=USERNAME)
+RESPONSE_FIELD = create_cloned_field(create_response_field(name='Response', type_=NotificationListResponseSchema))
+
+
+async def build_with_models(crud: NotificationCRUD) -> bytes:
+    page = await crud.paginate(PAGINATION.copy(), SORTING, FILTERING)
+    await crud.commit()
+
+    response = NotificationListResponseSchema.from_page(page)
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=response)
+
+    return JSONResponse(content).body
+
+
+async def build_with_database(crud: NotificationCRUD) -> bytes:
+    page = await crud.paginate_json(PAGINATION.copy(), SORTING, FILTERING)
+    await crud.commit()
+
+    return NotificationListResponseSchema.json_from_page(page).encode()
+
+
+async def main() -> None:
+    settings = get_settings()
+    factory = get_notification_factory()
+    rows = []
+
+    async with get_db_session(settings) as session:
+        await truncate_notifications(session)
+
+        crud = NotificationCRUD(session)
+        entries = [
+            factory.generate_pipeline(
+                recipient_username=USERNAME,
+                targets=[
+                    Target(id=uuid4(), type=TargetType.FILE, name=f'file-{index}.txt') for index in range(TARGETS)
+                ],
+            )
+            for _ in range(PAGE_SIZE)
+        ]
+        await crud.bulk_create(entries, chunk_size=PAGE_SIZE)
+        await crud.commit()
+
+        size = len(await build_with_database(crud))
+        for name, build in (('models', build_with_models), ('database', build_with_database)):
+            timings = await measure(partial(build, crud), REPEAT)
+            rows.append([name, timings.percentile(50) * 1000, timings.percentile(99) * 1000])
+
+        await truncate_notifications(session)
+
+    report(
+        f'Response latency (ms), {PAGE_SIZE} pipeline notifications with {TARGETS} targets, {size} bytes',
+        ['path', 'p50', 'p99'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
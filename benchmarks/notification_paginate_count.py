@@ -0,0 +1,69 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Compare latency of separate and window count strategies for exact totals across filter selectivities.
+
+The strategy with lower latency for a filter shape is the one that NotificationFiltering.get_count_strategy() should
+return for it. Requires a migrated database configured with RDS_* environment variables.
+
+Usage: python -m benchmarks.notification_paginate_count
+"""
+
+import asyncio
+from functools import partial
+
+from benchmarks.utils import get_db_session
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import seed_notifications
+from benchmarks.utils import truncate_notifications
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import NotificationFiltering
+from notification.components.pagination import CountStrategy
+from notification.components.pagination import Pagination
+from notification.config import get_settings
+
+ROWS = 1_000_000
+USERS = 1000
+PROJECTS = 100
+REPEAT = 20
+
+FILTERINGS = {
+    'no filter (100%)': NotificationFiltering(),
+    'ten projects (10%)': NotificationFiltering(project_code_any={f'project-{i}' for i in range(10)}),
+    'one project (1%)': NotificationFiltering(project_code_any={'project-0'}),
+    'one recipient (0.1%)': NotificationFiltering(recipient_username='user-0'),
+}
+
+
+async def paginate(crud: NotificationCRUD, filtering: NotificationFiltering, count_strategy: CountStrategy) -> None:
+    await crud.paginate(Pagination(page_size=20, count_strategy=count_strategy), filtering=filtering)
+    await crud.commit()
+
+
+async def main() -> None:
+    settings = get_settings()
+    rows = []
+
+    async with get_db_session(settings) as session:
+        await truncate_notifications(session)
+        await seed_notifications(session, ROWS, users=USERS, projects=PROJECTS)
+        crud = NotificationCRUD(session)
+
+        for name, filtering in FILTERINGS.items():
+            separate = await measure(partial(paginate, crud, filtering, CountStrategy.SEPARATE), REPEAT)
+            window = await measure(partial(paginate, crud, filtering, CountStrategy.WINDOW), REPEAT)
+            separate_p50, window_p50 = separate.percentile(50) * 1000, window.percentile(50) * 1000
+            cheaper = CountStrategy.SEPARATE if separate_p50 <= window_p50 else CountStrategy.WINDOW
+            rows.append([name, separate_p50, window_p50, cheaper.value, filtering.get_count_strategy().value])
+
+        await truncate_notifications(session)
+
+    report(f'Page latency p50 (ms), {ROWS} rows', ['filter', 'separate', 'window', 'cheaper', 'configured'], rows)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Compare serialisation of notification create schemas with JSON round trip and the direct path.
+
+Does not require a database.
+
+Usage: python -m benchmarks.notification_schema_dict
+"""
+
+import json
+import timeit
+from typing import Any
+
+from benchmarks.utils import get_notification_factory
+from benchmarks.utils import report
+from notification.components.notification.schemas import KeyField
+from notification.components.notification.schemas import NotificationCreateSchema
+
+NUMBER = 10_000
+
+
+def dict_with_json_round_trip(entry: NotificationCreateSchema) -> dict[str, Any]:
+    obj = json.loads(entry.json())
+
+    data = {'data': obj}
+    for field in entry.get_fields_annotated_with(KeyField):
+        data[field] = obj.pop(field)
+
+    return data
+
+
+def main() -> None:
+    factory = get_notification_factory()
+    rows = []
+
+    for method in ('pipeline', 'copy_request', 'role_change', 'project', 'maintenance'):
+        entry = getattr(factory, f'generate_{method}')()
+        assert entry.dict() == dict_with_json_round_trip(entry)
+
+        round_trip = timeit.timeit(lambda: dict_with_json_round_trip(entry), number=NUMBER)  # noqa: B023
+        direct = timeit.timeit(entry.dict, number=NUMBER)
+        rows.append([method, round_trip / NUMBER * 10**6, direct / NUMBER * 10**6, round_trip / direct])
+
+    report('Microseconds per call', ['schema', 'json round trip', 'direct', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Measure CPU time per request of the user notifications feed with and without statement caches.
+
+Requests ask for a random number of projects, which used to produce different SQL text for every number of values
+and miss the prepared statement cache. Caches are disabled by setting both cache sizes to zero. Requires a migrated
+database configured with RDS_* environment variables.
+
+Usage: python -m benchmarks.notification_statement_cache
+"""
+
+import asyncio
+import random
+import time
+
+from httpx import AsyncClient
+
+from benchmarks.utils import Timings
+from benchmarks.utils import get_db_session
+from benchmarks.utils import report
+from benchmarks.utils import seed_notifications
+from benchmarks.utils import truncate_notifications
+from notification.app import create_app
+from notification.app import shutdown_event
+from notification.app import startup_event
+from notification.components.notification.models import NotificationType
+from notification.config import get_settings
+from notification.dependencies import get_db_engine
+
+REQUESTS = 1000
+MAX_PROJECTS = 20
+
+
+async def send_requests(query_cache_size: int, prepared_statement_cache_size: int) -> tuple[Timings, dict]:
+    """Return CPU time of each request and statement cache metrics collected while serving them."""
+
+    settings = get_settings().copy(
+        update={
+            'RDS_QUERY_CACHE_SIZE': query_cache_size,
+            'RDS_PREPARED_STATEMENT_CACHE_SIZE': prepared_statement_cache_size,
+            'RDS_POOL_WARM_UP_CONNECTIONS': 1,
+        }
+    )
+    app = create_app()
+    await startup_event(settings)
+
+    timings = Timings()
+    async with AsyncClient(app=app, base_url='http://notification') as client:
+        for index in range(REQUESTS):
+            projects = ','.join(f'project-{i}' for i in random.sample(range(100), random.randint(1, MAX_PROJECTS)))
+            params = {'recipient_username': f'user-{index % 100}', 'project_code_any': projects}
+
+            start = time.process_time()
+            response = await client.get('/v1/all/notifications/user', params=params)
+            timings.durations.append(time.process_time() - start)
+            assert response.status_code == 200
+
+    metrics = get_db_engine.statement_cache_counters.get_metrics()
+    await shutdown_event(settings)
+
+    return timings, metrics
+
+
+async def main() -> None:
+    settings = get_settings()
+    rows = []
+
+    async with get_db_session(settings) as session:
+        await truncate_notifications(session)
+        await seed_notifications(session, 10_000, users=100, projects=100, type_=NotificationType.PIPELINE)
+        await seed_notifications(session, 1000, users=100, projects=100, type_=NotificationType.PROJECT)
+
+    for name, cache_sizes in (('disabled', (0, 0)), ('enabled', (500, 100))):
+        timings, metrics = await send_requests(*cache_sizes)
+        rows.append(
+            [
+                name,
+                timings.percentile(50) * 1000,
+                timings.percentile(95) * 1000,
+                metrics['compiled_hit_ratio'],
+                metrics['prepared_hit_ratio'],
+            ]
+        )
+
+    async with get_db_session(settings) as session:
+        await truncate_notifications(session)
+
+    report(
+        f'CPU time per user feed request (ms), {REQUESTS} requests with up to {MAX_PROJECTS} projects',
+        ['caches', 'p50', 'p95', 'compiled hit ratio', 'prepared hit ratio'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
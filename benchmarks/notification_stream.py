@@ -0,0 +1,129 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Measure memory and delivery latency of notification stream with many idle subscribers in one worker.
+
+Every subscriber has its own user feed and receives maintenance notifications, so a maintenance notification is
+delivered to all of them and a role change notification to only one. Requires a migrated database configured with
+RDS_* environment variables.
+
+Usage: python -m benchmarks.notification_stream
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.utils import Deliveries
+from benchmarks.utils import get_notification_factory
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from notification.components.notification.cache import MAINTENANCE_FEED
+from notification.components.notification.cache import get_user_feed
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.schemas import NotificationCreateSchema
+from notification.components.notification.stream import HEARTBEAT
+from notification.components.notification.stream import NotificationStream
+from notification.components.notification.stream import NotificationSubscription
+from notification.config import get_settings
+
+SUBSCRIBERS = 10_000
+HEARTBEAT_INTERVAL = 15
+IDLE_SECONDS = 5
+REPEAT = 10
+
+
+async def consume(stream: NotificationStream, subscription: NotificationSubscription, deliveries: Deliveries) -> None:
+    async for event in stream.iter_events(subscription, heartbeat_interval=HEARTBEAT_INTERVAL):
+        if event != HEARTBEAT:
+            deliveries.add()
+
+
+async def deliver(
+    engine: AsyncEngine, channel: str, entry: NotificationCreateSchema, deliveries: Deliveries, expected: int
+) -> None:
+    deliveries.expect(expected)
+
+    async with AsyncSession(bind=engine, expire_on_commit=False) as session:
+        crud = NotificationCRUD(session, notify_channel=channel)
+        await crud.create(entry)
+        await crud.commit()
+
+    await deliveries.done.wait()
+
+
+async def measure_loop_lag(seconds: float) -> list[float]:
+    """Return how late the event loop wakes up sleeping task, which grows when heartbeat timers keep it busy."""
+
+    lags = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - start - 0.01) * 1000)
+
+    return sorted(lags)
+
+
+async def main() -> None:
+    settings = get_settings()
+    engine = create_async_engine(settings.RDS_DB_URI)
+    factory = get_notification_factory()
+
+    stream = NotificationStream(engine, channel=settings.NOTIFICATIONS_STREAM_CHANNEL, queue_size=100)
+    await stream.start()
+    while not stream.listening:
+        await asyncio.sleep(0.01)
+
+    deliveries = Deliveries()
+    usernames = [f'user-{index}' for index in range(SUBSCRIBERS)]
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    consumers = [
+        asyncio.create_task(consume(stream, stream.subscribe([get_user_feed(username), MAINTENANCE_FEED]), deliveries))
+        for username in usernames
+    ]
+    await asyncio.sleep(0)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lags = await measure_loop_lag(IDLE_SECONDS)
+
+    channel = stream.channel
+    targeted = await measure(
+        lambda: deliver(engine, channel, factory.generate_role_change(recipient_username=usernames[0]), deliveries, 1),
+        REPEAT,
+    )
+    broadcast = await measure(
+        lambda: deliver(engine, channel, factory.generate_maintenance(), deliveries, SUBSCRIBERS), REPEAT
+    )
+
+    await stream.stop()
+    await asyncio.gather(*consumers)
+    await engine.dispose()
+
+    report(
+        f'Idle subscribers, {SUBSCRIBERS} in one worker',
+        ['memory per subscriber (KB)', 'loop lag p50 (ms)', 'loop lag max (ms)'],
+        [[(after - before) / SUBSCRIBERS / 1024, lags[len(lags) // 2], lags[-1]]],
+    )
+    report(
+        'Delivery latency from commit to the last subscriber (ms)',
+        ['notification', 'subscribers', 'p50', 'p95'],
+        [
+            ['role change', 1, targeted.percentile(50) * 1000, targeted.percentile(95) * 1000],
+            ['maintenance', SUBSCRIBERS, broadcast.percentile(50) * 1000, broadcast.percentile(95) * 1000],
+        ],
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Measure latency and query plan of the first page of the user notifications feed on a large table.
+
+Both feed engines are measured. The table is seeded with more than 10M notifications when --seed flag is passed,
+which takes several minutes, so following runs can reuse the data. To compare indexes run the benchmark once on the
+current migration and once after "alembic downgrade" to the previous one. Requires a migrated database configured
+with RDS_* environment variables.
+
+Usage: python -m benchmarks.notification_user_feed [--seed]
+"""
+
+import argparse
+import asyncio
+from functools import partial
+from typing import Any
+
+from benchmarks.utils import get_db_session
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from benchmarks.utils import seed_notifications
+from benchmarks.utils import truncate_notifications
+from notification.components.explain import Explain
+from notification.components.explain import get_plan
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import UserFeedEngine
+from notification.components.notification.filtering import UserNotificationFiltering
+from notification.components.notification.models import NotificationType
+from notification.components.pagination import Pagination
+from notification.components.pagination import TotalMode
+from notification.components.sorting import Sorting
+from notification.components.sorting import SortingOrder
+from notification.config import get_settings
+
+SEED = {
+    NotificationType.PIPELINE: {'number': 9_000_000, 'users': 100_000, 'projects': 1000},
+    NotificationType.PROJECT: {'number': 1_000_000, 'users': 100_000, 'projects': 1000},
+    NotificationType.MAINTENANCE: {'number': 1000, 'users': 100_000, 'projects': 1000},
+}
+PAGE_SIZE = 20
+REPEAT = 50
+
+FILTERINGS = {
+    'one project': UserNotificationFiltering(recipient_username='user-1', project_code_any={'project-1'}),
+    'ten projects': UserNotificationFiltering(
+        recipient_username='user-1', project_code_any={f'project-{i}' for i in range(10)}
+    ),
+    'all projects': UserNotificationFiltering(recipient_username='user-1', project_code_any=set()),
+}
+
+
+def summarize_plan(plan: dict[str, Any]) -> str:
+    """Return comma-separated node types of the plan with index names where they are used."""
+
+    node = plan['Node Type']
+    if 'Index Name' in plan:
+        node = f'{node} ({plan["Index Name"]})'
+
+    return ', '.join([node] + [summarize_plan(subplan) for subplan in plan.get('Plans', [])])
+
+
+PAGINATION = Pagination(page_size=PAGE_SIZE, total_mode=TotalMode.NONE)
+SORTING = Sorting(field='created_at', order=SortingOrder.DESC)
+
+
+async def paginate(crud: NotificationCRUD, filtering: UserNotificationFiltering) -> None:
+    await crud.paginate(PAGINATION.copy(), SORTING, filtering)
+    await crud.commit()
+
+
+async def main(seed: bool) -> None:
+    settings = get_settings()
+    rows = []
+    plans = []
+
+    async with get_db_session(settings) as session:
+        if seed:
+            await truncate_notifications(session)
+            for type_, parameters in SEED.items():
+                await seed_notifications(session, type_=type_, **parameters)
+
+        for engine in UserFeedEngine:
+            crud = NotificationCRUD(session, user_feed_engine=engine)
+
+            for name, filtering in FILTERINGS.items():
+                timings = await measure(partial(paginate, crud, filtering), REPEAT)
+                rows.append([name, engine.value, timings.percentile(50) * 1000, timings.percentile(95) * 1000])
+
+                statement = crud._build_entries_statement(PAGINATION, SORTING, filtering)
+                result = await session.execute(Explain(statement, analyze=True, buffers=True))
+                plans.append([name, engine.value, summarize_plan(get_plan(result.scalar_one()))])
+                await session.commit()
+
+    report(f'First page latency (ms), page size {PAGE_SIZE}', ['feed', 'engine', 'p50', 'p95'], rows)
+    report('Query plans', ['feed', 'engine', 'nodes'], plans)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seed', action='store_true', help='truncate notifications table and seed it with test data')
+    arguments = parser.parse_args()
+
+    asyncio.run(main(arguments.seed))
@@ -0,0 +1,119 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+"""Soak test of WebSocket notification delivery against a running service.
+
+Opens connections for distinct users, keeps them idle and then measures how long it takes from commit until a
+notification reaches one user and until a maintenance notification reaches every connection. Connections are spread
+across however many workers serve the url, so cross-worker delivery through NOTIFY is included. Requires the service
+started with NOTIFICATIONS_STREAM_ENABLED=true and the same database configured with RDS_* environment variables.
+
+Usage: python -m benchmarks.notification_websocket [connections] [url]
+"""
+
+import asyncio
+import json
+import resource
+import sys
+import time
+
+import websockets
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.utils import Deliveries
+from benchmarks.utils import get_notification_factory
+from benchmarks.utils import measure
+from benchmarks.utils import report
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.schemas import NotificationCreateSchema
+from notification.config import get_settings
+
+CONNECTIONS = 2000
+URL = 'ws://127.0.0.1:5065/v1/all/notifications/user/ws'
+IDLE_SECONDS = 30
+REPEAT = 10
+
+
+async def listen(connection: websockets.WebSocketClientProtocol, deliveries: Deliveries) -> None:
+    async for message in connection:
+        if json.loads(message)['type'] == 'notification':
+            deliveries.add()
+
+
+async def deliver(
+    engine: AsyncEngine, channel: str, entry: NotificationCreateSchema, deliveries: Deliveries, expected: int
+) -> None:
+    deliveries.expect(expected)
+
+    async with AsyncSession(bind=engine, expire_on_commit=False) as session:
+        crud = NotificationCRUD(session, notify_channel=channel)
+        await crud.create(entry)
+        await crud.commit()
+
+    await deliveries.done.wait()
+
+
+async def main(connections_number: int, url: str) -> None:
+    settings = get_settings()
+    engine = create_async_engine(settings.RDS_DB_URI)
+    factory = get_notification_factory()
+    channel = settings.NOTIFICATIONS_STREAM_CHANNEL
+
+    # Every connection needs its own file descriptor on the client side.
+    soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(
+        resource.RLIMIT_NOFILE, (min(hard_limit, max(soft_limit, connections_number + 1024)), hard_limit)
+    )
+
+    deliveries = Deliveries()
+    usernames = [f'user-{index}' for index in range(connections_number)]
+
+    start = time.perf_counter()
+    connections = []
+    for index, username in enumerate(usernames):
+        connections.append(
+            await websockets.connect(f'{url}?recipient_username={username}&project_code_any=project-{index % 100}')
+        )
+    connect_duration = time.perf_counter() - start
+
+    listeners = [asyncio.create_task(listen(connection, deliveries)) for connection in connections]
+
+    await asyncio.sleep(IDLE_SECONDS)
+    alive = sum(connection.open for connection in connections)
+
+    targeted = await measure(
+        lambda: deliver(engine, channel, factory.generate_role_change(recipient_username=usernames[0]), deliveries, 1),
+        REPEAT,
+    )
+    broadcast = await measure(
+        lambda: deliver(engine, channel, factory.generate_maintenance(), deliveries, connections_number), REPEAT
+    )
+
+    for connection in connections:
+        await connection.close()
+    await asyncio.gather(*listeners, return_exceptions=True)
+    await engine.dispose()
+
+    report(
+        f'Connections, {connections_number} opened',
+        ['connections per second', f'alive after {IDLE_SECONDS}s idle'],
+        [[connections_number / connect_duration, alive]],
+    )
+    report(
+        'Delivery latency from commit to the last connection (ms)',
+        ['notification', 'connections', 'p50', 'p95'],
+        [
+            ['role change', 1, targeted.percentile(50) * 1000, targeted.percentile(95) * 1000],
+            ['maintenance', connections_number, broadcast.percentile(50) * 1000, broadcast.percentile(95) * 1000],
+        ],
+    )
+
+
+if __name__ == '__main__':
+    arguments = sys.argv[1:]
+    asyncio.run(main(int(arguments[0]) if arguments else CONNECTIONS, arguments[1] if len(arguments) > 1 else URL))
@@ -0,0 +1,161 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import statistics
+import sys
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from sqlalchemy import bindparam
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from notification.components.notification.models import NotificationType
+from notification.config import Settings
+from tests.fixtures.components.notification import NotificationFactory
+from tests.fixtures.fake import Faker
+
+
+@dataclass
+class Timings:
+    """Store durations (in seconds) of repeated benchmark runs."""
+
+    durations: list[float] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations)
+
+    @property
+    def per_second(self) -> float:
+        return len(self.durations) / self.total if self.total else 0.0
+
+    def percentile(self, percent: int) -> float:
+        if len(self.durations) == 1:
+            return self.durations[0]
+
+        return statistics.quantiles(self.durations, n=100, method='inclusive')[percent - 1]
+
+
+class Deliveries:
+    """Count events delivered to subscribers and notify when the expected number is reached."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.expected = 0
+        self.done = asyncio.Event()
+
+    def expect(self, number: int) -> None:
+        self.count = 0
+        self.expected = number
+        self.done.clear()
+
+    def add(self) -> None:
+        self.count += 1
+        if self.count == self.expected:
+            self.done.set()
+
+
+async def measure(func: Callable[[], Awaitable[Any]], repeat: int) -> Timings:
+    """Await result of the function repeat number of times and collect durations of each call."""
+
+    timings = Timings()
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        timings.durations.append(time.perf_counter() - start)
+
+    return timings
+
+
+def report(title: str, header: list[str], rows: list[list[Any]]) -> None:
+    """Write results as a plain text table into the standard output."""
+
+    rows = [[f'{value:.2f}' if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max(len(value) for value in column) for column in zip(header, *rows)]
+
+    lines = [title, '  '.join(name.rjust(width) for name, width in zip(header, widths))]
+    lines.extend('  '.join(value.rjust(width) for value, width in zip(row, widths)) for row in rows)
+
+    sys.stdout.write('\n'.join(lines) + '\n\n')
+
+
+@asynccontextmanager
+async def get_db_session(settings: Settings) -> AsyncIterator[AsyncSession]:
+    """Create a session bound to a dedicated engine that is disposed on exit."""
+
+    engine = create_async_engine(settings.RDS_DB_URI)
+    session = AsyncSession(bind=engine, expire_on_commit=False)
+
+    try:
+        yield session
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+async def truncate_notifications(session: AsyncSession) -> None:
+    """Remove all rows from notifications table."""
+
+    await session.execute(text('TRUNCATE TABLE notifications CASCADE'))
+    await session.commit()
+
+
+async def seed_notifications(
+    session: AsyncSession,
+    number: int,
+    *,
+    users: int,
+    projects: int,
+    type_: NotificationType = NotificationType.PIPELINE,
+) -> None:
+    """Insert number of notifications spread evenly across users and projects and one second apart.
+
+    Rows are generated by the database, so even tens of millions of rows are inserted in minutes. Usernames and project
+    codes have "user-<n>" and "project-<n>" format. Recipient is not set for project notifications and neither recipient
+    nor project code is set for maintenance notifications, which receive random announcement id instead.
+    """
+
+    data = get_notification_factory().generate_all_available().map_by_field('type')[type_].dict()['data']
+    recipient_username = "'user-' || i % :users"
+    project_code = "'project-' || i % :projects"
+    announcement_id = 'NULL'
+    if type_ is NotificationType.PROJECT:
+        recipient_username = 'NULL'
+    elif type_ is NotificationType.MAINTENANCE:
+        recipient_username = project_code = 'NULL'
+        announcement_id = 'gen_random_uuid()'
+
+    statement = text(
+        f'''
+        INSERT INTO notifications (id, type, created_at, recipient_username, project_code, announcement_id, data)
+        SELECT gen_random_uuid(), CAST(:type AS notification_type), now() - i * interval '1 second',
+               {recipient_username}, {project_code}, {announcement_id}, :data
+        FROM generate_series(1, :number) AS i
+        '''
+    ).bindparams(bindparam('data', type_=JSONB))
+
+    await session.execute(
+        statement, {'number': number, 'users': users, 'projects': projects, 'type': type_.value, 'data': data}
+    )
+    await session.commit()
+    await session.execute(text('ANALYZE notifications'))
+
+
+def get_notification_factory() -> NotificationFactory:
+    """Return a notification factory that can only be used for entries generation."""
+
+    return NotificationFactory(None, Faker())
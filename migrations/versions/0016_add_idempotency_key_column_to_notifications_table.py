@@ -0,0 +1,37 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add idempotency_key column to notifications table.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-17 10:12:43.118234
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = '0015'
+
+
+def upgrade():
+    op.add_column('notifications', sa.Column('idempotency_key', sa.VARCHAR(length=128), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_notifications_idempotency_key'),
+            'notifications',
+            ['idempotency_key'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_notifications_idempotency_key'), table_name='notifications')
+    op.drop_column('notifications', 'idempotency_key')
@@ -0,0 +1,73 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add user feed indexes to notifications table.
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-17 14:03:27.561902
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0017'
+down_revision = '0016'
+branch_labels = None
+depends_on = '0016'
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_notifications_recipient_username_created_at'),
+            'notifications',
+            ['recipient_username', 'created_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f('ix_notifications_project_code_created_at_project'),
+            'notifications',
+            ['project_code', 'created_at'],
+            unique=False,
+            postgresql_where=sa.text("type = 'project'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f('ix_notifications_created_at_maintenance'),
+            'notifications',
+            ['created_at'],
+            unique=False,
+            postgresql_where=sa.text("type = 'maintenance'"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f('ix_notifications_recipient_username'), table_name='notifications', postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_notifications_recipient_username'),
+            'notifications',
+            ['recipient_username'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f('ix_notifications_created_at_maintenance'), table_name='notifications', postgresql_concurrently=True
+        )
+        op.drop_index(
+            op.f('ix_notifications_project_code_created_at_project'),
+            table_name='notifications',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f('ix_notifications_recipient_username_created_at'),
+            table_name='notifications',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,71 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add announcement_id column to notifications table.
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-17 16:21:05.904117
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = '0018'
+down_revision = '0017'
+branch_labels = None
+depends_on = '0017'
+
+BACKFILL_CHUNK_SIZE = 10000
+
+
+def backfill_announcement_id() -> None:
+    """Copy announcement_id from data into the column in chunks, each committed separately to keep locks short.
+
+    Rows with JSON null announcement_id are skipped, since they would stay NULL and be selected by every chunk.
+    """
+
+    statement = sa.text(
+        '''
+        UPDATE notifications SET announcement_id = CAST(data ->> 'announcement_id' AS UUID)
+        WHERE id IN (
+            SELECT id FROM notifications
+            WHERE type = 'maintenance' AND announcement_id IS NULL AND data ->> 'announcement_id' IS NOT NULL
+            LIMIT :chunk_size
+        )
+        '''
+    )
+
+    connection = op.get_bind()
+    while connection.execute(statement, {'chunk_size': BACKFILL_CHUNK_SIZE}).rowcount:
+        pass
+
+
+def upgrade():
+    op.add_column('notifications', sa.Column('announcement_id', postgresql.UUID(as_uuid=True), nullable=True))
+
+    with op.get_context().autocommit_block():
+        backfill_announcement_id()
+
+        op.create_index(
+            op.f('ix_notifications_announcement_id'),
+            'notifications',
+            ['announcement_id'],
+            unique=False,
+            postgresql_where=sa.text('announcement_id IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    op.execute(
+        '''
+        UPDATE notifications SET data = data || jsonb_build_object('announcement_id', announcement_id)
+        WHERE announcement_id IS NOT NULL AND NOT data ? 'announcement_id'
+        '''
+    )
+    op.drop_index(op.f('ix_notifications_announcement_id'), table_name='notifications')
+    op.drop_column('notifications', 'announcement_id')
@@ -0,0 +1,46 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add notification read state tables.
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-17 18:42:16.337019
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = '0019'
+down_revision = '0018'
+branch_labels = None
+depends_on = '0018'
+
+
+def upgrade():
+    op.create_table(
+        'notification_read_markers',
+        sa.Column('username', sa.VARCHAR(length=256), nullable=False),
+        sa.Column('read_until', postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('username'),
+    )
+    op.create_table(
+        'notification_reads',
+        sa.Column('username', sa.VARCHAR(length=256), nullable=False),
+        sa.Column('notification_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('read_at', postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['notification_id'], ['notifications.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('username', 'notification_id'),
+    )
+    op.create_index(
+        op.f('ix_notification_reads_notification_id'), 'notification_reads', ['notification_id'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_notification_reads_notification_id'), table_name='notification_reads')
+    op.drop_table('notification_reads')
+    op.drop_table('notification_read_markers')
@@ -0,0 +1,53 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+"""Add covering columns to user feed indexes.
+
+Revision ID: 0020
+Revises: 0019
+Create Date: 2026-10-18 09:12:44.208315
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0020'
+down_revision = '0019'
+branch_labels = None
+depends_on = '0019'
+
+USER_FEED_INDEXES = [
+    ('ix_notifications_recipient_username_created_at', ['recipient_username', 'created_at'], None, ['type', 'id']),
+    ('ix_notifications_project_code_created_at_project', ['project_code', 'created_at'], "type = 'project'", ['id']),
+    ('ix_notifications_created_at_maintenance', ['created_at'], "type = 'maintenance'", ['id']),
+]
+
+
+def replace_index(name: str, columns: list[str], where: str | None, include: list[str]) -> None:
+    """Build the index under a temporary name, then swap it with the existing one, so queries always have an index."""
+
+    op.create_index(
+        f'{name}_new',
+        'notifications',
+        columns,
+        unique=False,
+        postgresql_where=sa.text(where) if where else None,
+        postgresql_include=include,
+        postgresql_concurrently=True,
+    )
+    op.drop_index(name, table_name='notifications', postgresql_concurrently=True)
+    op.execute(f'ALTER INDEX {name}_new RENAME TO {name}')
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, columns, where, include in USER_FEED_INDEXES:
+            replace_index(name, columns, where, include)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, columns, where, _ in USER_FEED_INDEXES:
+            replace_index(name, columns, where, [])
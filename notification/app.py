@@ -27,8 +27,14 @@ from notification.components.exceptions import ServiceException
 from notification.components.exceptions import UnhandledException
 from notification.components.health import health_router
 from notification.components.notification import notification_router
+from notification.components.notification.dependencies import get_notification_feed_cache
+from notification.components.notification.dependencies import get_notification_ingest_queue
+from notification.components.notification.dependencies import get_notification_stream
+from notification.components.query_log import get_slow_query_log
+from notification.components.server_timing import ServerTimingMiddleware
 from notification.config import Settings
 from notification.config import get_settings
+from notification.dependencies import get_db_engine
 
 
 def create_app() -> FastAPI:
@@ -79,17 +85,45 @@ def setup_middlewares(app: FastAPI, settings: Settings) -> None:
         allow_methods=['*'],
         allow_headers=['*'],
     )
+    app.add_middleware(ServerTimingMiddleware)
 
 
 def setup_dependencies(app: FastAPI, settings: Settings) -> None:
     """Perform dependencies setup/teardown at the application startup/shutdown events."""
 
     app.add_event_handler('startup', partial(startup_event, settings))
+    app.add_event_handler('shutdown', partial(shutdown_event, settings))
 
 
 async def startup_event(settings: Settings) -> None:
     """Initialise dependencies at the application startup event."""
 
+    await get_db_engine.start(settings)
+
+    if settings.RDS_SLOW_QUERY_THRESHOLD:
+        await get_slow_query_log.start(settings, await get_db_engine(settings))
+
+    if settings.NOTIFICATIONS_FEED_CACHE_ENABLED:
+        await get_notification_feed_cache.start(settings)
+
+    if settings.NOTIFICATIONS_INGEST_QUEUE_ENABLED:
+        engine = await get_db_engine(settings)
+        await get_notification_ingest_queue.start(settings, engine, await get_notification_feed_cache())
+
+    if settings.NOTIFICATIONS_STREAM_ENABLED:
+        engine = await get_db_engine(settings)
+        await get_notification_stream.start(settings, engine)
+
+
+async def shutdown_event(settings: Settings) -> None:
+    """Release dependencies at the application shutdown event."""
+
+    await get_notification_stream.stop()
+    await get_notification_ingest_queue.stop()
+    await get_notification_feed_cache.stop()
+    await get_slow_query_log.stop()
+    await get_db_engine.stop()
+
 
 def setup_exception_handlers(app: FastAPI) -> None:
     """Configure the application exception handlers."""
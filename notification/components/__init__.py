@@ -8,6 +8,8 @@ from notification.components.announcement import Announcement
 from notification.components.announcement import AnnouncementUnsubscription
 from notification.components.notification import CopyRequestNotification
 from notification.components.notification import MaintenanceNotification
+from notification.components.notification import NotificationRead
+from notification.components.notification import NotificationReadMarker
 from notification.components.notification import PipelineNotification
 from notification.components.notification import ProjectNotification
 from notification.components.notification import RoleChangeNotification
@@ -18,6 +20,8 @@ __all__ = [
     'ProjectNotification',
     'RoleChangeNotification',
     'MaintenanceNotification',
+    'NotificationRead',
+    'NotificationReadMarker',
     'Announcement',
     'AnnouncementUnsubscription',
 ]
@@ -19,6 +19,7 @@ class AnnouncementCRUD(CRUD):
     """CRUD for managing announcement database models."""
 
     model = Announcement
+    validator_fields = ('created_at', 'updated_at')
 
     async def unsubscribe_user(self, announcement_id: UUID, username: str) -> None:
         """Create announcement unsubscription for the announcement id and username."""
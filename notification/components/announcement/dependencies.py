@@ -8,10 +8,18 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from notification.components.announcement.crud import AnnouncementCRUD
+from notification.components.query_budget import QueryBudget
+from notification.components.query_budget import get_request_query_budget
+from notification.components.query_log import SlowQueryLog
+from notification.components.query_log import get_slow_query_log
 from notification.dependencies import get_db_session
 
 
-def get_announcement_crud(db_session: AsyncSession = Depends(get_db_session)) -> AnnouncementCRUD:
+def get_announcement_crud(
+    db_session: AsyncSession = Depends(get_db_session),
+    query_budget: QueryBudget | None = Depends(get_request_query_budget),
+    slow_query_log: SlowQueryLog | None = Depends(get_slow_query_log),
+) -> AnnouncementCRUD:
     """Return an instance of AnnouncementCRUD as a dependency."""
 
-    return AnnouncementCRUD(db_session)
+    return AnnouncementCRUD(db_session, query_budget=query_budget, slow_query_log=slow_query_log)
@@ -5,10 +5,13 @@
 # You may not use this file except in compliance with the License.
 
 from contextlib import suppress
+from http import HTTPStatus
 from uuid import UUID
 
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Header
+from fastapi import Request
 from fastapi.responses import Response
 
 from notification.components.announcement.crud import AnnouncementCRUD
@@ -20,41 +23,68 @@ from notification.components.announcement.schemas import AnnouncementListRespons
 from notification.components.announcement.schemas import AnnouncementResponseSchema
 from notification.components.announcement.schemas import AnnouncementUnsubscriptionCreateSchema
 from notification.components.announcement.schemas import AnnouncementUpdateSchema
+from notification.components.etag import create_etag
+from notification.components.etag import is_not_modified
 from notification.components.exceptions import NotFound
 from notification.components.notification.crud import NotificationCRUD
 from notification.components.notification.dependencies import get_notification_crud
 from notification.components.parameters import PageParameters
 from notification.components.parameters import SortParameters
+from notification.components.query_budget import get_query_budget
 
 router = APIRouter(prefix='/announcements', tags=['Announcements'])
 
 
-@router.get('/', summary='List all announcements.', response_model=AnnouncementListResponseSchema)
+@router.get(
+    '/',
+    summary='List all announcements.',
+    response_model=AnnouncementListResponseSchema,
+    dependencies=[Depends(get_query_budget())],
+)
 async def list_announcements(
+    request: Request,
+    response: Response,
     filter_parameters: AnnouncementFilterParameters = Depends(),
     sort_parameters: SortParameters.with_sort_by_fields(AnnouncementSortByFields) = Depends(),
     page_parameters: PageParameters = Depends(),
+    if_none_match: str | None = Header(default=None),
     announcement_crud: AnnouncementCRUD = Depends(get_announcement_crud),
-) -> AnnouncementListResponseSchema:
-    """List all announcements."""
+) -> AnnouncementListResponseSchema | Response:
+    """List all announcements.
+
+    Not Modified response is returned when If-None-Match header contains the current ETag of the listing.
+    """
 
     filtering = filter_parameters.to_filtering()
     sorting = sort_parameters.to_sorting()
     pagination = page_parameters.to_pagination()
+
+    etag = create_etag(request.url.query, await announcement_crud.get_validator(filtering))
+    if is_not_modified(if_none_match, etag):
+        await announcement_crud.release()
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag})
+
     page = await announcement_crud.paginate(pagination, sorting, filtering)
+    await announcement_crud.release()
 
-    response = AnnouncementListResponseSchema.from_page(page)
+    response.headers['ETag'] = etag
 
-    return response
+    return AnnouncementListResponseSchema.from_page(page)
 
 
-@router.get('/{announcement_id}', summary='Get announcement by id.', response_model=AnnouncementResponseSchema)
+@router.get(
+    '/{announcement_id}',
+    summary='Get announcement by id.',
+    response_model=AnnouncementResponseSchema,
+    dependencies=[Depends(get_query_budget())],
+)
 async def get_announcement(
     announcement_id: UUID, announcement_crud: AnnouncementCRUD = Depends(get_announcement_crud)
 ) -> AnnouncementResponseSchema:
     """Get announcement by id."""
 
     announcement = await announcement_crud.retrieve_by_id(announcement_id)
+    await announcement_crud.release()
 
     return announcement
 
@@ -70,7 +100,7 @@ async def create_announcement(
     announcement = await announcement_crud.create(body)
     await notification_crud.create_from_announcement(announcement)
 
-    await announcement_crud.commit()
+    await notification_crud.commit()
 
     return announcement
 
@@ -91,7 +121,7 @@ async def update_announcement(
         await notification_crud.delete_by_announcement_id(announcement.id)
     await notification_crud.create_from_announcement(announcement)
 
-    await announcement_crud.commit()
+    await notification_crud.commit()
 
     return announcement
 
@@ -108,7 +138,7 @@ async def delete_announcement(
     with suppress(NotFound):
         await notification_crud.delete_by_announcement_id(announcement_id)
 
-    await announcement_crud.commit()
+    await notification_crud.commit()
 
     return Response(status_code=204)
 
@@ -0,0 +1,205 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import hashlib
+import json
+import time
+from abc import ABCMeta
+from abc import abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable
+from collections.abc import Sequence
+from typing import Any
+
+from redis.asyncio import Redis
+
+
+class CacheBackend(metaclass=ABCMeta):
+    """Base class for storages of cached values and version counters."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Return value stored under the key or None when it is missing or expired."""
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store value under the key for ttl seconds."""
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_counters(self, keys: Sequence[str]) -> list[int]:
+        """Return values of counters with zero for missing ones."""
+
+        raise NotImplementedError
+
+    @abstractmethod
+    async def increment_counters(self, keys: Iterable[str]) -> None:
+        """Increment counters by one."""
+
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release resources used by the backend."""
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Return backend specific metrics."""
+
+        return {}
+
+
+class LocalCacheBackend(CacheBackend):
+    """Store values in process memory evicting least recently used ones when the size limit is reached.
+
+    Size is accounted as the total length of keys and values. Counters are visible only inside the process, so the
+    backend suits a single worker only.
+    """
+
+    def __init__(self, *, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+
+        self.entries.move_to_end(key)
+
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if key in self.entries:
+            self._remove(key)
+
+        entry_size = len(key) + len(value)
+        if entry_size > self.max_bytes:
+            return
+
+        while self.size + entry_size > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.size += entry_size
+
+    async def get_counters(self, keys: Sequence[str]) -> list[int]:
+        return [self.counters.get(key, 0) for key in keys]
+
+    async def increment_counters(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def get_metrics(self) -> dict[str, Any]:
+        return {
+            'entries': len(self.entries),
+            'size_bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, value = self.entries.pop(key)
+        self.size -= len(key) + len(value)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Store values and counters in Redis compatible server shared by all workers.
+
+    Size limit and eviction are left to the server maxmemory configuration.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.client = Redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def get_counters(self, keys: Sequence[str]) -> list[int]:
+        values = await self.client.mget(keys)
+
+        return [int(value) if value is not None else 0 for value in values]
+
+    async def increment_counters(self, keys: Iterable[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.incr(key)
+            await pipeline.execute()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class VersionedCache:
+    """Cache values under keys which include versions of all data the value depends on.
+
+    Changing the data only requires incrementing its version, so values computed from the old data are never read
+    again and eventually expire or get evicted.
+    """
+
+    def __init__(self, backend: CacheBackend, *, namespace: str, ttl: float) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get_key(self, parameters: Any, dependencies: Sequence[str]) -> str:
+        """Return key for value computed with parameters from the current version of dependencies."""
+
+        versions = await self.backend.get_counters([self._get_version_key(name) for name in dependencies])
+        payload = json.dumps([parameters, dict(zip(dependencies, versions))], sort_keys=True, default=str)
+
+        return f'{self.namespace}:value:{hashlib.sha1(payload.encode()).hexdigest()}'
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.backend.get(key)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.backend.set(key, value, self.ttl)
+
+    async def invalidate(self, dependencies: Iterable[str]) -> None:
+        """Increment versions of dependencies making values which depend on them unreachable."""
+
+        await self.backend.increment_counters([self._get_version_key(name) for name in dependencies])
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Return hit and miss statistics together with backend metrics."""
+
+        requests = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / requests if requests else 0.0,
+        } | self.backend.get_metrics()
+
+    def _get_version_key(self, name: str) -> str:
+        return f'{self.namespace}:version:{name}'
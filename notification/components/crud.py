@@ -4,31 +4,68 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Coroutine
+from collections.abc import Sequence
 from typing import Any
+from typing import TypeVar
 from uuid import UUID
 
+from asyncpg import Connection
+from asyncpg.exceptions import IntegrityConstraintViolationError
+from sqlalchemy import REAL
+from sqlalchemy import and_
+from sqlalchemy import asc
+from sqlalchemy import column
 from sqlalchemy import delete
+from sqlalchemy import desc
 from sqlalchemy import func
 from sqlalchemy import insert
+from sqlalchemy import literal
+from sqlalchemy import or_
+from sqlalchemy import table
 from sqlalchemy import update
 from sqlalchemy.engine import CursorResult
 from sqlalchemy.engine import Result
+from sqlalchemy.engine import Row
 from sqlalchemy.engine import ScalarResult
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.sql import ColumnElement
 from sqlalchemy.sql import Executable
+from sqlalchemy.sql import Insert
 from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
 
 from notification.components.db_model import DBModel
 from notification.components.exceptions import AlreadyExists
 from notification.components.exceptions import NotFound
+from notification.components.explain import Explain
+from notification.components.explain import get_plan
 from notification.components.filtering import Filtering
+from notification.components.filtering import any_of
 from notification.components.models import ModelList
+from notification.components.pagination import CountStrategy
+from notification.components.pagination import Cursor
+from notification.components.pagination import CursorPage
+from notification.components.pagination import CursorPagination
 from notification.components.pagination import Page
 from notification.components.pagination import Pagination
+from notification.components.pagination import TotalMode
+from notification.components.query_budget import QueryBudget
+from notification.components.query_log import SlowQueryLog
 from notification.components.schemas import BaseSchema
 from notification.components.sorting import Sorting
+from notification.components.sorting import SortingOrder
+
+pg_class = table('pg_class', column('oid'), column('reltuples', REAL))
+
+T = TypeVar('T')
+
+MAX_BIND_PARAMETERS = 32767  # asyncpg allows up to 32767 bind parameters per statement
 
 
 class CRUD:
@@ -36,9 +73,18 @@ class CRUD:
 
     session: AsyncSession
     model: type[DBModel]
-
-    def __init__(self, db_session: AsyncSession) -> None:
+    validator_fields: Sequence[str] = ('created_at',)
+
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        *,
+        query_budget: QueryBudget | None = None,
+        slow_query_log: SlowQueryLog | None = None,
+    ) -> None:
         self.session = db_session
+        self.query_budget = query_budget
+        self.slow_query_log = slow_query_log
 
     @property
     def select_query(self) -> Select:
@@ -46,20 +92,59 @@ class CRUD:
 
         return select(self.model)
 
+    @property
+    def insert_query(self) -> Insert:
+        """Create base insert."""
+
+        return insert(self.model)
+
     async def commit(self) -> None:
         """Commit the current transaction."""
 
         await self.session.commit()
 
+    async def release(self) -> None:
+        """Finish the current read-only transaction and return its connection to the pool.
+
+        Handlers which only read call it right after the last statement, so the connection is not held while the
+        response is serialised and sent. Loaded entries are detached instead of being expired by the rollback, so they
+        can still be read without the database. The next statement checks out a connection again.
+        """
+
+        await self.session.close()
+
     async def execute(self, statement: Executable, **kwds: Any) -> CursorResult | Result:
         """Execute a statement and return buffered result."""
 
-        return await self.session.execute(statement, **kwds)
+        return await self._run(self.session.execute(statement, **kwds), statement=statement, params=kwds.get('params'))
 
     async def scalars(self, statement: Executable, **kwds: Any) -> ScalarResult:
         """Execute a statement and return scalar result."""
 
-        return await self.session.scalars(statement, **kwds)
+        return await self._run(self.session.scalars(statement, **kwds), statement=statement, params=kwds.get('params'))
+
+    async def _run(
+        self,
+        coroutine: Coroutine[Any, Any, T],
+        *,
+        statement: Executable | None = None,
+        params: dict[str, Any] | None = None,
+    ) -> T:
+        """Await the statement coroutine within the query budget and capture the statement when it is slow."""
+
+        start = time.perf_counter()
+
+        if self.query_budget is None:
+            result = await coroutine
+        else:
+            result = await self.query_budget.run(coroutine)
+
+        if statement is not None and self.slow_query_log:
+            duration = time.perf_counter() - start
+            if self.slow_query_log.is_slow(duration) and not isinstance(statement, Explain):
+                self.slow_query_log.capture(statement, params, duration)
+
+        return result
 
     async def _create_one(self, statement: Executable) -> UUID:
         """Execute a statement to create one entry."""
@@ -71,6 +156,54 @@ class CRUD:
 
         return result.inserted_primary_key.id
 
+    async def _create_one_returning(self, statement: UpdateBase) -> DBModel:
+        """Execute a statement to create one entry and return it as instance."""
+
+        try:
+            return await self._retrieve_one(self._with_returning(statement))
+        except IntegrityError:
+            raise AlreadyExists()
+
+    async def _create_many(self, statement: Executable) -> None:
+        """Execute a statement to create multiple entries."""
+
+        try:
+            await self.execute(statement)
+        except IntegrityError:
+            raise AlreadyExists()
+
+    async def _create_many_returning(self, statement: UpdateBase) -> list[DBModel]:
+        """Execute a statement to create multiple entries and return them as instances."""
+
+        try:
+            return await self._retrieve_many(self._with_returning(statement))
+        except IntegrityError:
+            raise AlreadyExists()
+
+    async def _copy_many(self, records: Sequence[tuple[Any, ...]], columns: Sequence[str]) -> None:
+        """Load records into the model table using binary COPY protocol."""
+
+        driver_connection = await self._get_driver_connection()
+
+        try:
+            await self._run(
+                driver_connection.copy_records_to_table(self.model.__tablename__, records=records, columns=columns)
+            )
+        except IntegrityConstraintViolationError:
+            raise AlreadyExists()
+
+    async def _get_driver_connection(self) -> Connection:
+        """Return asyncpg connection used by the session within the session transaction."""
+
+        connection = await self.session.connection()
+
+        # SQLAlchemy asyncpg adapter sends BEGIN lazily with the first executed statement, so one is executed through
+        # the session before statements are sent directly through the driver connection.
+        await connection.execute(select(literal(1)))
+        raw_connection = await connection.get_raw_connection()
+
+        return raw_connection.driver_connection
+
     async def _retrieve_one(self, statement: Executable) -> DBModel:
         """Execute a statement to retrieve one entry."""
 
@@ -90,13 +223,24 @@ class CRUD:
 
         return instances
 
-    async def _update(self, statement: Executable) -> None:
-        """Execute a statement to update one or multiple entries."""
+    async def _stream_many(self, statement: Executable, *, chunk_size: int) -> AsyncIterator[list[Row]]:
+        """Execute a statement using server-side cursor and yield received rows in chunks.
 
-        result = await self.execute(statement)
+        Only one chunk of rows is fetched and kept in memory at a time, so the number of rows is not limited. The query
+        budget limits only the statement until the first chunk is received.
+        """
 
-        if result.rowcount == 0:
-            raise NotFound()
+        result = await self._run(self.session.stream(statement.execution_options(yield_per=chunk_size)))
+        try:
+            async for rows in result.partitions(chunk_size):
+                yield rows
+        finally:
+            await result.close()
+
+    async def _update_one_returning(self, statement: UpdateBase) -> DBModel:
+        """Execute a statement to update one entry and return it as instance."""
+
+        return await self._retrieve_one(self._with_returning(statement))
 
     async def _delete(self, statement: Executable) -> None:
         """Execute a statement to delete one or multiple entries."""
@@ -106,17 +250,58 @@ class CRUD:
         if result.rowcount == 0:
             raise NotFound()
 
+    def _with_returning(self, statement: UpdateBase) -> Select:
+        """Return statement that receives all columns of affected rows as model instances."""
+
+        return (
+            select(self.model)
+            .from_statement(statement.returning(*self.model.__table__.columns))
+            .execution_options(populate_existing=True)
+        )
+
     async def create(self, entry_create: BaseSchema, **kwds: Any) -> DBModel:
         """Create a new entry."""
 
         values = entry_create.dict()
-        statement = insert(self.model).values(**(values | kwds))
-        entry_id = await self._create_one(statement)
-
-        entry = await self.retrieve_by_id(entry_id)
+        statement = self.insert_query.values(**(values | kwds))
+        entry = await self._create_one_returning(statement)
 
         return entry
 
+    async def bulk_create(
+        self, entries_create: Sequence[BaseSchema], *, chunk_size: int, returning: bool = False, **kwds: Any
+    ) -> ModelList[DBModel] | None:
+        """Create multiple entries using one multi-row insert statement per chunk of entries.
+
+        Created entries are read back only when returning is enabled, otherwise None is returned. Chunk size is reduced
+        when chunk rows would need more bind parameters than one statement allows.
+        """
+
+        values = self._align_values([entry_create.dict() | kwds for entry_create in entries_create])
+        entries = []
+
+        chunk_size = min(chunk_size, MAX_BIND_PARAMETERS // len(self.model.__table__.columns))
+
+        for start in range(0, len(values), chunk_size):
+            statement = self.insert_query.values(values[start : start + chunk_size])
+            if returning:
+                entries.extend(await self._create_many_returning(statement))
+            else:
+                await self._create_many(statement)
+
+        if not returning:
+            return None
+
+        return ModelList(entries)
+
+    @staticmethod
+    def _align_values(values: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Make sure all rows have the same set of keys as required for multi-row insert statement."""
+
+        keys = set().union(*values)
+
+        return [{key: row.get(key) for key in keys} for row in values]
+
     async def retrieve_by_id(self, id_: UUID) -> DBModel:
         """Get an existing entry by id (primary key)."""
 
@@ -125,6 +310,14 @@ class CRUD:
 
         return entry
 
+    async def list_by_ids(self, ids: Sequence[UUID]) -> ModelList[DBModel]:
+        """Get existing entries by ids skipping missing ones."""
+
+        statement = self.select_query.where(any_of(self.model.id, ids))
+        entries = await self._retrieve_many(statement)
+
+        return ModelList(entries)
+
     async def list(self) -> ModelList[DBModel]:
         """Get all existing entries."""
 
@@ -136,32 +329,213 @@ class CRUD:
     async def paginate(
         self, pagination: Pagination, sorting: Sorting | None = None, filtering: Filtering | None = None
     ) -> Page:
-        """Get all existing entries with pagination support."""
-        count_statement = select(func.count()).select_from(self.model)
-        if filtering:
-            count_statement = filtering.apply(count_statement, self.model)
-        count = await self._retrieve_one(count_statement)
+        """Get all existing entries with pagination support.
+
+        Total number of entries is computed according to the pagination total mode. When pagination is disabled the
+        exact total is always computed because it is used as the page size.
+        """
+
+        return await self._paginate(pagination, sorting, filtering)
+
+    async def _paginate(
+        self,
+        pagination: Pagination,
+        sorting: Sorting | None,
+        filtering: Filtering | None,
+        *,
+        build_column: Callable[[Any], ColumnElement] | None = None,
+    ) -> Page:
+        """Get page entries as models or as values of the column built from the selected entity.
+
+        Exact total is selected together with page entries using one statement when the count strategy prefers window
+        count.
+        """
+
+        total_mode = pagination.total_mode
+        with_window_count = False
+        if pagination.is_disabled():
+            total_mode = TotalMode.EXACT
+        elif total_mode is TotalMode.EXACT:
+            with_window_count = self._get_count_strategy(pagination, filtering) is CountStrategy.WINDOW
+
+        count = None
+        if not with_window_count:
+            count, total_mode = await self._count(total_mode, pagination.total_cap, filtering)
 
         if pagination.is_disabled():
             pagination.page_size = count
 
-        entries_statement = self.select_query.limit(pagination.limit).offset(pagination.offset)
+        statement = self._build_entries_statement(pagination, sorting, filtering)
+        if build_column:
+            entity = statement.column_descriptions[0]['entity']
+            statement = statement.with_only_columns(build_column(entity))
+
+        if not with_window_count:
+            entries = await self._retrieve_many(statement)
+            return Page(pagination=pagination, count=count, total_mode=total_mode, entries=entries)
+
+        statement = statement.add_columns(func.count().over().label('total_count'))
+        result = await self.execute(statement)
+        rows = result.all()
+
+        entries = [row[0] for row in rows]
+        if rows:
+            count = rows[0].total_count
+        elif pagination.offset:
+            # Window count is not available when page is out of range, so entries are counted separately.
+            count, _ = await self._count(TotalMode.EXACT, pagination.total_cap, filtering)
+        else:
+            count = 0
+
+        return Page(pagination=pagination, count=count, total_mode=total_mode, entries=entries)
+
+    def _get_count_strategy(self, pagination: Pagination, filtering: Filtering | None) -> CountStrategy:
+        """Return count strategy set in pagination or the one preferred by filtering."""
+
+        if pagination.count_strategy:
+            return pagination.count_strategy
+
+        if filtering:
+            return filtering.get_count_strategy()
+
+        return CountStrategy.SEPARATE
+
+    async def get_validator(self, filtering: Filtering | None = None) -> str:
+        """Return value which changes whenever entries matching the filtering are created, updated or deleted.
+
+        Only the number of entries and the newest timestamps are computed, so no entries are read or serialised.
+        """
+
+        columns = [getattr(self.model, name) for name in self.validator_fields]
+        source = self._build_count_source_statement(filtering, *columns).subquery()
+        statement = select(func.count(), *[func.max(source.c[name]) for name in self.validator_fields]).select_from(
+            source
+        )
+
+        result = await self.execute(statement)
+
+        return ':'.join(str(value) for value in result.one())
+
+    async def _count(
+        self, total_mode: TotalMode, total_cap: int, filtering: Filtering | None
+    ) -> tuple[int | None, TotalMode]:
+        """Compute total number of entries and return it together with the mode that was actually used.
+
+        Capped mode turns into exact one when the number of entries is below the cap.
+        """
+
+        if total_mode is TotalMode.NONE:
+            return None, total_mode
+
+        if total_mode is TotalMode.ESTIMATED:
+            return await self._count_estimated(filtering), total_mode
+
+        source_statement = self._build_count_source_statement(filtering)
+        if total_mode is TotalMode.CAPPED:
+            source_statement = source_statement.limit(total_cap + 1)
+
+        count_statement = select(func.count()).select_from(source_statement.subquery())
+        count = await self._retrieve_one(count_statement)
+
+        if total_mode is TotalMode.CAPPED:
+            if count <= total_cap:
+                return count, TotalMode.EXACT
+            return total_cap, total_mode
+
+        return count, total_mode
+
+    async def _count_estimated(self, filtering: Filtering | None) -> int:
+        """Estimate number of entries using table statistics or planner estimation when filtering is applied."""
+
+        if not filtering:
+            statement = select(pg_class.c.reltuples).where(
+                pg_class.c.oid == func.to_regclass(self.model.__table__.fullname)
+            )
+            reltuples = await self._retrieve_one(statement)
+            # Statistics are not available for tables that have never been vacuumed or analyzed.
+            if reltuples >= 0:
+                return int(reltuples)
+
+        statement = Explain(self._build_count_source_statement(filtering))
+        plan = get_plan(await self._retrieve_one(statement))
+
+        return int(plan['Plan Rows'])
+
+    def _build_count_source_statement(self, filtering: Filtering | None, *columns: ColumnElement) -> Select:
+        """Create statement which selects entries that have to be counted.
+
+        Only id column is selected unless other columns are requested.
+        """
+
+        statement = select(*(columns or [self.model.id]))
+        if filtering:
+            statement = filtering.apply(statement, self.model)
+
+        return statement
+
+    def _build_entries_statement(
+        self, pagination: Pagination, sorting: Sorting | None, filtering: Filtering | None
+    ) -> Select:
+        """Create statement which selects entries for the page."""
+
+        statement = self.select_query.limit(pagination.limit).offset(pagination.offset)
         if sorting:
-            entries_statement = sorting.apply(entries_statement, self.model)
+            statement = sorting.apply(statement, self.model)
         if filtering:
-            entries_statement = filtering.apply(entries_statement, self.model)
-        entries = await self._retrieve_many(entries_statement)
+            statement = filtering.apply(statement, self.model)
+
+        return statement
+
+    async def paginate_by_cursor(self, pagination: CursorPagination, filtering: Filtering | None = None) -> CursorPage:
+        """Get existing entries ordered by (created_at, id) using keyset pagination.
+
+        Entries are looked up right after the cursor position instead of skipping them with offset, so the time needed
+        to get a page does not depend on how deep the page is.
+        """
 
-        return Page(pagination=pagination, count=count, entries=entries)
+        created_at, id_ = self.model.created_at, self.model.id
+        order_by = asc
+        if pagination.order is SortingOrder.DESC:
+            order_by = desc
+
+        statement = self.select_query.order_by(order_by(created_at), order_by(id_)).limit(pagination.page_size + 1)
+        if filtering:
+            statement = filtering.apply(statement, self.model)
+
+        cursor = pagination.cursor
+        if cursor:
+            if pagination.order is SortingOrder.DESC:
+                # The first condition is redundant, but it lets the created_at index bound the scan.
+                statement = statement.where(
+                    and_(
+                        created_at <= cursor.created_at,
+                        or_(created_at < cursor.created_at, id_ < cursor.id),
+                    )
+                )
+            else:
+                statement = statement.where(
+                    and_(
+                        created_at >= cursor.created_at,
+                        or_(created_at > cursor.created_at, id_ > cursor.id),
+                    )
+                )
+
+        entries = await self._retrieve_many(statement)
+
+        next_cursor = None
+        if len(entries) > pagination.page_size:
+            entries = entries[: pagination.page_size]
+            last = entries[-1]
+            next_cursor = Cursor(created_at=last.created_at, id=last.id)
+
+        return CursorPage(pagination=pagination, entries=entries, next_cursor=next_cursor)
 
     async def update(self, id_: UUID, entry_update: BaseSchema, **kwds: Any) -> DBModel:
         """Update an existing entry attributes."""
 
         values = entry_update.dict(exclude_unset=True, exclude_defaults=True)
         statement = update(self.model).where(self.model.id == id_).values(**(values | kwds))
-        await self._update(statement)
-
-        entry = await self.retrieve_by_id(id_)
+        entry = await self._update_one_returning(statement)
 
         return entry
 
@@ -0,0 +1,30 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import hashlib
+from typing import Any
+
+
+def create_etag(*parts: Any) -> str:
+    """Return quoted entity tag computed from parts which identify the response content."""
+
+    digest = hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+    return f'"{digest}"'
+
+
+def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+    """Check if the entity tag matches any tag from If-None-Match header using weak comparison."""
+
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+
+    return etag in tags
@@ -90,3 +90,100 @@ class AlreadyExists(ServiceException):
     @property
     def details(self) -> str:
         return 'Target resource already exists'
+
+
+class IngestQueueFull(ServiceException):
+    """Raised when ingest queue has no space left for new entries."""
+
+    @property
+    def status(self) -> int:
+        return HTTPStatus.SERVICE_UNAVAILABLE
+
+    @property
+    def code(self) -> str:
+        return 'ingest_queue_full'
+
+    @property
+    def details(self) -> str:
+        return 'Ingest queue is full, try again later'
+
+
+class InvalidCursor(ServiceException):
+    """Raised when pagination cursor cannot be decoded."""
+
+    @property
+    def status(self) -> int:
+        return HTTPStatus.BAD_REQUEST
+
+    @property
+    def code(self) -> str:
+        return 'invalid_cursor'
+
+    @property
+    def details(self) -> str:
+        return 'Pagination cursor is malformed'
+
+
+class StreamUnavailable(ServiceException):
+    """Raised when notification stream is disabled or not listening for notifications."""
+
+    @property
+    def status(self) -> int:
+        return HTTPStatus.SERVICE_UNAVAILABLE
+
+    @property
+    def code(self) -> str:
+        return 'stream_unavailable'
+
+    @property
+    def details(self) -> str:
+        return 'Notification stream is unavailable, try again later'
+
+
+class QueryTimeout(ServiceException):
+    """Raised when a statement or all statements of a request run longer than allowed."""
+
+    @property
+    def status(self) -> int:
+        return HTTPStatus.GATEWAY_TIMEOUT
+
+    @property
+    def code(self) -> str:
+        return 'query_timeout'
+
+    @property
+    def details(self) -> str:
+        return 'Database query took too long, narrow down the request'
+
+
+class QueryBudgetExceeded(ServiceException):
+    """Raised when a request executes more statements than allowed."""
+
+    @property
+    def status(self) -> int:
+        return HTTPStatus.SERVICE_UNAVAILABLE
+
+    @property
+    def code(self) -> str:
+        return 'query_budget_exceeded'
+
+    @property
+    def details(self) -> str:
+        return 'Request needs more database queries than allowed'
+
+
+class QueryCancelled(ServiceException):
+    """Raised when an in-flight statement is cancelled because the client has disconnected."""
+
+    @property
+    def status(self) -> int:
+        # Non-standard status used by proxies for requests closed by the client, the response is never delivered.
+        return 499
+
+    @property
+    def code(self) -> str:
+        return 'query_cancelled'
+
+    @property
+    def details(self) -> str:
+        return 'Client closed the request'
@@ -0,0 +1,44 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import json
+from typing import Any
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.compiler import SQLCompiler
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN statement that returns the execution plan of the wrapped statement in JSON format."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Executable, *, analyze: bool = False, buffers: bool = False) -> None:
+        self.statement = statement
+        self.analyze = analyze
+        self.buffers = buffers
+
+
+@compiles(Explain, 'postgresql')
+def compile_explain(element: Explain, compiler: SQLCompiler, **kwds: Any) -> str:
+    options = ['FORMAT JSON']
+    if element.analyze:
+        options.append('ANALYZE')
+    if element.buffers:
+        options.append('BUFFERS')
+
+    return f'EXPLAIN ({", ".join(options)}) {compiler.process(element.statement, **kwds)}'
+
+
+def get_plan(value: str | list[dict[str, Any]]) -> dict[str, Any]:
+    """Return root plan node from the EXPLAIN result which is received either as string or decoded JSON."""
+
+    if isinstance(value, str):
+        value = json.loads(value)
+
+    return value[0]['Plan']
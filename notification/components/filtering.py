@@ -4,10 +4,28 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from collections.abc import Iterable
+from typing import Any
+
 from pydantic import BaseModel
+from sqlalchemy import any_
+from sqlalchemy import literal
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import ColumnElement
 from sqlalchemy.sql import Select
 
 from notification.components.db_model import DBModel
+from notification.components.pagination import CountStrategy
+
+
+def any_of(column: ColumnElement, values: Iterable[Any]) -> ColumnElement:
+    """Return condition matching entries with column equal to any of the values passed as one array parameter.
+
+    Unlike IN, which expands into one parameter per value, statement text does not depend on the number of values, so
+    the database driver prepares it once.
+    """
+
+    return column == any_(literal(list(values), ARRAY(column.type)))
 
 
 class Filtering(BaseModel):
@@ -28,3 +46,8 @@ class Filtering(BaseModel):
         """Return statement with applied filtering."""
 
         raise NotImplementedError
+
+    def get_count_strategy(self) -> CountStrategy:
+        """Return the cheaper way to count entries matching the filtering."""
+
+        return CountStrategy.SEPARATE
@@ -4,6 +4,8 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
+
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi.responses import Response
@@ -11,6 +13,7 @@ from fastapi.responses import Response
 from notification.components.health.db_checker import DBChecker
 from notification.components.health.dependencies import get_db_checker
 from notification.logger import logger
+from notification.metrics import metrics_registry
 
 router = APIRouter(prefix='/health', tags=['Health'])
 
@@ -30,3 +33,10 @@ async def get_db_status(db_checker: DBChecker = Depends(get_db_checker)) -> Resp
         response = Response(status_code=503)
 
     return response
+
+
+@router.get('/metrics', summary='Runtime metrics of service components.')
+async def get_metrics() -> dict[str, dict[str, Any]]:
+    """Return current metrics collected from all registered service components."""
+
+    return metrics_registry.collect()
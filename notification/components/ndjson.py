@@ -0,0 +1,25 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Split stream of byte chunks into lines keeping in memory only the last incomplete line."""
+
+    pending = b''
+
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line
+
+    if pending:
+        yield pending
@@ -6,6 +6,8 @@
 
 from notification.components.notification.models import CopyRequestNotification
 from notification.components.notification.models import MaintenanceNotification
+from notification.components.notification.models import NotificationRead
+from notification.components.notification.models import NotificationReadMarker
 from notification.components.notification.models import NotificationType
 from notification.components.notification.models import PipelineNotification
 from notification.components.notification.models import ProjectNotification
@@ -18,6 +20,8 @@ __all__ = [
     'ProjectNotification',
     'RoleChangeNotification',
     'MaintenanceNotification',
+    'NotificationRead',
+    'NotificationReadMarker',
     'NotificationType',
     'notification_router',
 ]
@@ -0,0 +1,83 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import Iterable
+
+from notification.components.cache import VersionedCache
+from notification.components.notification.filtering import UserNotificationFiltering
+from notification.components.notification.models import Notification
+from notification.components.notification.models import NotificationType
+from notification.components.notification.schemas import NotificationCreateSchema
+from notification.components.pagination import Pagination
+from notification.components.sorting import Sorting
+
+ALL_PROJECTS_FEED = 'projects'
+MAINTENANCE_FEED = 'maintenance'
+
+
+def get_user_feed(username: str) -> str:
+    return f'user:{username}'
+
+
+def get_project_feed(project_code: str) -> str:
+    return f'project:{project_code}'
+
+
+def get_entry_feeds(entry: NotificationCreateSchema | Notification) -> set[str]:
+    """Return feeds which include the notification."""
+
+    if entry.type is NotificationType.MAINTENANCE:
+        return {MAINTENANCE_FEED}
+
+    if entry.type is NotificationType.PROJECT:
+        return {get_project_feed(entry.project_code), ALL_PROJECTS_FEED}
+
+    return {get_user_feed(entry.recipient_username)}
+
+
+def get_filtering_feeds(filtering: UserNotificationFiltering) -> list[str]:
+    """Return feeds which include notifications available for user according to the filtering."""
+
+    feeds = [get_user_feed(filtering.recipient_username), MAINTENANCE_FEED]
+    if filtering.project_code_any:
+        feeds.extend(get_project_feed(project_code) for project_code in sorted(filtering.project_code_any))
+    else:
+        feeds.append(ALL_PROJECTS_FEED)
+
+    return feeds
+
+
+class NotificationFeedCache(VersionedCache):
+    """Cache serialised pages of user notifications feed.
+
+    Page depends on versions of the user feed, feeds of requested projects (or all projects feed) and maintenance
+    feed, which are incremented when notifications are written into them. Page key also includes the validator read
+    from the database, so a page cached before its feeds were invalidated, or by another process with its own
+    versions, is never returned for the current state of the feed.
+    """
+
+    async def get_page_key(
+        self, filtering: UserNotificationFiltering, sorting: Sorting, pagination: Pagination, validator: str
+    ) -> str:
+        feeds = get_filtering_feeds(filtering)
+
+        parameters = {
+            'validator': validator,
+            'filtering': filtering.dict() | {'project_code_any': sorted(filtering.project_code_any)},
+            'sorting': sorting.dict(),
+            'pagination': pagination.dict(),
+        }
+
+        return await self.get_key(parameters, feeds)
+
+    async def invalidate_entries(self, entries: Iterable[NotificationCreateSchema]) -> None:
+        """Increment versions of feeds which include the notifications."""
+
+        feeds = set()
+        for entry in entries:
+            feeds.update(get_entry_feeds(entry))
+
+        await self.invalidate(feeds)
@@ -4,15 +4,93 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import json
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
 from uuid import UUID
+from uuid import uuid4
 
+from sqlalchemy import TEXT
+from sqlalchemy import case
+from sqlalchemy import cast
 from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import literal
+from sqlalchemy import literal_column
+from sqlalchemy import or_
+from sqlalchemy import union_all
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.util import AliasedClass
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.sql import CompoundSelect
+from sqlalchemy.sql import Insert
+from sqlalchemy.sql import Select
 
 from notification.components.announcement.models import Announcement
 from notification.components.crud import CRUD
+from notification.components.exceptions import AlreadyExists
+from notification.components.exceptions import NotFound
+from notification.components.filtering import Filtering
+from notification.components.filtering import any_of
+from notification.components.models import ModelList
+from notification.components.notification.cache import MAINTENANCE_FEED
+from notification.components.notification.cache import NotificationFeedCache
+from notification.components.notification.cache import get_entry_feeds
+from notification.components.notification.cache import get_user_feed
+from notification.components.notification.filtering import UserFeedEngine
+from notification.components.notification.filtering import UserNotificationFiltering
 from notification.components.notification.models import MaintenanceNotification
 from notification.components.notification.models import Notification
+from notification.components.notification.models import NotificationRead
+from notification.components.notification.models import NotificationReadMarker
 from notification.components.notification.schemas import MaintenanceNotificationCreateSchema
+from notification.components.notification.schemas import NotificationCreateSchema
+from notification.components.pagination import CountStrategy
+from notification.components.pagination import Page
+from notification.components.pagination import Pagination
+from notification.components.pagination import TotalMode
+from notification.components.query_budget import QueryBudget
+from notification.components.query_log import SlowQueryLog
+from notification.components.sorting import Sorting
+from notification.components.sorting import SortingOrder
+
+NOTIFY_IDS_PER_PAYLOAD = 200  # NOTIFY payload has to be shorter than 8000 bytes
+DEFAULT_FEED_SORTING = Sorting(field='created_at', order=SortingOrder.DESC)
+EXPORT_COLUMNS = ('id', 'type', 'created_at', 'recipient_username', 'project_code', 'announcement_id', 'data')
+
+
+def format_created_at(created_at: ColumnElement) -> ColumnElement:
+    """Format creation time as ISO 8601 string in UTC regardless of the session time zone.
+
+    Microseconds are left out when they are zero, the same way as by datetime.isoformat() used for response schemas.
+    """
+
+    created_at = func.timezone('UTC', created_at)
+    microseconds = case(
+        (func.date_trunc('second', created_at) == created_at, ''), else_=func.to_char(created_at, '.US', type_=TEXT)
+    )
+
+    return func.to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS', type_=TEXT) + microseconds + '+00:00'
+
+
+def build_jsonb_object(**columns: ColumnElement) -> ColumnElement:
+    """Create jsonb_build_object expression from named columns.
+
+    Keys are rendered inline, because the database cannot determine types of variadic arguments passed as parameters.
+    """
+
+    arguments = []
+    for name, column in columns.items():
+        arguments.extend([literal_column(f"'{name}'"), column])
+
+    return func.jsonb_build_object(*arguments, type_=postgresql.JSONB)
 
 
 class NotificationCRUD(CRUD):
@@ -20,6 +98,343 @@ class NotificationCRUD(CRUD):
 
     model = Notification
 
+    def __init__(
+        self,
+        db_session: AsyncSession,
+        *,
+        user_feed_engine: UserFeedEngine = UserFeedEngine.OR,
+        feed_cache: NotificationFeedCache | None = None,
+        notify_channel: str | None = None,
+        query_budget: QueryBudget | None = None,
+        slow_query_log: SlowQueryLog | None = None,
+    ) -> None:
+        super().__init__(db_session, query_budget=query_budget, slow_query_log=slow_query_log)
+
+        self.user_feed_engine = user_feed_engine
+        self.feed_cache = feed_cache
+        self.notify_channel = notify_channel
+        self.changed_feeds: set[str] = set()
+        self.created_ids: list[UUID] = []
+
+    async def commit(self) -> None:
+        """Commit current transaction and invalidate cached pages of feeds changed within it.
+
+        Ids of created notifications are published before commit, because NOTIFY is delivered to listeners only when
+        the transaction is committed.
+        """
+
+        if self.notify_channel and self.created_ids:
+            await self._publish_created()
+
+        await super().commit()
+
+        if self.feed_cache and self.changed_feeds:
+            await self.feed_cache.invalidate(self.changed_feeds)
+        self.changed_feeds = set()
+        self.created_ids = []
+
+    @property
+    def insert_query(self) -> Insert:
+        """Create base insert that skips notifications with already existing idempotency key."""
+
+        return postgresql.insert(self.model).on_conflict_do_nothing(index_elements=[self.model.idempotency_key])
+
+    async def create(self, entry_create: NotificationCreateSchema, **kwds: Any) -> Notification:
+        """Create a new notification or return the existing one with the same idempotency key."""
+
+        self.changed_feeds.update(get_entry_feeds(entry_create))
+
+        try:
+            entry = await super().create(entry_create, **kwds)
+        except NotFound:
+            if entry_create.idempotency_key is None:
+                raise
+            return await self.retrieve_by_idempotency_key(entry_create.idempotency_key)
+
+        self.created_ids.append(entry.id)
+
+        return entry
+
+    async def ingest(
+        self, entries_create: Sequence[NotificationCreateSchema], *, chunk_size: int, copy_threshold: int
+    ) -> None:
+        """Create multiple notifications using COPY for large batches and multi-row insert for the rest.
+
+        COPY does not support conflict handling, so notifications with idempotency key always use multi-row insert.
+        """
+
+        entries_to_copy = []
+        entries_to_insert = []
+        for entry_create in entries_create:
+            if entry_create.idempotency_key is None:
+                entries_to_copy.append(entry_create)
+            else:
+                entries_to_insert.append(entry_create)
+
+        if len(entries_to_copy) < copy_threshold:
+            entries_to_insert, entries_to_copy = list(entries_create), []
+
+        if entries_to_copy:
+            await self.copy_create(entries_to_copy)
+
+        if entries_to_insert:
+            await self.bulk_create(entries_to_insert, chunk_size=chunk_size)
+
+    async def bulk_create(
+        self,
+        entries_create: Sequence[NotificationCreateSchema],
+        *,
+        chunk_size: int,
+        returning: bool = False,
+        **kwds: Any,
+    ) -> ModelList[Notification] | None:
+        """Create multiple notifications using one multi-row insert statement per chunk of notifications."""
+
+        for entry_create in entries_create:
+            self.changed_feeds.update(get_entry_feeds(entry_create))
+
+        entries = await super().bulk_create(entries_create, chunk_size=chunk_size, returning=returning, **kwds)
+        if entries is not None:
+            self.created_ids.extend(entries.get_field_values('id'))
+
+        return entries
+
+    async def copy_create(self, entries_create: Sequence[NotificationCreateSchema]) -> None:
+        """Create multiple notifications using binary COPY protocol.
+
+        Column defaults are not applied by COPY, so primary keys are generated in place and creation time is taken from
+        the database once per batch, the same way as the column default does for other inserts.
+        """
+
+        for entry_create in entries_create:
+            self.changed_feeds.update(get_entry_feeds(entry_create))
+
+        columns = [column.name for column in self.model.__table__.columns]
+        created_at = (await self.scalars(select(func.now()))).one()
+
+        records = []
+        for entry_create in entries_create:
+            values = {'id': uuid4(), 'created_at': created_at} | entry_create.dict()
+            values['data'] = json.dumps(values['data'])
+            records.append(tuple(values.get(column) for column in columns))
+            self.created_ids.append(values['id'])
+
+        await self._copy_many(records, columns)
+
+    async def _create_many(self, statement: Insert) -> None:
+        """Execute a statement to create multiple notifications remembering ids of inserted ones for publishing.
+
+        Notifications skipped because of existing idempotency key are not returned by the statement.
+        """
+
+        if not self.notify_channel:
+            await super()._create_many(statement)
+            return
+
+        try:
+            result = await self.execute(statement.returning(self.model.id))
+        except IntegrityError:
+            raise AlreadyExists()
+
+        self.created_ids.extend(result.scalars())
+
+    async def _publish_created(self) -> None:
+        """Send ids of created notifications through NOTIFY splitting them into payloads below the size limit."""
+
+        payloads = [
+            ','.join(str(id_) for id_ in self.created_ids[start : start + NOTIFY_IDS_PER_PAYLOAD])
+            for start in range(0, len(self.created_ids), NOTIFY_IDS_PER_PAYLOAD)
+        ]
+        payload = func.unnest(literal(payloads, postgresql.ARRAY(TEXT))).table_valued('payload')
+        statement = select(func.pg_notify(self.notify_channel, payload.c.payload))
+
+        await self.execute(statement)
+
+    def _uses_union_feed(self, filtering: Filtering | None) -> bool:
+        return isinstance(filtering, UserNotificationFiltering) and self.user_feed_engine is UserFeedEngine.UNION
+
+    def _get_count_strategy(self, pagination: Pagination, filtering: Filtering | None) -> CountStrategy:
+        """Always count user feed separately with union engine, because its page statement does not see all entries."""
+
+        if self._uses_union_feed(filtering):
+            return CountStrategy.SEPARATE
+
+        return super()._get_count_strategy(pagination, filtering)
+
+    def _build_count_source_statement(
+        self, filtering: Filtering | None, *columns: ColumnElement
+    ) -> Select | CompoundSelect:
+        if not self._uses_union_feed(filtering):
+            return super()._build_count_source_statement(filtering, *columns)
+
+        columns = columns or (self.model.id,)
+
+        return union_all(*[select(*columns).where(branch) for branch in filtering.get_branches(self.model)])
+
+    def _build_entries_statement(
+        self, pagination: Pagination, sorting: Sorting | None, filtering: Filtering | None
+    ) -> Select:
+        """Create statement which selects entries for the page.
+
+        With union engine each user feed branch selects only as many entries as needed to fill the page, so the cost
+        of the first pages depends on the page size rather than on the number of notifications user has. Branches and
+        the page are ordered by creation time when sorting is not specified, since the first entries of unordered
+        branches are not the first entries of the feed. Id breaks ties, so pages do not overlap.
+        """
+
+        if not self._uses_union_feed(filtering):
+            return super()._build_entries_statement(pagination, sorting, filtering)
+
+        if not sorting:
+            sorting = DEFAULT_FEED_SORTING
+
+        branches = []
+        for branch in filtering.get_branches(self.model):
+            statement = self.select_query.where(branch).limit(pagination.limit + pagination.offset)
+            branches.append(sorting.apply(statement, self.model).order_by(self.model.id))
+
+        entity = aliased(self.model, union_all(*branches).subquery())
+        statement = select(entity).limit(pagination.limit).offset(pagination.offset)
+
+        return sorting.apply(statement, entity).order_by(entity.id)
+
+    async def paginate_json(
+        self, pagination: Pagination, sorting: Sorting | None = None, filtering: Filtering | None = None
+    ) -> Page:
+        """Get page of notifications serialised into JSON documents by the database.
+
+        Entries of the page are strings built from columns and stored data, which already has the shape of the
+        response, so neither models nor schemas are created. Entries and total number of entries are selected the same
+        way as by regular pagination.
+        """
+
+        return await self._paginate(pagination, sorting, filtering, build_column=self._build_json_document)
+
+    async def export_json(
+        self, sorting: Sorting | None = None, filtering: Filtering | None = None, *, chunk_size: int
+    ) -> AsyncIterator[list[str]]:
+        """Yield all notifications matching the filtering serialised into JSON documents in chunks."""
+
+        statement = self._build_export_statement(sorting, filtering).with_only_columns(
+            self._build_json_document(self.model)
+        )
+
+        async for rows in self._stream_many(statement, chunk_size=chunk_size):
+            yield [row[0] for row in rows]
+
+    async def export_rows(
+        self, sorting: Sorting | None = None, filtering: Filtering | None = None, *, chunk_size: int
+    ) -> AsyncIterator[list[Row]]:
+        """Yield all notifications matching the filtering as rows of text values of export columns in chunks.
+
+        Fields stored in data are kept together as one JSON document, because they differ between notification types.
+        """
+
+        columns = {
+            'id': cast(self.model.id, TEXT),
+            'type': cast(self.model.type, TEXT),
+            'created_at': format_created_at(self.model.created_at),
+            'recipient_username': self.model.recipient_username,
+            'project_code': self.model.project_code,
+            'announcement_id': cast(self.model.announcement_id, TEXT),
+            'data': cast(self.model.data, TEXT),
+        }
+        statement = self._build_export_statement(sorting, filtering).with_only_columns(
+            *[columns[name].label(name) for name in EXPORT_COLUMNS]
+        )
+
+        async for rows in self._stream_many(statement, chunk_size=chunk_size):
+            yield rows
+
+    def _build_export_statement(self, sorting: Sorting | None, filtering: Filtering | None) -> Select:
+        """Create statement which selects all entries matching the filtering without pagination."""
+
+        statement = self.select_query
+        if sorting:
+            statement = sorting.apply(statement, self.model)
+        if filtering:
+            statement = filtering.apply(statement, self.model)
+
+        return statement
+
+    def _build_json_document(self, entity: type[Notification] | AliasedClass) -> ColumnElement:
+        """Create expression which serialises notification into JSON text matching its response schema.
+
+        Stored data holds all fields which are not columns, so only columns are added to it. Columns without value
+        are not part of the response schema of the notification type and are left out.
+        """
+
+        columns = build_jsonb_object(id=entity.id, type=entity.type, created_at=format_created_at(entity.created_at))
+        optional_columns = func.jsonb_strip_nulls(
+            build_jsonb_object(
+                recipient_username=entity.recipient_username,
+                project_code=entity.project_code,
+                announcement_id=entity.announcement_id,
+            ),
+            type_=postgresql.JSONB,
+        )
+        document = columns.op('||', return_type=postgresql.JSONB)(optional_columns)
+        document = document.op('||', return_type=postgresql.JSONB)(entity.data)
+
+        return cast(document, TEXT)
+
+    async def mark_as_read(self, filtering: UserNotificationFiltering, notification_ids: Sequence[UUID]) -> None:
+        """Mark notifications of the user feed as read skipping unknown, already read and other users notifications."""
+
+        username = filtering.recipient_username
+        self.changed_feeds.add(get_user_feed(username))
+
+        feed_branches = filtering.copy(update={'unread': False}).get_branches(self.model)
+        source_statement = select(literal(username), self.model.id, func.now()).where(
+            any_of(self.model.id, notification_ids), or_(*feed_branches)
+        )
+        statement = (
+            postgresql.insert(NotificationRead)
+            .from_select(['username', 'notification_id', 'read_at'], source_statement)
+            .on_conflict_do_nothing(index_elements=[NotificationRead.username, NotificationRead.notification_id])
+        )
+
+        await self.execute(statement)
+
+    async def mark_all_as_read(self, username: str, read_until: datetime | None = None) -> None:
+        """Move user read marker forward and remove reads of notifications which are covered by the marker now."""
+
+        self.changed_feeds.add(get_user_feed(username))
+
+        statement = postgresql.insert(NotificationReadMarker).values(
+            username=username, read_until=read_until or func.now()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[NotificationReadMarker.username],
+            set_={'read_until': func.greatest(NotificationReadMarker.read_until, statement.excluded.read_until)},
+        )
+        await self.execute(statement)
+
+        read_until = (
+            select(NotificationReadMarker.read_until)
+            .where(NotificationReadMarker.username == username)
+            .scalar_subquery()
+        )
+        statement = delete(NotificationRead).where(
+            NotificationRead.username == username,
+            NotificationRead.notification_id == self.model.id,
+            self.model.created_at <= read_until,
+        )
+        await self.execute(statement)
+
+    async def count_unread(self, filtering: UserNotificationFiltering, cap: int) -> tuple[int, TotalMode]:
+        """Count notifications user has not read yet up to the cap.
+
+        Only notifications newer than the user read marker are counted and counting stops at the cap, so the cost does
+        not depend on the size of the user feed. Feed indexes include columns needed by the count, so it is answered by
+        index-only scans. Users who have never marked everything as read have no marker, so up to the cap of their
+        newest notifications are visited on every count, plus the ones read one by one which are skipped.
+        """
+
+        filtering = filtering.copy(update={'unread': True})
+
+        return await self._count(TotalMode.CAPPED, cap, filtering)
+
     async def create_from_announcement(self, announcement: Announcement) -> MaintenanceNotification:
         """Create maintenance notification from announcement."""
 
@@ -32,19 +447,28 @@ class NotificationCRUD(CRUD):
             )
         )
 
+    async def retrieve_by_idempotency_key(self, idempotency_key: str) -> Notification:
+        """Get existing notification by idempotency key."""
+
+        statement = self.select_query.where(self.model.idempotency_key == idempotency_key)
+
+        return await self._retrieve_one(statement)
+
     async def retrieve_by_announcement_id(self, announcement_id: UUID) -> MaintenanceNotification:
         """Get existing maintenance notification by announcement id."""
 
-        statement = self.select_query.where(self.model.data.contains({'announcement_id': str(announcement_id)}))
+        statement = self.select_query.where(self.model.announcement_id == announcement_id)
 
         return await self._retrieve_one(statement)
 
     async def delete_by_announcement_id(self, announcement_id: UUID) -> None:
         """Remove existing maintenance notification by announcement id."""
 
+        self.changed_feeds.add(MAINTENANCE_FEED)
+
         statement = (
             delete(self.model)
-            .where(self.model.data.contains({'announcement_id': str(announcement_id)}))
+            .where(self.model.announcement_id == announcement_id)
             .execution_options(synchronize_session='fetch')
         )
 
@@ -4,14 +4,212 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from collections.abc import AsyncIterator
+
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from notification.components.cache import LocalCacheBackend
+from notification.components.cache import RedisCacheBackend
+from notification.components.notification.cache import NotificationFeedCache
 from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import UserFeedEngine
+from notification.components.notification.ingest_queue import NotificationIngestQueue
+from notification.components.notification.stream import NotificationStream
+from notification.components.query_budget import QueryBudget
+from notification.components.query_budget import get_request_query_budget
+from notification.components.query_log import SlowQueryLog
+from notification.components.query_log import get_slow_query_log
+from notification.config import Settings
+from notification.config import get_settings
+from notification.dependencies import create_db_session
+from notification.dependencies import get_db_engine
 from notification.dependencies import get_db_session
+from notification.logger import logger
+from notification.metrics import metrics_registry
+
+
+class GetNotificationFeedCache:
+    """Create a FastAPI callable dependency for NotificationFeedCache single instance.
+
+    The instance exists only when the feed cache is enabled and started.
+    """
+
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def start(self, settings: Settings) -> None:
+        """Create an instance of NotificationFeedCache class with configured backend.
+
+        Local backend keeps feed versions per process, so with several workers writes handled by one worker do not
+        invalidate pages cached by others. Such pages are not returned, because page keys include the database
+        validator, but they are kept until they expire, so shared Redis backend is preferred for several workers.
+        """
+
+        if settings.NOTIFICATIONS_FEED_CACHE_BACKEND == 'redis':
+            backend = RedisCacheBackend(settings.NOTIFICATIONS_FEED_CACHE_REDIS_URL)
+        else:
+            if settings.WORKERS > 1:
+                logger.warning('Local feed cache backend is not shared between workers, use Redis backend instead.')
+            backend = LocalCacheBackend(max_bytes=settings.NOTIFICATIONS_FEED_CACHE_MAX_BYTES)
+
+        self.instance = NotificationFeedCache(
+            backend, namespace=f'{settings.APP_NAME}:feed', ttl=settings.NOTIFICATIONS_FEED_CACHE_TTL
+        )
+        metrics_registry.register('notification_feed_cache', self.instance.get_metrics)
+
+    async def stop(self) -> None:
+        """Release resources of the instance and remove it."""
+
+        if not self.instance:
+            return
+
+        await self.instance.close()
+        metrics_registry.unregister('notification_feed_cache')
+        self.instance = None
+
+    async def __call__(self) -> NotificationFeedCache | None:
+        """Return an instance of NotificationFeedCache class when it is enabled."""
 
+        return self.instance
 
-def get_notification_crud(db_session: AsyncSession = Depends(get_db_session)) -> NotificationCRUD:
+
+get_notification_feed_cache = GetNotificationFeedCache()
+
+
+def get_notification_crud(
+    db_session: AsyncSession = Depends(get_db_session),
+    settings: Settings = Depends(get_settings),
+    feed_cache: NotificationFeedCache | None = Depends(get_notification_feed_cache),
+    query_budget: QueryBudget | None = Depends(get_request_query_budget),
+    slow_query_log: SlowQueryLog | None = Depends(get_slow_query_log),
+) -> NotificationCRUD:
     """Return an instance of NotificationCRUD as a dependency."""
 
-    return NotificationCRUD(db_session)
+    return NotificationCRUD(
+        db_session,
+        user_feed_engine=UserFeedEngine(settings.NOTIFICATIONS_USER_FEED_ENGINE),
+        feed_cache=feed_cache,
+        notify_channel=get_notify_channel(settings),
+        query_budget=query_budget,
+        slow_query_log=slow_query_log,
+    )
+
+
+def get_notify_channel(settings: Settings) -> str | None:
+    """Return channel for publishing created notifications when notification stream is enabled."""
+
+    if not settings.NOTIFICATIONS_STREAM_ENABLED:
+        return None
+
+    return settings.NOTIFICATIONS_STREAM_CHANNEL
+
+
+class GetNotificationIngestQueue:
+    """Create a FastAPI callable dependency for NotificationIngestQueue single instance.
+
+    The instance exists only when the ingest queue is enabled and started.
+    """
+
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def start(
+        self, settings: Settings, engine: AsyncEngine, feed_cache: NotificationFeedCache | None = None
+    ) -> None:
+        """Create and start an instance of NotificationIngestQueue class."""
+
+        self.instance = NotificationIngestQueue(
+            engine,
+            max_size=settings.NOTIFICATIONS_INGEST_QUEUE_MAX_SIZE,
+            batch_size=settings.NOTIFICATIONS_INGEST_QUEUE_BATCH_SIZE,
+            flush_interval=settings.NOTIFICATIONS_INGEST_QUEUE_FLUSH_INTERVAL,
+            chunk_size=settings.NOTIFICATIONS_BULK_CREATE_CHUNK_SIZE,
+            copy_threshold=settings.NOTIFICATIONS_COPY_THRESHOLD,
+            max_retries=settings.NOTIFICATIONS_INGEST_QUEUE_MAX_RETRIES,
+            retry_backoff=settings.NOTIFICATIONS_INGEST_QUEUE_RETRY_BACKOFF,
+            feed_cache=feed_cache,
+            notify_channel=get_notify_channel(settings),
+        )
+        await self.instance.start()
+        metrics_registry.register('notification_ingest_queue', self.instance.get_metrics)
+
+    async def stop(self) -> None:
+        """Stop and remove the instance after flushing all queued entries."""
+
+        if not self.instance:
+            return
+
+        await self.instance.stop()
+        metrics_registry.unregister('notification_ingest_queue')
+        self.instance = None
+
+    async def __call__(self) -> NotificationIngestQueue | None:
+        """Return an instance of NotificationIngestQueue class when it is enabled."""
+
+        return self.instance
+
+
+get_notification_ingest_queue = GetNotificationIngestQueue()
+
+
+async def get_notification_writer(
+    ingest_queue: NotificationIngestQueue | None = Depends(get_notification_ingest_queue),
+    engine: AsyncEngine = Depends(get_db_engine),
+    settings: Settings = Depends(get_settings),
+    feed_cache: NotificationFeedCache | None = Depends(get_notification_feed_cache),
+    query_budget: QueryBudget | None = Depends(get_request_query_budget),
+    slow_query_log: SlowQueryLog | None = Depends(get_slow_query_log),
+) -> AsyncIterator[NotificationIngestQueue | NotificationCRUD]:
+    """Return the ingest queue when it is enabled, otherwise an instance of NotificationCRUD as a dependency.
+
+    Database session is created only when notifications are written directly, so queued requests do not open one.
+    """
+
+    if ingest_queue:
+        yield ingest_queue
+        return
+
+    db_session = create_db_session(engine)
+    try:
+        yield get_notification_crud(db_session, settings, feed_cache, query_budget, slow_query_log)
+    finally:
+        await db_session.close()
+
+
+class GetNotificationStream:
+    """Create a FastAPI callable dependency for NotificationStream single instance.
+
+    The instance exists only when the notification stream is enabled and started.
+    """
+
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def start(self, settings: Settings, engine: AsyncEngine) -> None:
+        """Create an instance of NotificationStream class and start listening for created notifications."""
+
+        self.instance = NotificationStream(
+            engine, channel=settings.NOTIFICATIONS_STREAM_CHANNEL, queue_size=settings.NOTIFICATIONS_STREAM_QUEUE_SIZE
+        )
+        await self.instance.start()
+        metrics_registry.register('notification_stream', self.instance.get_metrics)
+
+    async def stop(self) -> None:
+        """Stop listening and close all subscriptions."""
+
+        if not self.instance:
+            return
+
+        await self.instance.stop()
+        metrics_registry.unregister('notification_stream')
+        self.instance = None
+
+    async def __call__(self) -> NotificationStream | None:
+        """Return an instance of NotificationStream class when it is enabled."""
+
+        return self.instance
+
+
+get_notification_stream = GetNotificationStream()
@@ -0,0 +1,81 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import csv
+import io
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
+from contextlib import aclosing
+
+from notification.components.ndjson import NDJSON_MEDIA_TYPE
+from notification.components.notification.crud import EXPORT_COLUMNS
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import NotificationFiltering
+from notification.components.sorting import Sorting
+from notification.components.types import StrEnum
+
+CSV_MEDIA_TYPE = 'text/csv'
+
+
+class ExportFormat(StrEnum):
+    """Available formats of notifications export."""
+
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+    @property
+    def media_type(self) -> str:
+        if self is ExportFormat.CSV:
+            return CSV_MEDIA_TYPE
+
+        return NDJSON_MEDIA_TYPE
+
+
+async def iter_ndjson(chunks: AsyncIterator[list[str]]) -> AsyncIterator[bytes]:
+    """Join each chunk of JSON documents into lines."""
+
+    async with aclosing(chunks):
+        async for documents in chunks:
+            yield ''.join(f'{document}\n' for document in documents).encode()
+
+
+async def iter_csv(
+    header: Sequence[str], chunks: AsyncIterator[Sequence[Sequence[str | None]]]
+) -> AsyncIterator[bytes]:
+    """Write header and each chunk of rows as CSV lines.
+
+    Header is sent before the first chunk is read, so the client receives data right away.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(header)
+    yield buffer.getvalue().encode()
+
+    async with aclosing(chunks):
+        async for rows in chunks:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+
+
+def iter_export(
+    notification_crud: NotificationCRUD,
+    export_format: ExportFormat,
+    sorting: Sorting,
+    filtering: NotificationFiltering,
+    *,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    """Return stream of notifications in the export format read from server-side cursor in chunks."""
+
+    if export_format is ExportFormat.CSV:
+        chunks = notification_crud.export_rows(sorting, filtering, chunk_size=chunk_size)
+        return iter_csv(EXPORT_COLUMNS, chunks)
+
+    return iter_ndjson(notification_crud.export_json(sorting, filtering, chunk_size=chunk_size))
@@ -9,12 +9,23 @@ from datetime import datetime
 from pydantic import Field
 from pydantic import conset
 from sqlalchemy import and_
+from sqlalchemy import cast
+from sqlalchemy import func
+from sqlalchemy import not_
 from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.future import select
+from sqlalchemy.sql import ColumnElement
 from sqlalchemy.sql import Select
 
 from notification.components.filtering import Filtering
+from notification.components.filtering import any_of
 from notification.components.notification.models import Notification
+from notification.components.notification.models import NotificationRead
+from notification.components.notification.models import NotificationReadMarker
 from notification.components.notification.models import NotificationType
+from notification.components.pagination import CountStrategy
+from notification.components.types import StrEnum
 
 
 class NotificationFiltering(Filtering):
@@ -39,7 +50,7 @@ class NotificationFiltering(Filtering):
             statement = statement.where(where_clause)
 
         if self.project_code_any:
-            statement = statement.where(model.project_code.in_(self.project_code_any))
+            statement = statement.where(any_of(model.project_code, self.project_code_any))
 
         if self.created_at_start:
             statement = statement.where(model.created_at >= self.created_at_start)
@@ -49,6 +60,25 @@ class NotificationFiltering(Filtering):
 
         return statement
 
+    def get_count_strategy(self) -> CountStrategy:
+        """Use window count when filtering by recipient, which narrows entries down to a small set."""
+
+        if self.recipient_username:
+            return CountStrategy.WINDOW
+
+        return CountStrategy.SEPARATE
+
+
+class UserFeedEngine(StrEnum):
+    """Available ways to query user notifications feed.
+
+    Or engine filters notifications with one condition. Union engine queries each condition separately and merges
+    results with UNION ALL, so every part can use index-ordered scan.
+    """
+
+    OR = 'or'
+    UNION = 'union'
+
 
 class UserNotificationFiltering(Filtering):
     """Notifications filtering control parameters.
@@ -58,21 +88,53 @@ class UserNotificationFiltering(Filtering):
 
     recipient_username: str
     project_code_any: conset(str, min_items=0)
+    unread: bool = False
 
-    def apply(self, statement: Select, model: type[Notification]) -> Select:
-        """Return statement with applied filtering."""
+    def get_branches(self, model: type[Notification]) -> list[ColumnElement]:
+        """Return mutually exclusive conditions which together match all notifications user is allowed to access."""
 
         recipient_bind_types = {NotificationType.PIPELINE, NotificationType.COPY_REQUEST, NotificationType.ROLE_CHANGE}
 
-        statement = statement.where(
-            or_(
-                and_(model.type.in_(recipient_bind_types), model.recipient_username == self.recipient_username),
-                and_(
-                    model.type == NotificationType.PROJECT,
-                    or_(not self.project_code_any, model.project_code.in_(self.project_code_any)),
-                ),
-                and_(model.type == NotificationType.MAINTENANCE),
-            )
+        branches = [
+            and_(model.type.in_(recipient_bind_types), model.recipient_username == self.recipient_username),
+            and_(
+                model.type == NotificationType.PROJECT,
+                or_(not self.project_code_any, any_of(model.project_code, self.project_code_any)),
+            ),
+            and_(model.type == NotificationType.MAINTENANCE),
+        ]
+
+        if self.unread:
+            unread_condition = self.get_unread_condition(model)
+            branches = [and_(branch, unread_condition) for branch in branches]
+
+        return branches
+
+    def get_unread_condition(self, model: type[Notification]) -> ColumnElement:
+        """Return condition matching notifications created after user read marker and not read one by one.
+
+        Read marker bounds the created_at index range, so only notifications newer than the marker are visited.
+        """
+
+        read_until = (
+            select(NotificationReadMarker.read_until)
+            .where(NotificationReadMarker.username == self.recipient_username)
+            .scalar_subquery()
+        )
+        is_read = (
+            select(NotificationRead.notification_id)
+            .where(NotificationRead.username == self.recipient_username, NotificationRead.notification_id == model.id)
+            .exists()
         )
 
+        return and_(
+            model.created_at > func.coalesce(read_until, cast('-infinity', TIMESTAMP(timezone=True))),
+            not_(is_read),
+        )
+
+    def apply(self, statement: Select, model: type[Notification]) -> Select:
+        """Return statement with applied filtering."""
+
+        statement = statement.where(or_(*self.get_branches(model)))
+
         return statement
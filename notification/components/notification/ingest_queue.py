@@ -0,0 +1,228 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import time
+from contextlib import suppress
+from typing import Any
+
+from asyncpg.exceptions import InsufficientResourcesError
+from asyncpg.exceptions import InterfaceError as DriverInterfaceError
+from asyncpg.exceptions import OperatorInterventionError
+from asyncpg.exceptions import PostgresConnectionError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import InterfaceError
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from notification.components.exceptions import IngestQueueFull
+from notification.components.notification.cache import NotificationFeedCache
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.schemas import NotificationCreateSchema
+from notification.logger import logger
+
+TRANSIENT_ERRORS = (
+    OperationalError,
+    InterfaceError,
+    PoolTimeoutError,
+    PostgresConnectionError,
+    DriverInterfaceError,
+    InsufficientResourcesError,
+    OperatorInterventionError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Return True when writing may succeed once the connection or the database recovers."""
+
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class NotificationIngestQueue:
+    """Buffer notifications in memory and write them into the database in batches.
+
+    A batch is flushed when it reaches the batch size or when the flush interval is over. Entries are already accepted
+    when they are queued, so transient errors are retried with exponential backoff and when the database rejects the
+    batch, entries are written one by one and only the rejected ones are dropped. Batch may be written again when the
+    connection is lost during commit, so entries are written at least once.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        chunk_size: int,
+        copy_threshold: int,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+        feed_cache: NotificationFeedCache | None = None,
+        notify_channel: str | None = None,
+    ) -> None:
+        self.engine = engine
+        self.feed_cache = feed_cache
+        self.notify_channel = notify_channel
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.chunk_size = chunk_size
+        self.copy_threshold = copy_threshold
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self.queue: asyncio.Queue[NotificationCreateSchema] = asyncio.Queue(max_size)
+        self.batch: list[NotificationCreateSchema] = []
+        self.writer: asyncio.Task | None = None
+        self.closing = False
+
+        self.flushes = 0
+        self.flushed_entries = 0
+        self.failed_entries = 0
+        self.retries = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Number of entries waiting to be written."""
+
+        return self.queue.qsize() + len(self.batch)
+
+    def put(self, entries: list[NotificationCreateSchema]) -> None:
+        """Put all entries into the queue or none of them when there is not enough space."""
+
+        if self.closing:
+            raise IngestQueueFull()
+
+        if self.queue.maxsize > 0 and self.queue.maxsize - self.queue.qsize() < len(entries):
+            raise IngestQueueFull()
+
+        for entry in entries:
+            self.queue.put_nowait(entry)
+
+    async def start(self) -> None:
+        """Start background writer."""
+
+        self.closing = False
+        self.writer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting new entries and wait until background writer flushes everything left in the queue."""
+
+        self.closing = True
+
+        if self.writer is not None:
+            await self.writer
+            self.writer = None
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Return queue depth and flush statistics."""
+
+        return {
+            'depth': self.depth,
+            'max_size': self.queue.maxsize,
+            'flushes': self.flushes,
+            'flushed_entries': self.flushed_entries,
+            'failed_entries': self.failed_entries,
+            'retries': self.retries,
+            'last_flush_latency_seconds': self.last_flush_latency,
+            'max_flush_latency_seconds': self.max_flush_latency,
+        }
+
+    async def _run(self) -> None:
+        while not self.closing or self.depth:
+            await self._collect_batch()
+            if self.batch:
+                await self._flush()
+
+    async def _collect_batch(self) -> None:
+        """Fill the batch until it is full, the flush interval is over or the queue is closing and empty."""
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+
+        while len(self.batch) < self.batch_size:
+            if not self.queue.empty():
+                self.batch.append(self.queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if self.closing or timeout <= 0:
+                break
+
+            with suppress(asyncio.TimeoutError):
+                self.batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+
+    async def _flush(self) -> None:
+        """Write current batch in one transaction falling back to writing its entries one by one when it is rejected.
+
+        Entries are dropped only when the database rejects them or when transient errors persist after all retries,
+        so the writer is not stuck on them.
+        """
+
+        start = time.perf_counter()
+
+        try:
+            await self._write_with_retries(self.batch)
+        except Exception as error:
+            if is_transient_error(error):
+                logger.exception(f'Unable to write batch of {len(self.batch)} notifications from the ingest queue.')
+                self.failed_entries += len(self.batch)
+            else:
+                await self._write_one_by_one(self.batch)
+        else:
+            self.flushed_entries += len(self.batch)
+
+        self.batch = []
+        self.flushes += 1
+        self.last_flush_latency = time.perf_counter() - start
+        self.max_flush_latency = max(self.max_flush_latency, self.last_flush_latency)
+
+    async def _write_one_by_one(self, entries: list[NotificationCreateSchema]) -> None:
+        """Write each entry in its own transaction dropping entries which cannot be written."""
+
+        for entry in entries:
+            try:
+                await self._write_with_retries([entry])
+            except Exception:
+                logger.exception('Unable to write notification from the ingest queue.')
+                self.failed_entries += 1
+            else:
+                self.flushed_entries += 1
+
+    async def _write_with_retries(self, entries: list[NotificationCreateSchema]) -> None:
+        """Write entries retrying transient errors with exponentially growing delay up to the max number of retries."""
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._write(entries)
+                return
+            except Exception as error:
+                if attempt == self.max_retries or not is_transient_error(error):
+                    raise
+
+            delay = self.retry_backoff * 2**attempt
+            logger.warning(f'Unable to write notifications from the ingest queue, retrying in {delay} seconds.')
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _write(self, entries: list[NotificationCreateSchema]) -> None:
+        """Write entries in one transaction."""
+
+        async with AsyncSession(bind=self.engine, expire_on_commit=False) as session:
+            notification_crud = NotificationCRUD(
+                session, feed_cache=self.feed_cache, notify_channel=self.notify_channel
+            )
+            await notification_crud.ingest(entries, chunk_size=self.chunk_size, copy_threshold=self.copy_threshold)
+            await notification_crud.commit()
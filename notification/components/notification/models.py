@@ -11,11 +11,14 @@ from uuid import uuid4
 from pydantic import BaseModel
 from sqlalchemy import VARCHAR
 from sqlalchemy import Column
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.sql import func
+from sqlalchemy.sql import text
 
 from notification.components.db_model import DBModel
 from notification.components.types import StrEnum
@@ -88,6 +91,30 @@ class Notification(DBModel):
     """Notification database model."""
 
     __tablename__ = 'notifications'
+    __table_args__ = (
+        Index(
+            'ix_notifications_recipient_username_created_at',
+            'recipient_username',
+            'created_at',
+            postgresql_include=['type', 'id'],
+        ),
+        Index(
+            'ix_notifications_project_code_created_at_project',
+            'project_code',
+            'created_at',
+            postgresql_where=text("type = 'project'"),
+            postgresql_include=['id'],
+        ),
+        Index(
+            'ix_notifications_created_at_maintenance',
+            'created_at',
+            postgresql_where=text("type = 'maintenance'"),
+            postgresql_include=['id'],
+        ),
+        Index(
+            'ix_notifications_announcement_id', 'announcement_id', postgresql_where=text('announcement_id IS NOT NULL')
+        ),
+    )
     __mapper_args__ = {'polymorphic_on': 'type'}
 
     id = Column(postgresql.UUID(as_uuid=True), primary_key=True, default=uuid4)
@@ -97,9 +124,11 @@ class Notification(DBModel):
         index=True,
     )
     created_at = Column(TIMESTAMP(timezone=True), default=func.now(), nullable=False, index=True)
-    recipient_username = Column(VARCHAR(length=256), nullable=True, index=True)
+    recipient_username = Column(VARCHAR(length=256), nullable=True)
     project_code = Column(VARCHAR(length=32), nullable=True, index=True)
     data = Column(JSONB(), nullable=False)
+    idempotency_key = Column(VARCHAR(length=128), nullable=True, index=True, unique=True)
+    announcement_id = Column(postgresql.UUID(as_uuid=True), nullable=True)
 
 
 class PipelineNotification(Notification):
@@ -219,10 +248,6 @@ class MaintenanceNotification(Notification):
 
     __mapper_args__ = {'polymorphic_identity': NotificationType.MAINTENANCE}
 
-    @property
-    def announcement_id(self) -> UUID:
-        return UUID(self.data['announcement_id'])
-
     @property
     def effective_date(self) -> datetime:
         return datetime.fromisoformat(self.data['effective_date'])
@@ -234,3 +259,27 @@ class MaintenanceNotification(Notification):
     @property
     def message(self) -> str:
         return self.data['message']
+
+
+class NotificationReadMarker(DBModel):
+    """Notification read marker database model.
+
+    All notifications created before or at read_until moment are considered read by the user.
+    """
+
+    __tablename__ = 'notification_read_markers'
+
+    username = Column(VARCHAR(length=256), primary_key=True)
+    read_until = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
+class NotificationRead(DBModel):
+    """Notification read by the user database model."""
+
+    __tablename__ = 'notification_reads'
+
+    username = Column(VARCHAR(length=256), primary_key=True)
+    notification_id = Column(
+        postgresql.UUID(as_uuid=True), ForeignKey('notifications.id', ondelete='CASCADE'), primary_key=True, index=True
+    )
+    read_at = Column(TIMESTAMP(timezone=True), default=func.now(), nullable=False)
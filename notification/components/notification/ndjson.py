@@ -0,0 +1,74 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import json
+from collections.abc import AsyncIterable
+from typing import Any
+
+from pydantic import ValidationError
+from pydantic import parse_obj_as
+
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.schemas import NotificationCreateSchema
+from notification.components.notification.schemas import NotificationLineErrorSchema
+from notification.components.notification.schemas import NotificationNDJSONCreateResponseSchema
+from notification.components.notification.schemas import NotificationsCreateSchema
+
+
+class LineDecodeError(ValueError):
+    """Raised when line is not a valid JSON document."""
+
+    def errors(self) -> list[dict[str, Any]]:
+        return [{'loc': ('__root__',), 'msg': str(self), 'type': 'value_error.jsondecode'}]
+
+
+def parse_line(line: bytes) -> NotificationCreateSchema:
+    """Parse and validate one line as a notification."""
+
+    try:
+        obj = json.loads(line)
+    except ValueError as e:
+        raise LineDecodeError(str(e))
+
+    return parse_obj_as(NotificationsCreateSchema, obj)
+
+
+async def ingest_ndjson_lines(
+    lines: AsyncIterable[bytes], notification_crud: NotificationCRUD, *, chunk_size: int, max_reported_errors: int
+) -> NotificationNDJSONCreateResponseSchema:
+    """Validate each line as a notification and create valid ones in chunks.
+
+    Invalid lines are skipped and reported without affecting valid ones. Only a limited number of errors is kept to
+    make memory usage independent of the stream size.
+    """
+
+    result = NotificationNDJSONCreateResponseSchema(accepted=0, rejected=0, errors=[])
+    entries = []
+
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+
+        try:
+            entries.append(parse_line(line))
+        except (LineDecodeError, ValidationError) as e:
+            result.rejected += 1
+            if len(result.errors) < max_reported_errors:
+                result.errors.append(NotificationLineErrorSchema(line=line_number, details=e.errors()))
+            continue
+
+        if len(entries) == chunk_size:
+            await notification_crud.bulk_create(entries, chunk_size=chunk_size)
+            result.accepted += len(entries)
+            entries = []
+
+    if entries:
+        await notification_crud.bulk_create(entries, chunk_size=chunk_size)
+        result.accepted += len(entries)
+
+    return result
@@ -63,6 +63,7 @@ class UserNotificationFilterParameters(FilterParameters):
 
     recipient_username: str = Query()
     project_code_any: str | None = Query()
+    unread: bool = Query(default=False)
 
     @validator('project_code_any')
     def split_list_parameters(cls, value: str) -> list[str]:
@@ -74,4 +75,5 @@ class UserNotificationFilterParameters(FilterParameters):
         return UserNotificationFiltering(
             recipient_username=self.recipient_username,
             project_code_any=self.project_code_any,
+            unread=self.unread,
         )
@@ -5,6 +5,7 @@
 # You may not use this file except in compliance with the License.
 
 from datetime import datetime
+from functools import cache
 from typing import Annotated
 from typing import Any
 from typing import Literal
@@ -13,9 +14,11 @@ from uuid import UUID
 from pydantic import Field
 from pydantic import PositiveInt
 from pydantic import conlist
+from pydantic import constr
 from pydantic import validator
 from pydantic.fields import ModelField
 
+from notification.components.notification.filtering import UserNotificationFiltering
 from notification.components.notification.models import CopyRequestAction
 from notification.components.notification.models import InvolvementType
 from notification.components.notification.models import Location
@@ -23,8 +26,11 @@ from notification.components.notification.models import NotificationType
 from notification.components.notification.models import PipelineAction
 from notification.components.notification.models import PipelineStatus
 from notification.components.notification.models import Target
+from notification.components.pagination import TotalMode
 from notification.components.schemas import BaseSchema
+from notification.components.schemas import CursorListResponseSchema
 from notification.components.schemas import ListResponseSchema
+from notification.components.schemas import to_json_compatible
 
 
 class KeyField:
@@ -40,21 +46,32 @@ class NotificationSchema(BaseSchema):
 class NotificationCreateSchema(NotificationSchema):
     """General schema used for notification creation."""
 
+    idempotency_key: Annotated[constr(min_length=1, max_length=128) | None, KeyField] = None
+
+    @classmethod
+    @cache
+    def get_key_fields(cls) -> frozenset[str]:
+        """Return names of fields annotated with `KeyField` computed once per class."""
+
+        return frozenset(cls.get_fields_annotated_with(KeyField))
+
     def dict(self, **kwds: Any) -> dict[str, Any]:
         """Generate a dictionary representation of the model with JSON serialisable values.
 
         Fields annotated with `KeyField` will be used as keys. All the remaining fields will be nested under `data` key.
         """
 
-        json = super().json(**kwds)
-        obj = self.__config__.json_loads(json)
+        key_fields = self.get_key_fields()
+        data = {}
+        obj = {'data': data}
 
-        data = {'data': obj}
-        root_fields = self.get_fields_annotated_with(KeyField)
-        for field in root_fields:
-            data[field] = obj.pop(field)
+        for name, value in self._iter(to_dict=False, **kwds):
+            if name in key_fields:
+                obj[name] = to_json_compatible(value)
+            else:
+                data[name] = to_json_compatible(value)
 
-        return data
+        return obj
 
 
 class PipelineNotificationCreateSchema(NotificationCreateSchema):
@@ -136,7 +153,7 @@ class MaintenanceNotificationCreateSchema(NotificationCreateSchema):
     """Schema for maintenance notification creation."""
 
     type: Annotated[Literal[NotificationType.MAINTENANCE], KeyField] = NotificationType.MAINTENANCE
-    announcement_id: UUID
+    announcement_id: Annotated[UUID, KeyField]
     effective_date: datetime
     duration_minutes: PositiveInt
     message: str
@@ -159,6 +176,25 @@ NotificationsCreateSchema = Annotated[
 ]
 
 
+def set_idempotency_keys(
+    entries: list[NotificationCreateSchema], idempotency_key: str, is_batch: bool
+) -> list[NotificationCreateSchema]:
+    """Derive idempotency keys from the request idempotency key for entries without their own key.
+
+    Single entry receives the key as is, each entry of a batch receives the key suffixed with its position.
+    """
+
+    results = []
+
+    for index, entry in enumerate(entries):
+        if entry.idempotency_key is None:
+            key = f'{idempotency_key}:{index}' if is_batch else idempotency_key
+            entry = entry.copy(update={'idempotency_key': key})
+        results.append(entry)
+
+    return results
+
+
 class NotificationResponseSchema(NotificationSchema):
     """Default schema for single notification in response."""
 
@@ -243,3 +279,98 @@ class NotificationListResponseSchema(ListResponseSchema):
     """Default schema for multiple notifications in response."""
 
     result: list[NotificationsResponseSchema]
+
+
+class NotificationCursorListResponseSchema(CursorListResponseSchema):
+    """Default schema for multiple notifications in response received with keyset pagination."""
+
+    result: list[NotificationsResponseSchema]
+
+
+class NotificationLineErrorSchema(BaseSchema):
+    """Schema for validation errors of one line in NDJSON stream."""
+
+    line: int
+    details: list[dict[str, Any]]
+
+
+class NotificationNDJSONCreateResponseSchema(BaseSchema):
+    """Schema for result of notifications creation from NDJSON stream."""
+
+    accepted: int
+    rejected: int
+    errors: list[NotificationLineErrorSchema]
+
+
+class NotificationReadCreateSchema(BaseSchema):
+    """Schema for marking notifications as read by the user."""
+
+    recipient_username: str
+    project_code_any: set[str] = set()
+    notification_ids: conlist(UUID, min_items=1, max_items=1000)
+
+    def to_filtering(self) -> UserNotificationFiltering:
+        return UserNotificationFiltering(
+            recipient_username=self.recipient_username, project_code_any=self.project_code_any
+        )
+
+
+class NotificationReadAllCreateSchema(BaseSchema):
+    """Schema for marking all notifications created until the moment as read by the user."""
+
+    recipient_username: str
+    read_until: datetime | None = None
+
+    @validator('read_until')
+    def is_timezone_aware(cls, value: datetime | None) -> datetime | None:
+        if value is not None and value.utcoffset() is None:
+            raise ValueError('ensure this date is offset-aware')
+
+        return value
+
+
+class NotificationReadMessageSchema(BaseSchema):
+    """Schema for WebSocket message marking notifications as read by the connected user."""
+
+    type: Literal['read']
+    notification_ids: conlist(UUID, min_items=1, max_items=1000)
+
+
+class NotificationReadAllMessageSchema(BaseSchema):
+    """Schema for WebSocket message marking all notifications created until the moment as read by the connected user."""
+
+    type: Literal['read_all']
+    read_until: datetime | None = None
+
+    @validator('read_until')
+    def is_timezone_aware(cls, value: datetime | None) -> datetime | None:
+        if value is not None and value.utcoffset() is None:
+            raise ValueError('ensure this date is offset-aware')
+
+        return value
+
+
+NotificationMessageSchema = Annotated[
+    NotificationReadMessageSchema | NotificationReadAllMessageSchema, Field(discriminator='type')
+]
+
+
+class NotificationMessageAckSchema(BaseSchema):
+    """Schema for WebSocket reply confirming that client message is applied."""
+
+    type: Literal['ack'] = 'ack'
+    request: str
+
+
+class NotificationMessageErrorSchema(BaseSchema):
+    """Schema for WebSocket reply with validation errors of client message."""
+
+    type: Literal['error'] = 'error'
+    details: list[dict[str, Any]]
+
+
+class NotificationUnreadCountResponseSchema(BaseSchema):
+    """Schema for number of notifications user has not read yet."""
+
+    total: int
+    total_mode: TotalMode
@@ -0,0 +1,347 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from contextlib import aclosing
+from contextlib import suppress
+from functools import cached_property
+from typing import Any
+from uuid import UUID
+
+from asyncpg import Connection
+from pydantic import parse_obj_as
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from notification.components.exceptions import InvalidCursor
+from notification.components.notification.cache import get_entry_feeds
+from notification.components.notification.cache import get_filtering_feeds
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import UserNotificationFiltering
+from notification.components.notification.models import Notification
+from notification.components.notification.schemas import NotificationsResponseSchema
+from notification.components.pagination import Cursor
+from notification.components.pagination import CursorPagination
+from notification.components.sorting import SortingOrder
+from notification.logger import logger
+
+EVENT_STREAM_MEDIA_TYPE = 'text/event-stream'
+HEARTBEAT = b': heartbeat\n\n'
+
+
+class NotificationEvent:
+    """Created notification serialised once and shared by all subscribers regardless of their transport.
+
+    Keyset pagination cursor of the notification is used as event id, so clients can resume after reconnecting.
+    """
+
+    def __init__(self, entry: Notification) -> None:
+        self.entry_id = entry.id
+        self.event_id = Cursor(created_at=entry.created_at, id=entry.id).encode()
+        self.data = parse_obj_as(NotificationsResponseSchema, entry).json()
+
+    @cached_property
+    def sse(self) -> bytes:
+        """Server-sent event representation."""
+
+        return f'id: {self.event_id}\nevent: notification\ndata: {self.data}\n\n'.encode()
+
+    @cached_property
+    def message(self) -> str:
+        """WebSocket message representation."""
+
+        return f'{{"type": "notification", "id": "{self.event_id}", "data": {self.data}}}'
+
+
+async def iter_sse(events: AsyncIterator[NotificationEvent | None]) -> AsyncIterator[bytes]:
+    """Convert events into server-sent events replacing heartbeats with comments."""
+
+    async with aclosing(events):
+        async for event in events:
+            yield HEARTBEAT if event is None else event.sse
+
+
+async def list_resumed_entries(
+    notification_crud: NotificationCRUD, filtering: UserNotificationFiltering, cursor: Cursor, *, limit: int
+) -> list[Notification]:
+    """Return notifications created after the cursor in creation order.
+
+    The connection is released, so it is not held for the whole lifetime of the stream.
+    """
+
+    pagination = CursorPagination(page_size=limit, cursor=cursor, order=SortingOrder.ASC)
+    page = await notification_crud.paginate_by_cursor(pagination, filtering)
+    await notification_crud.release()
+
+    return page.entries
+
+
+def decode_last_event_id(last_event_id: str | None) -> Cursor | None:
+    """Return cursor of the last event received by the client when it is resuming."""
+
+    if not last_event_id:
+        return None
+
+    try:
+        return Cursor.decode(last_event_id)
+    except ValueError:
+        raise InvalidCursor()
+
+
+async def iter_user_events(
+    notification_stream: 'NotificationStream',
+    notification_crud: NotificationCRUD,
+    filtering: UserNotificationFiltering,
+    cursor: Cursor | None,
+    *,
+    resume_limit: int,
+    heartbeat_interval: float,
+) -> AsyncIterator[NotificationEvent | None]:
+    """Yield events of notifications available for user starting with those created after the cursor.
+
+    Subscription is created only when iteration starts and removed when the iterator is closed, so it is not left in
+    the stream when the client disconnects before the response is started.
+    """
+
+    subscription = notification_stream.subscribe(get_filtering_feeds(filtering))
+
+    resumed_entries = []
+    if cursor:
+        try:
+            resumed_entries = await list_resumed_entries(notification_crud, filtering, cursor, limit=resume_limit)
+        except BaseException:
+            notification_stream.unsubscribe(subscription)
+            raise
+
+    events = notification_stream.iter_events(
+        subscription, resumed_entries=resumed_entries, heartbeat_interval=heartbeat_interval
+    )
+    async with aclosing(events):
+        async for event in events:
+            yield event
+
+
+class NotificationSubscription:
+    """Buffer events for one connected client.
+
+    Subscription is closed when the client does not keep up with events, so it has to reconnect and resume.
+    """
+
+    def __init__(self, feeds: Iterable[str], *, max_size: int) -> None:
+        self.feeds = set(feeds)
+        self.queue: asyncio.Queue[NotificationEvent | None] = asyncio.Queue(max_size)
+        self.closed = False
+
+    def put(self, event: NotificationEvent) -> None:
+        if self.closed:
+            return
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.close()
+
+    def close(self) -> None:
+        """Drop buffered events and wake up the client to finish the response."""
+
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class NotificationStream:
+    """Listen for notifications created by any worker and fan them out to subscribers of this worker.
+
+    Each worker holds one connection receiving ids of created notifications through LISTEN. Notifications are loaded
+    and serialised once and dispatched to subscriptions indexed by feed, so the cost of an event does not depend on the
+    number of idle subscribers. Subscriptions are closed when the connection is lost and clients resume from the
+    database using the last received event id.
+    """
+
+    def __init__(self, engine: AsyncEngine, *, channel: str, queue_size: int, reconnect_interval: float = 1.0) -> None:
+        self.engine = engine
+        self.channel = channel
+        self.queue_size = queue_size
+        self.reconnect_interval = reconnect_interval
+
+        self.subscriptions: defaultdict[str, set[NotificationSubscription]] = defaultdict(set)
+        self.pending: asyncio.Queue[list[UUID]] = asyncio.Queue()
+        self.listener: asyncio.Task | None = None
+        self.dispatcher: asyncio.Task | None = None
+        self.listening = False
+
+        self.subscribers = 0
+        self.events = 0
+        self.deliveries = 0
+        self.closed_subscriptions = 0
+
+    async def start(self) -> None:
+        """Start listening and dispatching in background."""
+
+        self.listener = asyncio.create_task(self._listen())
+        self.dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        """Stop background tasks and close all subscriptions."""
+
+        for task in (self.listener, self.dispatcher):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+        self.listener = self.dispatcher = None
+        self._close_subscriptions()
+
+    def subscribe(self, feeds: Iterable[str]) -> NotificationSubscription:
+        subscription = NotificationSubscription(feeds, max_size=self.queue_size)
+        for feed in subscription.feeds:
+            self.subscriptions[feed].add(subscription)
+        self.subscribers += 1
+
+        return subscription
+
+    def unsubscribe(self, subscription: NotificationSubscription) -> None:
+        for feed in subscription.feeds:
+            subscribers = self.subscriptions.get(feed)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscriptions[feed]
+        self.subscribers -= 1
+
+    async def iter_events(
+        self,
+        subscription: NotificationSubscription,
+        *,
+        resumed_entries: Iterable[Notification] = (),
+        heartbeat_interval: float,
+    ) -> AsyncIterator[NotificationEvent | None]:
+        """Yield resumed events followed by live ones until the subscription is closed.
+
+        None is yielded first and then every time heartbeat interval passes without events. Subscription has to be
+        created before resumed entries are read, so live events repeating them are skipped.
+        """
+
+        try:
+            yield None
+
+            resumed_ids = set()
+            for entry in resumed_entries:
+                resumed_ids.add(entry.id)
+                yield NotificationEvent(entry)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if event is None:
+                    break
+
+                if event.entry_id not in resumed_ids:
+                    yield event
+        finally:
+            self.unsubscribe(subscription)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Return number of subscribers and dispatch statistics."""
+
+        return {
+            'listening': self.listening,
+            'subscribers': self.subscribers,
+            'feeds': len(self.subscriptions),
+            'pending': self.pending.qsize(),
+            'events': self.events,
+            'deliveries': self.deliveries,
+            'closed_subscriptions': self.closed_subscriptions,
+        }
+
+    async def _listen(self) -> None:
+        """Keep LISTEN connection open reconnecting after failures."""
+
+        while True:
+            try:
+                async with self.engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    await self._wait_for_termination(raw_connection.driver_connection)
+                    await connection.invalidate()
+            except Exception:
+                logger.exception(f'Unable to listen for notifications on "{self.channel}" channel.')
+
+            # Notifications sent while there was no listener are lost, so clients have to resume from the database.
+            self._close_subscriptions()
+            await asyncio.sleep(self.reconnect_interval)
+
+    async def _wait_for_termination(self, driver_connection: Connection) -> None:
+        terminated = asyncio.Event()
+        driver_connection.add_termination_listener(lambda _: terminated.set())
+        await driver_connection.add_listener(self.channel, self._on_notify)
+        self.listening = True
+
+        try:
+            await terminated.wait()
+        finally:
+            self.listening = False
+            if not driver_connection.is_closed():
+                await driver_connection.remove_listener(self.channel, self._on_notify)
+
+    def _on_notify(self, connection: Connection, pid: int, channel: str, payload: str) -> None:
+        self.pending.put_nowait([UUID(id_) for id_ in payload.split(',')])
+
+    async def _dispatch(self) -> None:
+        while True:
+            ids = await self.pending.get()
+            while not self.pending.empty():
+                ids.extend(self.pending.get_nowait())
+
+            if not self.subscriptions:
+                continue
+
+            try:
+                await self._publish(ids)
+            except Exception:
+                logger.exception(f'Unable to dispatch {len(ids)} created notifications.')
+
+    async def _publish(self, ids: list[UUID]) -> None:
+        """Load notifications once and put serialised events into queues of subscriptions whose feeds include them."""
+
+        async with AsyncSession(bind=self.engine, expire_on_commit=False) as session:
+            entries = await NotificationCRUD(session).list_by_ids(ids)
+
+        for entry in sorted(entries, key=lambda entry: (entry.created_at, entry.id)):
+            subscriptions = set()
+            for feed in get_entry_feeds(entry):
+                subscriptions.update(self.subscriptions.get(feed, ()))
+
+            if not subscriptions:
+                continue
+
+            event = NotificationEvent(entry)
+            for subscription in subscriptions:
+                if subscription.closed:
+                    continue
+                subscription.put(event)
+                if subscription.closed:
+                    self.closed_subscriptions += 1
+
+            self.events += 1
+            self.deliveries += len(subscriptions)
+
+    def _close_subscriptions(self) -> None:
+        subscriptions = set()
+        for subscribers in self.subscriptions.values():
+            subscriptions.update(subscribers)
+
+        for subscription in subscriptions:
+            subscription.close()
@@ -8,81 +8,445 @@ from http import HTTPStatus
 
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Header
+from fastapi import Query
+from fastapi import Request
 from fastapi import Response
+from fastapi import WebSocket
+from fastapi import status
+from fastapi.responses import StreamingResponse
 
+from notification.components.etag import create_etag
+from notification.components.etag import is_not_modified
+from notification.components.exceptions import InvalidCursor
+from notification.components.exceptions import StreamUnavailable
+from notification.components.filtering import Filtering
+from notification.components.ndjson import NDJSON_MEDIA_TYPE
+from notification.components.ndjson import iter_lines
+from notification.components.notification.cache import NotificationFeedCache
 from notification.components.notification.crud import NotificationCRUD
 from notification.components.notification.dependencies import get_notification_crud
+from notification.components.notification.dependencies import get_notification_feed_cache
+from notification.components.notification.dependencies import get_notification_stream
+from notification.components.notification.dependencies import get_notification_writer
+from notification.components.notification.export import CSV_MEDIA_TYPE
+from notification.components.notification.export import ExportFormat
+from notification.components.notification.export import iter_export
+from notification.components.notification.ingest_queue import NotificationIngestQueue
+from notification.components.notification.ndjson import ingest_ndjson_lines
 from notification.components.notification.parameters import NotificationFilterParameters
 from notification.components.notification.parameters import NotificationSortByFields
 from notification.components.notification.parameters import UserNotificationFilterParameters
+from notification.components.notification.schemas import NotificationCursorListResponseSchema
 from notification.components.notification.schemas import NotificationListResponseSchema
+from notification.components.notification.schemas import NotificationNDJSONCreateResponseSchema
+from notification.components.notification.schemas import NotificationReadAllCreateSchema
+from notification.components.notification.schemas import NotificationReadCreateSchema
 from notification.components.notification.schemas import NotificationsCreateSchema
+from notification.components.notification.schemas import NotificationUnreadCountResponseSchema
+from notification.components.notification.schemas import set_idempotency_keys
+from notification.components.notification.stream import EVENT_STREAM_MEDIA_TYPE
+from notification.components.notification.stream import NotificationStream
+from notification.components.notification.stream import decode_last_event_id
+from notification.components.notification.stream import iter_sse
+from notification.components.notification.stream import iter_user_events
+from notification.components.notification.websocket import serve_websocket
+from notification.components.pagination import Pagination
+from notification.components.parameters import CursorPageParameters
 from notification.components.parameters import PageParameters
 from notification.components.parameters import SortParameters
+from notification.components.query_budget import get_query_budget
+from notification.components.sorting import Sorting
+from notification.config import Settings
+from notification.config import get_settings
 
 router = APIRouter(prefix='/notifications', tags=['Notifications'])
 
 
+async def serialise_page(
+    notification_crud: NotificationCRUD,
+    pagination: Pagination,
+    sorting: Sorting | None,
+    filtering: Filtering | None,
+    settings: Settings,
+) -> str:
+    """Return page of notifications serialised into JSON list response.
+
+    When enabled, notifications are serialised by the database and are not validated against the response schema.
+    """
+
+    if settings.NOTIFICATIONS_LIST_SERIALISED_BY_DB:
+        page = await notification_crud.paginate_json(pagination, sorting, filtering)
+        return NotificationListResponseSchema.json_from_page(page)
+
+    page = await notification_crud.paginate(pagination, sorting, filtering)
+
+    return NotificationListResponseSchema.from_page(page).json()
+
+
 @router.get(
-    '/', summary='List all notifications.', response_model=NotificationListResponseSchema, status_code=HTTPStatus.OK
+    '/',
+    summary='List all notifications.',
+    response_model=NotificationListResponseSchema,
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(get_query_budget())],
 )
 async def list_notifications(
     filter_parameters: NotificationFilterParameters = Depends(),
     sort_parameters: SortParameters.with_sort_by_fields(NotificationSortByFields) = Depends(),
     page_parameters: PageParameters = Depends(),
     notification_crud: NotificationCRUD = Depends(get_notification_crud),
-) -> NotificationListResponseSchema:
+    settings: Settings = Depends(get_settings),
+) -> Response:
     """List notifications."""
 
     filtering = filter_parameters.to_filtering()
     sorting = sort_parameters.to_sorting()
     pagination = page_parameters.to_pagination()
 
-    page = await notification_crud.paginate(pagination, sorting, filtering)
+    content = await serialise_page(notification_crud, pagination, sorting, filtering, settings)
+    await notification_crud.release()
+
+    return Response(content=content, media_type='application/json')
+
+
+@router.get(
+    '/cursor',
+    summary='List all notifications using keyset pagination.',
+    response_model=NotificationCursorListResponseSchema,
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(get_query_budget())],
+)
+async def list_notifications_by_cursor(
+    filter_parameters: NotificationFilterParameters = Depends(),
+    page_parameters: CursorPageParameters = Depends(),
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+) -> NotificationCursorListResponseSchema:
+    """List notifications ordered by creation time.
+
+    Pass next_cursor value from the response as cursor parameter to receive the next page.
+    """
+
+    filtering = filter_parameters.to_filtering()
+    pagination = page_parameters.to_pagination()
+
+    page = await notification_crud.paginate_by_cursor(pagination, filtering)
+    await notification_crud.release()
 
-    response = NotificationListResponseSchema.from_page(page)
+    response = NotificationCursorListResponseSchema.from_page(page)
 
     return response
 
 
+@router.get(
+    '/export',
+    summary='Export all notifications as NDJSON or CSV stream.',
+    status_code=HTTPStatus.OK,
+    responses={HTTPStatus.OK.value: {'content': {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}}}},
+    dependencies=[Depends(get_query_budget(statement_timeout=300, max_query_time=300, streaming=True))],
+)
+async def export_notifications(
+    filter_parameters: NotificationFilterParameters = Depends(),
+    sort_parameters: SortParameters.with_sort_by_fields(NotificationSortByFields) = Depends(),
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias='format'),
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    """Export notifications matching the filters without pagination.
+
+    Notifications are read from server-side cursor and sent in chunks as they are received, so memory usage does not
+    depend on the number of exported notifications.
+    """
+
+    filtering = filter_parameters.to_filtering()
+    sorting = sort_parameters.to_sorting()
+
+    content = iter_export(
+        notification_crud, export_format, sorting, filtering, chunk_size=settings.NOTIFICATIONS_EXPORT_CHUNK_SIZE
+    )
+    headers = {'Content-Disposition': f'attachment; filename="notifications.{export_format.value}"'}
+
+    return StreamingResponse(content, media_type=export_format.media_type, headers=headers)
+
+
 @router.get(
     '/user',
     summary='List user notifications.',
     response_model=NotificationListResponseSchema,
     status_code=HTTPStatus.OK,
+    dependencies=[Depends(get_query_budget())],
 )
 async def list_user_notifications(
+    request: Request,
     filter_parameters: UserNotificationFilterParameters = Depends(),
     sort_parameters: SortParameters.with_sort_by_fields(NotificationSortByFields) = Depends(),
     page_parameters: PageParameters = Depends(),
+    if_none_match: str | None = Header(default=None),
     notification_crud: NotificationCRUD = Depends(get_notification_crud),
-) -> NotificationListResponseSchema:
-    """List user notifications."""
+    feed_cache: NotificationFeedCache | None = Depends(get_notification_feed_cache),
+    settings: Settings = Depends(get_settings),
+) -> Response:
+    """List user notifications.
+
+    Not Modified response is returned when If-None-Match header contains the current ETag of the feed. When feed
+    cache is enabled serialised pages are reused until any of the feeds they include is changed. Cached pages are keyed
+    by the same validator as the ETag, so the ETag is always returned with the page it was computed for.
+    """
 
     filtering = filter_parameters.to_filtering()
     sorting = sort_parameters.to_sorting()
     pagination = page_parameters.to_pagination()
 
-    page = await notification_crud.paginate(pagination, sorting, filtering)
+    validator = await notification_crud.get_validator(filtering)
+    etag = create_etag(request.url.query, validator)
+    if is_not_modified(if_none_match, etag):
+        await notification_crud.release()
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag})
+
+    key = content = None
+    if feed_cache:
+        key = await feed_cache.get_page_key(filtering, sorting, pagination, validator)
+        content = await feed_cache.get(key)
+
+    if content is None:
+        content = (await serialise_page(notification_crud, pagination, sorting, filtering, settings)).encode()
+        if feed_cache:
+            await feed_cache.set(key, content)
+
+    await notification_crud.release()
+
+    return Response(content=content, media_type='application/json', headers={'ETag': etag})
+
+
+@router.get(
+    '/user/cursor',
+    summary='List user notifications using keyset pagination.',
+    response_model=NotificationCursorListResponseSchema,
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(get_query_budget())],
+)
+async def list_user_notifications_by_cursor(
+    filter_parameters: UserNotificationFilterParameters = Depends(),
+    page_parameters: CursorPageParameters = Depends(),
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+) -> NotificationCursorListResponseSchema:
+    """List user notifications ordered by creation time.
+
+    Pass next_cursor value from the response as cursor parameter to receive the next page.
+    """
+
+    filtering = filter_parameters.to_filtering()
+    pagination = page_parameters.to_pagination()
 
-    response = NotificationListResponseSchema.from_page(page)
+    page = await notification_crud.paginate_by_cursor(pagination, filtering)
+    await notification_crud.release()
+
+    response = NotificationCursorListResponseSchema.from_page(page)
 
     return response
 
 
-@router.post('/', summary='Create new notification(s).', status_code=HTTPStatus.NO_CONTENT)
+@router.get(
+    '/user/stream',
+    summary='Stream new user notifications as server-sent events.',
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(get_query_budget(streaming=True))],
+)
+async def stream_user_notifications(
+    filter_parameters: UserNotificationFilterParameters = Depends(),
+    last_event_id: str | None = Header(default=None),
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+    notification_stream: NotificationStream | None = Depends(get_notification_stream),
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    """Stream notifications available for user as they are created.
+
+    Notifications created after the one passed in Last-Event-ID header are sent first, so reconnecting clients do
+    not miss notifications. Heartbeat comments keep idle connections open.
+    """
+
+    if not notification_stream or not notification_stream.listening:
+        raise StreamUnavailable()
+
+    filtering = filter_parameters.to_filtering()
+    cursor = decode_last_event_id(last_event_id)
+
+    events = iter_user_events(
+        notification_stream,
+        notification_crud,
+        filtering,
+        cursor,
+        resume_limit=settings.NOTIFICATIONS_STREAM_RESUME_LIMIT,
+        heartbeat_interval=settings.NOTIFICATIONS_STREAM_HEARTBEAT_INTERVAL,
+    )
+
+    return StreamingResponse(
+        iter_sse(events),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@router.websocket('/user/ws')
+async def connect_user_notifications(
+    websocket: WebSocket,
+    filter_parameters: UserNotificationFilterParameters = Depends(),
+    last_event_id: str | None = Query(default=None),
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+    notification_stream: NotificationStream | None = Depends(get_notification_stream),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    """Push notifications available for user as they are created and accept read acknowledgements.
+
+    Notifications created after the one passed in last_event_id parameter are sent first. Connection is closed with
+    try again later code when the stream is unavailable or the client does not keep up with notifications.
+    """
+
+    if not notification_stream or not notification_stream.listening:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    filtering = filter_parameters.to_filtering()
+    try:
+        cursor = decode_last_event_id(last_event_id)
+    except InvalidCursor:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+
+    events = iter_user_events(
+        notification_stream,
+        notification_crud,
+        filtering,
+        cursor,
+        resume_limit=settings.NOTIFICATIONS_STREAM_RESUME_LIMIT,
+        heartbeat_interval=settings.NOTIFICATIONS_STREAM_HEARTBEAT_INTERVAL,
+    )
+
+    await serve_websocket(websocket, events, notification_crud, filtering)
+
+
+@router.get(
+    '/user/unread-count',
+    summary='Count user notifications which are not read yet.',
+    response_model=NotificationUnreadCountResponseSchema,
+    status_code=HTTPStatus.OK,
+    dependencies=[Depends(get_query_budget())],
+)
+async def count_unread_user_notifications(
+    filter_parameters: UserNotificationFilterParameters = Depends(),
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+    settings: Settings = Depends(get_settings),
+) -> NotificationUnreadCountResponseSchema:
+    """Count user notifications which are not read yet.
+
+    Counting stops at the configured cap, in which case total mode is reported as capped.
+    """
+
+    filtering = filter_parameters.to_filtering()
+
+    total, total_mode = await notification_crud.count_unread(filtering, settings.NOTIFICATIONS_UNREAD_COUNT_CAP)
+    await notification_crud.release()
+
+    return NotificationUnreadCountResponseSchema(total=total, total_mode=total_mode)
+
+
+@router.post('/user/read', summary='Mark user notifications as read.', status_code=HTTPStatus.NO_CONTENT)
+async def mark_user_notifications_as_read(
+    body: NotificationReadCreateSchema,
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+) -> Response:
+    """Mark notifications as read by the user."""
+
+    await notification_crud.mark_as_read(body.to_filtering(), body.notification_ids)
+
+    await notification_crud.commit()
+
+    return Response(status_code=HTTPStatus.NO_CONTENT)
+
+
+@router.post('/user/read-all', summary='Mark all user notifications as read.', status_code=HTTPStatus.NO_CONTENT)
+async def mark_all_user_notifications_as_read(
+    body: NotificationReadAllCreateSchema,
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+) -> Response:
+    """Mark all notifications created until the moment (current time by default) as read by the user."""
+
+    await notification_crud.mark_all_as_read(body.recipient_username, body.read_until)
+
+    await notification_crud.commit()
+
+    return Response(status_code=HTTPStatus.NO_CONTENT)
+
+
+@router.post(
+    '/',
+    summary='Create new notification(s).',
+    status_code=HTTPStatus.NO_CONTENT,
+    responses={HTTPStatus.ACCEPTED.value: {'description': 'Notification(s) queued for creation.'}},
+    dependencies=[Depends(get_query_budget(statement_timeout=60, max_queries=0, max_query_time=0))],
+)
 async def create_notification(
     body: NotificationsCreateSchema | list[NotificationsCreateSchema],
-    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+    idempotency_key: str | None = Header(default=None, min_length=1, max_length=100),
+    notification_writer: NotificationIngestQueue | NotificationCRUD = Depends(get_notification_writer),
+    settings: Settings = Depends(get_settings),
 ) -> Response:
-    """Create one or multiple notifications."""
+    """Create one or multiple notifications.
+
+    Notifications with already existing idempotency key (set in the body or derived from Idempotency-Key header) are
+    skipped. When the ingest queue is enabled notifications are only queued and written into the database in background.
+    """
 
-    if not isinstance(body, list):
+    is_batch = isinstance(body, list)
+    if not is_batch:
         body = [body]
 
-    for entry in body:
-        await notification_crud.create(entry)
+    if idempotency_key is not None:
+        body = set_idempotency_keys(body, idempotency_key, is_batch)
 
-    await notification_crud.commit()
+    if isinstance(notification_writer, NotificationIngestQueue):
+        notification_writer.put(body)
+        return Response(status_code=HTTPStatus.ACCEPTED)
+
+    await notification_writer.ingest(
+        body,
+        chunk_size=settings.NOTIFICATIONS_BULK_CREATE_CHUNK_SIZE,
+        copy_threshold=settings.NOTIFICATIONS_COPY_THRESHOLD,
+    )
+
+    await notification_writer.commit()
 
     return Response(status_code=HTTPStatus.NO_CONTENT)
+
+
+@router.post(
+    '/ndjson',
+    summary='Create new notifications from NDJSON stream.',
+    response_model=NotificationNDJSONCreateResponseSchema,
+    status_code=HTTPStatus.OK,
+    openapi_extra={'requestBody': {'content': {NDJSON_MEDIA_TYPE: {'schema': {'type': 'string'}}}, 'required': True}},
+    dependencies=[Depends(get_query_budget(statement_timeout=60, max_queries=0, max_query_time=0))],
+)
+async def create_notifications_from_ndjson(
+    request: Request,
+    notification_crud: NotificationCRUD = Depends(get_notification_crud),
+    settings: Settings = Depends(get_settings),
+) -> NotificationNDJSONCreateResponseSchema:
+    """Create notifications from request body with one notification per line.
+
+    The body is processed while it is received and valid notifications are written in chunks, so memory usage does not
+    depend on the number of notifications. Invalid lines are reported in the response.
+    """
+
+    response = await ingest_ndjson_lines(
+        iter_lines(request.stream()),
+        notification_crud,
+        chunk_size=settings.NOTIFICATIONS_BULK_CREATE_CHUNK_SIZE,
+        max_reported_errors=settings.NOTIFICATIONS_NDJSON_MAX_REPORTED_ERRORS,
+    )
+
+    await notification_crud.commit()
+
+    return response
@@ -0,0 +1,96 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from contextlib import suppress
+
+from fastapi import WebSocket
+from fastapi import WebSocketDisconnect
+from fastapi import status
+from pydantic import ValidationError
+from pydantic import parse_obj_as
+
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import UserNotificationFiltering
+from notification.components.notification.schemas import NotificationMessageAckSchema
+from notification.components.notification.schemas import NotificationMessageErrorSchema
+from notification.components.notification.schemas import NotificationMessageSchema
+from notification.components.notification.schemas import NotificationReadMessageSchema
+from notification.components.notification.stream import NotificationEvent
+
+HEARTBEAT_MESSAGE = '{"type": "heartbeat"}'
+
+
+async def handle_message(
+    notification_crud: NotificationCRUD, filtering: UserNotificationFiltering, message: str
+) -> NotificationMessageAckSchema | NotificationMessageErrorSchema:
+    """Apply client message on behalf of the connected user and return the reply."""
+
+    try:
+        obj = json.loads(message)
+    except ValueError as e:
+        return NotificationMessageErrorSchema(
+            details=[{'loc': ('__root__',), 'msg': str(e), 'type': 'value_error.jsondecode'}]
+        )
+
+    try:
+        request = parse_obj_as(NotificationMessageSchema, obj)
+    except ValidationError as e:
+        return NotificationMessageErrorSchema(details=e.errors())
+
+    if isinstance(request, NotificationReadMessageSchema):
+        await notification_crud.mark_as_read(filtering, request.notification_ids)
+    else:
+        await notification_crud.mark_all_as_read(filtering.recipient_username, request.read_until)
+
+    await notification_crud.commit()
+
+    return NotificationMessageAckSchema(request=request.type)
+
+
+async def serve_websocket(
+    websocket: WebSocket,
+    events: AsyncIterator[NotificationEvent | None],
+    notification_crud: NotificationCRUD,
+    filtering: UserNotificationFiltering,
+) -> None:
+    """Send events and receive client messages concurrently until either side finishes.
+
+    Sends from both directions are serialised, because ASGI servers do not allow concurrent sends on one connection.
+    """
+
+    lock = asyncio.Lock()
+
+    async def send_events() -> None:
+        async with aclosing(events):
+            async for event in events:
+                async with lock:
+                    await websocket.send_text(HEARTBEAT_MESSAGE if event is None else event.message)
+
+        # Subscription is closed when the client does not keep up or the stream lost its connection.
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+
+    async def receive_messages() -> None:
+        while True:
+            message = await websocket.receive_text()
+            reply = await handle_message(notification_crud, filtering, message)
+            async with lock:
+                await websocket.send_text(reply.json())
+
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(receive_messages())]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+    for task in pending:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    for task in done:
+        with suppress(WebSocketDisconnect):
+            task.result()
@@ -4,13 +4,45 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from __future__ import annotations as _annotations
+
+import base64
 import math
+from datetime import datetime
 from typing import TypeVar
+from uuid import UUID
 
 from pydantic import BaseModel
 from pydantic import conint
 
 from notification.components.db_model import DBModel
+from notification.components.sorting import SortingOrder
+from notification.components.types import StrEnum
+
+
+class TotalMode(StrEnum):
+    """Available ways to compute total number of entries.
+
+    Capped mode counts entries only up to the cap, so total equal to the cap means there are at least that many
+    entries. Estimated mode relies on planner statistics and can be far from the actual number.
+    """
+
+    EXACT = 'exact'
+    NONE = 'none'
+    CAPPED = 'capped'
+    ESTIMATED = 'estimated'
+
+
+class CountStrategy(StrEnum):
+    """Available ways to query exact total number of entries.
+
+    Separate strategy runs count and page statements one after another. Window strategy adds window count to the page
+    statement, which saves one round trip, but makes database to build the whole filtered set, so it suits selective
+    filters only.
+    """
+
+    SEPARATE = 'separate'
+    WINDOW = 'window'
 
 
 class Pagination(BaseModel):
@@ -18,6 +50,9 @@ class Pagination(BaseModel):
 
     page: conint(ge=1) = 1
     page_size: conint(ge=0) = 20
+    total_mode: TotalMode = TotalMode.EXACT
+    total_cap: conint(ge=1) = 1000
+    count_strategy: CountStrategy | None = None
 
     @property
     def limit(self) -> int:
@@ -32,11 +67,15 @@ class Pagination(BaseModel):
 
 
 class Page(BaseModel):
-    """Represent one page of the response."""
+    """Represent one page of the response.
+
+    Entries are either models or their JSON documents when they are serialised by the database.
+    """
 
     pagination: Pagination
-    count: int
-    entries: list[DBModel]
+    count: int | None
+    total_mode: TotalMode = TotalMode.EXACT
+    entries: list[DBModel] | list[str]
 
     class Config:
         arbitrary_types_allowed = True
@@ -46,8 +85,54 @@ class Page(BaseModel):
         return self.pagination.page
 
     @property
-    def total_pages(self) -> int:
+    def total_pages(self) -> int | None:
+        if self.count is None:
+            return None
+
         return math.ceil(self.count / self.pagination.page_size) if self.pagination.page_size else 0
 
 
 PageType = TypeVar('PageType', bound=Page)
+
+
+class Cursor(BaseModel):
+    """Position of the last entry of a page in keyset pagination."""
+
+    created_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        """Represent cursor as an opaque url safe string."""
+
+        value = f'{self.created_at.isoformat()}|{self.id}'
+
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> Cursor:
+        """Restore cursor from the opaque string or raise ValueError when it is malformed."""
+
+        try:
+            created_at, id_ = base64.urlsafe_b64decode(value.encode()).decode().split('|')
+            return cls(created_at=datetime.fromisoformat(created_at), id=UUID(id_))
+        except ValueError:
+            raise ValueError('Invalid cursor')
+
+
+class CursorPagination(BaseModel):
+    """Keyset pagination control parameters based on (created_at, id) entries order."""
+
+    page_size: conint(ge=1) = 20
+    cursor: Cursor | None = None
+    order: SortingOrder = SortingOrder.DESC
+
+
+class CursorPage(BaseModel):
+    """Represent one page of the response received with keyset pagination."""
+
+    pagination: CursorPagination
+    entries: list[DBModel]
+    next_cursor: Cursor | None
+
+    class Config:
+        arbitrary_types_allowed = True
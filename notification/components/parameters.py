@@ -10,8 +10,12 @@ from fastapi import Query
 from pydantic import BaseModel
 from pydantic import create_model
 
+from notification.components.exceptions import InvalidCursor
 from notification.components.filtering import Filtering
+from notification.components.pagination import Cursor
+from notification.components.pagination import CursorPagination
 from notification.components.pagination import Pagination
+from notification.components.pagination import TotalMode
 from notification.components.sorting import Sorting
 from notification.components.sorting import SortingOrder
 from notification.components.types import StrEnum
@@ -26,9 +30,28 @@ class PageParameters(QueryParameters):
 
     page: int = Query(default=1, ge=1)
     page_size: int = Query(default=20, ge=0)
+    total_mode: TotalMode = Query(default=TotalMode.EXACT)
 
     def to_pagination(self) -> Pagination:
-        return Pagination(page=self.page, page_size=self.page_size)
+        return Pagination(page=self.page, page_size=self.page_size, total_mode=self.total_mode)
+
+
+class CursorPageParameters(QueryParameters):
+    """Base query parameters for keyset pagination."""
+
+    page_size: int = Query(default=20, ge=1)
+    cursor: str | None = Query(default=None)
+    sort_order: SortingOrder = Query(default=SortingOrder.DESC)
+
+    def to_pagination(self) -> CursorPagination:
+        cursor = None
+        if self.cursor:
+            try:
+                cursor = Cursor.decode(self.cursor)
+            except ValueError:
+                raise InvalidCursor()
+
+        return CursorPagination(page_size=self.page_size, cursor=cursor, order=self.sort_order)
 
 
 class SortByFields(StrEnum):
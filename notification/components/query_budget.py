@@ -0,0 +1,149 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Coroutine
+from typing import Any
+from typing import TypeVar
+
+from fastapi import Depends
+from starlette.requests import HTTPConnection
+from starlette.requests import Request
+from starlette.types import Receive
+
+from notification.components.exceptions import QueryBudgetExceeded
+from notification.components.exceptions import QueryCancelled
+from notification.components.exceptions import QueryTimeout
+from notification.config import Settings
+from notification.config import get_settings
+
+T = TypeVar('T')
+
+
+class QueryBudget:
+    """Limit the time of each statement and the number and total time of statements executed for one request.
+
+    Statements run in a separate task, so a statement is cancelled in the database by the driver when it times out or
+    when the budget is cancelled. Limits set to zero are disabled.
+    """
+
+    def __init__(self, *, statement_timeout: float, max_queries: int = 0, max_query_time: float = 0) -> None:
+        self.statement_timeout = statement_timeout
+        self.max_queries = max_queries
+        self.max_query_time = max_query_time
+
+        self.queries = 0
+        self.query_time = 0.0
+        self.cancelled = False
+        self.statement: asyncio.Task | None = None
+
+    def get_timeout(self) -> float | None:
+        """Return time the next statement may run within the budget."""
+
+        timeouts = []
+        if self.statement_timeout:
+            timeouts.append(self.statement_timeout)
+        if self.max_query_time:
+            timeouts.append(self.max_query_time - self.query_time)
+
+        return min(timeouts, default=None)
+
+    async def run(self, statement: Coroutine[Any, Any, T]) -> T:
+        """Run the statement coroutine within the budget and account its duration."""
+
+        try:
+            if self.cancelled:
+                raise QueryCancelled()
+            if self.max_queries and self.queries >= self.max_queries:
+                raise QueryBudgetExceeded()
+            timeout = self.get_timeout()
+            if timeout is not None and timeout <= 0:
+                raise QueryTimeout()
+        except Exception:
+            statement.close()
+            raise
+
+        self.queries += 1
+        self.statement = asyncio.ensure_future(statement)
+        start = time.perf_counter()
+
+        try:
+            return await asyncio.wait_for(self.statement, timeout)
+        except asyncio.TimeoutError:
+            raise QueryTimeout()
+        except asyncio.CancelledError:
+            if not self.cancelled:
+                raise
+            raise QueryCancelled()
+        finally:
+            self.query_time += time.perf_counter() - start
+            self.statement = None
+
+    def cancel(self) -> None:
+        """Cancel the in-flight statement and refuse to run further statements."""
+
+        self.cancelled = True
+        if self.statement:
+            self.statement.cancel()
+
+    async def cancel_on_disconnect(self, receive: Receive) -> None:
+        """Wait until the client disconnects and cancel the budget."""
+
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                self.cancel()
+                return
+
+
+def get_query_budget(
+    *,
+    statement_timeout: float | None = None,
+    max_queries: int | None = None,
+    max_query_time: float | None = None,
+    streaming: bool = False,
+) -> Callable[..., AsyncIterator[QueryBudget | None]]:
+    """Create a FastAPI dependency which limits statements executed for requests served by the route.
+
+    Limits which are not set are taken from settings. Disconnects are watched only for requests without body, so the
+    body is not consumed before the endpoint reads it, and not for routes returning streaming responses, which receive
+    the disconnect themselves. Budget is kept in the request state, so CRUD dependencies and the Server-Timing header
+    can use it.
+    """
+
+    async def query_budget_dependency(
+        request: Request, settings: Settings = Depends(get_settings)
+    ) -> AsyncIterator[QueryBudget]:
+        budget = QueryBudget(
+            statement_timeout=settings.RDS_STATEMENT_TIMEOUT if statement_timeout is None else statement_timeout,
+            max_queries=settings.RDS_REQUEST_MAX_QUERIES if max_queries is None else max_queries,
+            max_query_time=settings.RDS_REQUEST_MAX_QUERY_TIME if max_query_time is None else max_query_time,
+        )
+        request.state.query_budget = budget
+
+        if streaming or request.method not in ('GET', 'HEAD'):
+            yield budget
+            return
+
+        watcher = asyncio.create_task(budget.cancel_on_disconnect(request.receive))
+        try:
+            yield budget
+        finally:
+            watcher.cancel()
+
+    return query_budget_dependency
+
+
+async def get_request_query_budget(connection: HTTPConnection) -> QueryBudget | None:
+    """Return query budget declared by the route serving the connection as a dependency.
+
+    Routes without declared budget and WebSocket connections are not limited.
+    """
+
+    return getattr(connection.state, 'query_budget', None)
@@ -0,0 +1,155 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import json
+import time
+from contextlib import suppress
+from typing import Any
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import CompoundSelect
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql import Select
+
+from notification.components.explain import Explain
+from notification.config import Settings
+from notification.logger import logger
+from notification.metrics import metrics_registry
+
+
+class SlowQueryLog:
+    """Log statements running longer than the threshold with their parameters and execution plans.
+
+    Plans are explained in background using a separate connection of the engine, so requests do not wait for them and
+    their transactions are not affected. Only selects are explained with ANALYZE, which executes the statement once
+    more, data-modifying statements get the estimated plan. At most one statement is captured per interval and
+    statements skipped within the interval are counted and reported with the next capture.
+    """
+
+    def __init__(self, engine: AsyncEngine, *, threshold: float, interval: float, explain_timeout: float) -> None:
+        self.engine = engine
+        self.threshold = threshold
+        self.interval = interval
+        self.explain_timeout = explain_timeout
+
+        self.explainer: asyncio.Task | None = None
+        self.last_captured_at: float | None = None
+        self.captured = 0
+        self.skipped = 0
+        self.skipped_since_capture = 0
+
+    async def stop(self) -> None:
+        """Cancel the capture running in background."""
+
+        if self.explainer is not None:
+            self.explainer.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.explainer
+
+        self.explainer = None
+
+    def is_slow(self, duration: float) -> bool:
+        """Return True when the statement duration reaches the threshold."""
+
+        return duration >= self.threshold
+
+    def capture(self, statement: Executable, params: dict[str, Any] | None, duration: float) -> None:
+        """Start logging the slow statement in background unless another one was captured within the interval."""
+
+        now = time.monotonic()
+        if self.last_captured_at is not None and now - self.last_captured_at < self.interval:
+            self.skipped += 1
+            self.skipped_since_capture += 1
+            return
+
+        self.last_captured_at = now
+        self.captured += 1
+        skipped, self.skipped_since_capture = self.skipped_since_capture, 0
+
+        self.explainer = asyncio.create_task(self._log(statement, params, duration, skipped))
+
+    async def _log(self, statement: Executable, params: dict[str, Any] | None, duration: float, skipped: int) -> None:
+        """Log the statement together with its execution plan."""
+
+        compiled = statement.compile(dialect=postgresql.dialect())
+        parameters = {**compiled.params, **(params or {})}
+
+        try:
+            plan = await asyncio.wait_for(self._explain(statement, params), self.explain_timeout)
+        except Exception:
+            logger.exception('Unable to explain slow query.')
+            plan = None
+
+        logger.warning(
+            f'Slow query took {duration * 1000:.1f} ms, {skipped} slow queries skipped since the last capture.\n'
+            f'SQL: {compiled}\nParameters: {parameters}\nPlan: {plan}'
+        )
+
+    async def _explain(self, statement: Executable, params: dict[str, Any] | None) -> str:
+        """Return execution plan of the statement in JSON format.
+
+        Connection is closed without commit, so its transaction is always rolled back.
+        """
+
+        analyze = isinstance(statement, (Select, CompoundSelect))
+        async with self.engine.connect() as connection:
+            result = await connection.execute(Explain(statement, analyze=analyze, buffers=analyze), params)
+            plan = result.scalar_one()
+
+        if isinstance(plan, str):
+            return plan
+
+        return json.dumps(plan)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Return counters of captured and skipped slow statements."""
+
+        return {
+            'threshold': self.threshold,
+            'captured': self.captured,
+            'skipped': self.skipped,
+        }
+
+
+class GetSlowQueryLog:
+    """Create a FastAPI callable dependency for SlowQueryLog single instance.
+
+    The instance exists only when the slow query threshold is set and the log is started.
+    """
+
+    def __init__(self) -> None:
+        self.instance = None
+
+    async def start(self, settings: Settings, engine: AsyncEngine) -> None:
+        """Create an instance of SlowQueryLog class with configured threshold."""
+
+        self.instance = SlowQueryLog(
+            engine,
+            threshold=settings.RDS_SLOW_QUERY_THRESHOLD,
+            interval=settings.RDS_SLOW_QUERY_CAPTURE_INTERVAL,
+            explain_timeout=settings.RDS_STATEMENT_TIMEOUT,
+        )
+        metrics_registry.register('db_slow_queries', self.instance.get_metrics)
+
+    async def stop(self) -> None:
+        """Stop the instance and remove it."""
+
+        if not self.instance:
+            return
+
+        await self.instance.stop()
+        metrics_registry.unregister('db_slow_queries')
+        self.instance = None
+
+    async def __call__(self) -> SlowQueryLog | None:
+        """Return an instance of SlowQueryLog class when it is started."""
+
+        return self.instance
+
+
+get_slow_query_log = GetSlowQueryLog()
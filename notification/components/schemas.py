@@ -7,16 +7,22 @@
 from __future__ import annotations as _annotations
 
 import json
+from datetime import date
+from enum import Enum
 from typing import Annotated
 from typing import Any
 from typing import get_type_hints
+from uuid import UUID
 
 from pydantic import BaseModel
 from pydantic import main
+from pydantic.json import pydantic_encoder
 from pydantic.typing import get_args
 from pydantic.typing import get_origin
 
+from notification.components.pagination import CursorPage
 from notification.components.pagination import PageType
+from notification.components.pagination import TotalMode
 
 
 class ParentOptionalFields(main.ModelMetaclass):
@@ -43,6 +49,33 @@ class ParentOptionalFields(main.ModelMetaclass):
         return super().__new__(mcs, class_name, bases, namespace, **kwds)
 
 
+def to_json_compatible(value: Any) -> Any:
+    """Convert value into the same JSON compatible representation that is produced by model json serialisation."""
+
+    if isinstance(value, Enum):
+        return to_json_compatible(value.value)
+
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+
+    if isinstance(value, UUID):
+        return str(value)
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    if isinstance(value, BaseModel):
+        return {name: to_json_compatible(item) for name, item in value}
+
+    if isinstance(value, dict):
+        return {key: to_json_compatible(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [to_json_compatible(item) for item in value]
+
+    return to_json_compatible(pydantic_encoder(value))
+
+
 class BaseSchema(BaseModel):
     """Base class for all available schemas."""
 
@@ -63,11 +96,43 @@ class BaseSchema(BaseModel):
 class ListResponseSchema(BaseSchema):
     """Default schema for multiple base schemas in response."""
 
-    num_of_pages: int
+    num_of_pages: int | None
     page: int
-    total: int
+    total: int | None
+    total_mode: TotalMode = TotalMode.EXACT
     result: list[BaseSchema]
 
     @classmethod
     def from_page(cls, page: PageType) -> ListResponseSchema:
-        return cls(num_of_pages=page.total_pages, page=page.number, total=page.count, result=page.entries)
+        return cls(
+            num_of_pages=page.total_pages,
+            page=page.number,
+            total=page.count,
+            total_mode=page.total_mode,
+            result=page.entries,
+        )
+
+    @classmethod
+    def json_from_page(cls, page: PageType) -> str:
+        """Serialise page whose entries are JSON documents without parsing and validating them again."""
+
+        envelope = cls.construct(
+            num_of_pages=page.total_pages, page=page.number, total=page.count, total_mode=page.total_mode
+        ).json(exclude={'result'})
+
+        return f'{envelope[:-1]}, "result": [{", ".join(page.entries)}]}}'
+
+
+class CursorListResponseSchema(BaseSchema):
+    """Default schema for multiple base schemas in response received with keyset pagination."""
+
+    next_cursor: str | None
+    result: list[BaseSchema]
+
+    @classmethod
+    def from_page(cls, page: CursorPage) -> CursorListResponseSchema:
+        next_cursor = None
+        if page.next_cursor:
+            next_cursor = page.next_cursor.encode()
+
+        return cls(next_cursor=next_cursor, result=page.entries)
@@ -0,0 +1,42 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+
+class ServerTimingMiddleware:
+    """Add Server-Timing header with number and total duration of statements executed for the request.
+
+    Statements are reported from the query budget kept in the request state. Streaming responses report only
+    statements executed before the response has started.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_server_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                query_budget = scope.get('state', {}).get('query_budget')
+                if query_budget:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        'Server-Timing',
+                        f'db;dur={query_budget.query_time * 1000:.1f};desc="{query_budget.queries} queries"',
+                    )
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_server_timing)
@@ -39,6 +39,44 @@ class Settings(BaseSettings):
     RDS_PWD: str = 'passwordRoJi'
     RDS_DB_NAME: str = 'notification'
     RDS_ECHO_SQL_QUERIES: bool = False
+    RDS_POOL_SIZE: int = 5
+    RDS_POOL_MAX_OVERFLOW: int = 10
+    RDS_POOL_TIMEOUT: float = 30  # seconds to wait for a connection when pool is exhausted
+    RDS_POOL_RECYCLE: int = 1800  # seconds, -1 keeps connections open forever
+    RDS_POOL_PRE_PING: bool = False
+    RDS_POOL_WARM_UP_CONNECTIONS: int = 5  # opened at the application startup, up to pool size
+    RDS_QUERY_CACHE_SIZE: int = 500  # compiled statements cached by SQLAlchemy per engine
+    RDS_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # statements prepared by asyncpg per connection, 0 disables
+    RDS_STATEMENT_CACHE_METRICS_ENABLED: bool = False  # counts hits of both statement caches for every statement
+    RDS_STATEMENT_TIMEOUT: float = 10  # seconds a statement may run, limits apply to routes declaring query budget
+    RDS_REQUEST_MAX_QUERIES: int = 20  # statements a request may execute, 0 disables the limit
+    RDS_REQUEST_MAX_QUERY_TIME: float = 30  # seconds all statements of a request may run in total, 0 disables the limit
+    RDS_SLOW_QUERY_THRESHOLD: float = 0  # seconds, slower statements are logged with their plans, 0 disables
+    RDS_SLOW_QUERY_CAPTURE_INTERVAL: float = 60  # seconds, at most one slow statement is captured per interval
+
+    NOTIFICATIONS_BULK_CREATE_CHUNK_SIZE: int = 1000  # asyncpg allows up to 32767 bind parameters per statement
+    NOTIFICATIONS_COPY_THRESHOLD: int = 5000
+    NOTIFICATIONS_NDJSON_MAX_REPORTED_ERRORS: int = 100
+    NOTIFICATIONS_EXPORT_CHUNK_SIZE: int = 1000  # rows fetched from server-side cursor at a time
+    NOTIFICATIONS_INGEST_QUEUE_ENABLED: bool = False
+    NOTIFICATIONS_INGEST_QUEUE_MAX_SIZE: int = 10000
+    NOTIFICATIONS_INGEST_QUEUE_BATCH_SIZE: int = 500
+    NOTIFICATIONS_INGEST_QUEUE_FLUSH_INTERVAL: float = 0.5  # seconds
+    NOTIFICATIONS_INGEST_QUEUE_MAX_RETRIES: int = 5  # retries of batch failed because of connection errors
+    NOTIFICATIONS_INGEST_QUEUE_RETRY_BACKOFF: float = 0.5  # seconds before the first retry, doubled for each next one
+    NOTIFICATIONS_USER_FEED_ENGINE: str = 'or'  # or, union
+    NOTIFICATIONS_UNREAD_COUNT_CAP: int = 100
+    NOTIFICATIONS_LIST_SERIALISED_BY_DB: bool = False  # skips response schema validation of listed notifications
+    NOTIFICATIONS_FEED_CACHE_ENABLED: bool = False
+    NOTIFICATIONS_FEED_CACHE_BACKEND: str = 'local'  # local, redis, local is valid for a single worker only
+    NOTIFICATIONS_FEED_CACHE_TTL: float = 30  # seconds
+    NOTIFICATIONS_FEED_CACHE_MAX_BYTES: int = 64 * 1024**2  # 64 MB, applies to local backend only
+    NOTIFICATIONS_FEED_CACHE_REDIS_URL: str = 'redis://localhost:6379/0'
+    NOTIFICATIONS_STREAM_ENABLED: bool = False
+    NOTIFICATIONS_STREAM_CHANNEL: str = 'notifications_created'
+    NOTIFICATIONS_STREAM_HEARTBEAT_INTERVAL: float = 15  # seconds
+    NOTIFICATIONS_STREAM_QUEUE_SIZE: int = 100  # events buffered per subscriber
+    NOTIFICATIONS_STREAM_RESUME_LIMIT: int = 1000
 
     OPEN_TELEMETRY_ENABLED: bool = False
     OPEN_TELEMETRY_HOST: str = '127.0.0.1'
@@ -4,10 +4,12 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from notification.dependencies.db import create_db_session
 from notification.dependencies.db import get_db_engine
 from notification.dependencies.db import get_db_session
 
 __all__ = [
+    'create_db_session',
     'get_db_engine',
     'get_db_session',
 ]
@@ -4,36 +4,184 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
+from typing import Any
+
 from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine import ExecutionContext
 from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from notification.config import Settings
 from notification.config import get_settings
+from notification.logger import logger
+from notification.metrics import metrics_registry
+
+
+def create_db_engine(settings: Settings) -> AsyncEngine:
+    """Create an instance of AsyncEngine class with configured connection pool."""
+
+    return create_async_engine(
+        settings.RDS_DB_URI,
+        echo=settings.RDS_ECHO_SQL_QUERIES,
+        pool_size=settings.RDS_POOL_SIZE,
+        max_overflow=settings.RDS_POOL_MAX_OVERFLOW,
+        pool_timeout=settings.RDS_POOL_TIMEOUT,
+        pool_recycle=settings.RDS_POOL_RECYCLE,
+        pool_pre_ping=settings.RDS_POOL_PRE_PING,
+        query_cache_size=settings.RDS_QUERY_CACHE_SIZE,
+        connect_args={'prepared_statement_cache_size': settings.RDS_PREPARED_STATEMENT_CACHE_SIZE},
+    )
+
+
+async def warm_up_db_engine(engine: AsyncEngine, connections_number: int) -> None:
+    """Open connections at the same time and return them into the pool, so requests do not wait for connection setup.
+
+    Connections above the pool size would be closed when returned, so at most pool size connections are opened.
+    """
+
+    connections_number = min(connections_number, engine.sync_engine.pool.size())
+    connections = await asyncio.gather(*[engine.connect().start() for _ in range(connections_number)])
+    await asyncio.gather(*[connection.close() for connection in connections])
+
+
+class StatementCacheCounters:
+    """Count hits of compiled statement cache and prepared statement cache of the engine.
+
+    SQLAlchemy reports whether compiled form of the statement was reused. The asyncpg dialect keeps prepared statements
+    per connection in LRU cache keyed by SQL text with numbered placeholders, which is looked up before the statement
+    is sent, so a statement is a hit when its valid prepared form is already in the cache of the connection. Building
+    the key adds work to every statement, so counters are meant to be enabled only while tuning the caches.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+        self.compiled_hits = 0
+        self.compiled_misses = 0
+        self.prepared_hits = 0
+        self.prepared_misses = 0
+
+        event.listen(engine.sync_engine, 'before_cursor_execute', self._on_execute)
+
+    def close(self) -> None:
+        event.remove(self.engine.sync_engine, 'before_cursor_execute', self._on_execute)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Return hit and miss statistics of both caches."""
+
+        compiled_requests = self.compiled_hits + self.compiled_misses
+        prepared_requests = self.prepared_hits + self.prepared_misses
+
+        return {
+            'compiled_hits': self.compiled_hits,
+            'compiled_misses': self.compiled_misses,
+            'compiled_hit_ratio': self.compiled_hits / compiled_requests if compiled_requests else 0.0,
+            'prepared_hits': self.prepared_hits,
+            'prepared_misses': self.prepared_misses,
+            'prepared_hit_ratio': self.prepared_hits / prepared_requests if prepared_requests else 0.0,
+        }
+
+    def _on_execute(
+        self,
+        connection: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+        executemany: bool,
+    ) -> None:
+        if context.cache_hit is context.dialect.CACHE_HIT:
+            self.compiled_hits += 1
+        elif context.cache_hit is context.dialect.CACHE_MISS:
+            self.compiled_misses += 1
+
+        # Statements executed for many sets of parameters are not prepared through the cache. Private attributes of the
+        # asyncpg dialect are read, so prepared statements are not counted when they are not available.
+        cache = getattr(connection.connection.dbapi_connection, '_prepared_statement_cache', None)
+        get_placeholders = getattr(cursor, '_parameter_placeholders', None)
+        invalidated_at = getattr(context.dialect, '_invalidate_schema_cache_asof', None)
+        if cache is None or get_placeholders is None or invalidated_at is None or executemany:
+            return
+
+        if parameters is not None:
+            statement = statement % get_placeholders(parameters)
+
+        prepared_statement = cache.get(statement)
+        if prepared_statement and prepared_statement[2] > invalidated_at:
+            self.prepared_hits += 1
+        else:
+            self.prepared_misses += 1
 
 
 class GetDBEngine:
-    """Create a FastAPI callable dependency for SQLAlchemy single AsyncEngine instance."""
+    """Create a FastAPI callable dependency for SQLAlchemy single AsyncEngine instance.
+
+    The instance is created and warmed up at the application startup, otherwise it is created on the first call.
+    """
 
     def __init__(self) -> None:
         self.instance = None
+        self.statement_cache_counters = None
+
+    async def start(self, settings: Settings) -> None:
+        """Create an instance of AsyncEngine class and open configured number of connections ahead of time.
+
+        The application still starts when the database is not available, so failed warm-up is only logged.
+        """
+
+        self.instance = create_db_engine(settings)
+        if settings.RDS_STATEMENT_CACHE_METRICS_ENABLED:
+            self.statement_cache_counters = StatementCacheCounters(self.instance)
+            metrics_registry.register('db_statement_cache', self.statement_cache_counters.get_metrics)
+
+        try:
+            await warm_up_db_engine(self.instance, settings.RDS_POOL_WARM_UP_CONNECTIONS)
+        except Exception:
+            logger.exception('Unable to open database connections ahead of time.')
+
+    async def stop(self) -> None:
+        """Close all connections of the instance and remove it."""
+
+        if self.statement_cache_counters:
+            self.statement_cache_counters.close()
+            metrics_registry.unregister('db_statement_cache')
+            self.statement_cache_counters = None
+
+        if not self.instance:
+            return
+
+        await self.instance.dispose()
+        self.instance = None
 
     async def __call__(self, settings: Settings = Depends(get_settings)) -> AsyncEngine:
         """Return an instance of AsyncEngine class."""
 
         if not self.instance:
-            self.instance = create_async_engine(settings.RDS_DB_URI, echo=settings.RDS_ECHO_SQL_QUERIES)
+            self.instance = create_db_engine(settings)
         return self.instance
 
 
 get_db_engine = GetDBEngine()
 
 
+def create_db_session(engine: AsyncEngine) -> AsyncSession:
+    """Create SQLAlchemy AsyncSession instance bound to the engine."""
+
+    return AsyncSession(bind=engine, expire_on_commit=False)
+
+
 async def get_db_session(engine=Depends(get_db_engine)) -> AsyncSession:
-    """Create a FastAPI callable dependency for SQLAlchemy AsyncSession instance."""
+    """Create a FastAPI callable dependency for SQLAlchemy AsyncSession instance.
+
+    Session checks out a connection only when the first statement is executed, so requests rejected before the
+    handler uses the database do not occupy the pool.
+    """
 
-    db = AsyncSession(bind=engine, expire_on_commit=False)
+    db = create_db_session(engine)
     try:
         yield db
     finally:
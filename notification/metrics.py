@@ -0,0 +1,35 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import Callable
+from typing import Any
+
+MetricsCollector = Callable[[], dict[str, Any]]
+
+
+class MetricsRegistry:
+    """Store collectors of runtime metrics exposed by service components."""
+
+    def __init__(self) -> None:
+        self.collectors: dict[str, MetricsCollector] = {}
+
+    def register(self, name: str, collector: MetricsCollector) -> None:
+        """Add or replace collector under the name."""
+
+        self.collectors[name] = collector
+
+    def unregister(self, name: str) -> None:
+        """Remove collector registered under the name if it exists."""
+
+        self.collectors.pop(name, None)
+
+    def collect(self) -> dict[str, dict[str, Any]]:
+        """Return current metrics of all registered collectors."""
+
+        return {name: collector() for name, collector in self.collectors.items()}
+
+
+metrics_registry = MetricsRegistry()
@@ -65,6 +65,22 @@ class TestAnnouncementViews:
         assert received_announcement_ids == announcement_ids
         assert received_total == 1
 
+    async def test_list_announcements_returns_not_modified_until_announcements_are_changed(
+        self, client, announcement_factory
+    ):
+        await announcement_factory.create()
+        response = await client.get('/v2/announcements/')
+        headers = {'If-None-Match': response.headers['ETag']}
+
+        not_modified_response = await client.get('/v2/announcements/', headers=headers)
+        await announcement_factory.create()
+        modified_response = await client.get('/v2/announcements/', headers=headers)
+
+        assert not_modified_response.status_code == 304
+        assert not_modified_response.content == b''
+        assert modified_response.status_code == 200
+        assert modified_response.headers['ETag'] != response.headers['ETag']
+
     async def test_get_announcement_returns_announcement_by_id(self, client, announcement_factory):
         created_announcement = await announcement_factory.create()
 
@@ -11,6 +11,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from notification.components.health.db_checker import DBChecker
 from notification.components.health.dependencies import get_db_checker
+from notification.metrics import metrics_registry
 
 
 class TestHealthViews:
@@ -30,3 +31,14 @@ class TestHealthViews:
 
         assert response.status_code == 503
         assert response.text == ''
+
+    async def test_metrics_endpoint_returns_metrics_of_registered_collectors(self, client):
+        metrics_registry.register('custom', lambda: {'value': 1})
+
+        try:
+            response = await client.get('/v1/health/metrics')
+        finally:
+            metrics_registry.unregister('custom')
+
+        assert response.status_code == 200
+        assert response.json()['custom'] == {'value': 1}
@@ -4,12 +4,44 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import json
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
 import pytest
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 
 from notification.components.exceptions import NotFound
+from notification.components.notification import ProjectNotification
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import NotificationFiltering
+from notification.components.notification.filtering import UserFeedEngine
+from notification.components.notification.filtering import UserNotificationFiltering
+from notification.components.notification.models import NotificationRead
+from notification.components.notification.schemas import NotificationListResponseSchema
+from notification.components.pagination import CountStrategy
+from notification.components.pagination import CursorPagination
+from notification.components.pagination import Pagination
+from notification.components.pagination import TotalMode
+from notification.components.sorting import Sorting
+from notification.components.sorting import SortingOrder
 
 
 class TestNotificationCRUD:
+    async def test_create_returns_instance_of_notification_class_matching_type(
+        self, notification_factory, notification_crud
+    ):
+        entry = notification_factory.generate_project()
+
+        received_notification = await notification_crud.create(entry)
+
+        assert isinstance(received_notification, ProjectNotification)
+        assert received_notification.project_code == entry.project_code
+        assert received_notification.created_at is not None
+
     async def test_create_from_announcement_creates_maintenance_notification_with_same_information(
         self, announcement_factory, notification_crud
     ):
@@ -22,6 +54,18 @@ class TestNotificationCRUD:
         assert received_notification.duration_minutes == created_announcement.duration_minutes
         assert received_notification.message == created_announcement.message
 
+    async def test_retrieve_by_announcement_id_returns_maintenance_notification_with_announcement_id(
+        self, notification_factory, notification_crud
+    ):
+        created_notification = await notification_factory.create_maintenance()
+        await notification_factory.create_maintenance()
+
+        received_notification = await notification_crud.retrieve_by_announcement_id(
+            created_notification.announcement_id
+        )
+
+        assert received_notification.id == created_notification.id
+
     async def test_delete_by_announcement_id_removes_maintenance_notifications_with_announcement_id(
         self, notification_factory, notification_crud
     ):
@@ -31,3 +75,370 @@ class TestNotificationCRUD:
 
         with pytest.raises(NotFound):
             await notification_crud.retrieve_by_id(created_notification.id)
+
+    async def test_bulk_create_creates_all_entries_split_into_chunks(self, notification_factory, notification_crud):
+        entries = [notification_factory.generate_pipeline() for _ in range(5)]
+
+        received_entries = await notification_crud.bulk_create(entries, chunk_size=2)
+
+        assert received_entries is None
+        created_entries = await notification_crud.list()
+        assert len(created_entries) == 5
+
+    async def test_bulk_create_limits_chunk_size_by_bind_parameters_per_statement(
+        self, mocker, notification_factory, notification_crud
+    ):
+        columns_number = len(notification_crud.model.__table__.columns)
+        mocker.patch('notification.components.crud.MAX_BIND_PARAMETERS', columns_number * 2)
+        create_many_spy = mocker.spy(notification_crud, '_create_many')
+        entries = [notification_factory.generate_pipeline() for _ in range(5)]
+
+        await notification_crud.bulk_create(entries, chunk_size=1000)
+
+        assert create_many_spy.call_count == 3
+        created_entries = await notification_crud.list()
+        assert len(created_entries) == 5
+
+    async def test_bulk_create_returns_created_entries_of_different_types_when_returning_is_enabled(
+        self, notification_factory, notification_crud
+    ):
+        entries = notification_factory.generate_all_available()
+
+        received_entries = await notification_crud.bulk_create(entries, chunk_size=2, returning=True)
+
+        assert received_entries.get_field_values('type') == entries.get_field_values('type')
+        for entry in received_entries:
+            await notification_crud.retrieve_by_id(entry.id)
+
+    async def test_copy_create_creates_all_entries_of_different_types(self, notification_factory, notification_crud):
+        entries = notification_factory.generate_all_available()
+
+        await notification_crud.copy_create(entries)
+
+        created_entries = await notification_crud.list()
+        assert set(created_entries.get_field_values('type')) == set(entries.get_field_values('type'))
+
+    async def test_copy_create_writes_entries_within_session_transaction(
+        self, db_engine, notification_factory, notification_crud
+    ):
+        async with AsyncSession(bind=db_engine) as db_session:
+            await NotificationCRUD(db_session).copy_create(notification_factory.generate_all_available())
+            await db_session.rollback()
+
+        assert len(await notification_crud.list()) == 0
+
+    async def test_copy_create_sets_creation_time_of_database_transaction(
+        self, db_engine, notification_factory, notification_crud
+    ):
+        async with AsyncSession(bind=db_engine) as db_session:
+            transaction_time = (await db_session.scalars(select(func.now()))).one()
+            await NotificationCRUD(db_session).copy_create(notification_factory.generate_all_available())
+            await db_session.commit()
+
+        created_entries = await notification_crud.list()
+        assert set(created_entries.get_field_values('created_at')) == {transaction_time}
+
+    @pytest.mark.parametrize('copy_threshold,expected_method', [(2, 'copy_create'), (3, 'bulk_create')])
+    async def test_ingest_chooses_write_path_depending_on_copy_threshold(
+        self, copy_threshold, expected_method, mocker, notification_factory, notification_crud
+    ):
+        spy = mocker.spy(notification_crud, expected_method)
+        entries = [notification_factory.generate_role_change() for _ in range(2)]
+
+        await notification_crud.ingest(entries, chunk_size=10, copy_threshold=copy_threshold)
+
+        spy.assert_called_once()
+        created_entries = await notification_crud.list()
+        assert len(created_entries) == 2
+
+    async def test_create_returns_existing_notification_when_idempotency_key_already_exists(
+        self, notification_factory, notification_crud
+    ):
+        entry = notification_factory.generate_role_change().copy(update={'idempotency_key': 'key'})
+        created_notification = await notification_crud.create(entry)
+
+        received_notification = await notification_crud.create(entry)
+
+        assert received_notification.id == created_notification.id
+        created_entries = await notification_crud.list()
+        assert len(created_entries) == 1
+
+    @pytest.mark.parametrize('order', SortingOrder.values())
+    async def test_paginate_by_cursor_returns_all_entries_once_in_created_at_and_id_order(
+        self, order, notification_factory, notification_crud
+    ):
+        entries = [notification_factory.generate_pipeline() for _ in range(5)]
+        created_notifications = await notification_crud.bulk_create(entries, chunk_size=5, returning=True)
+        expected_ids = [
+            entry.id
+            for entry in sorted(
+                created_notifications, key=lambda entry: (entry.created_at, entry.id), reverse=order == 'desc'
+            )
+        ]
+
+        received_ids = []
+        pagination = CursorPagination(page_size=2, order=order)
+        while True:
+            page = await notification_crud.paginate_by_cursor(pagination)
+            received_ids.extend(entry.id for entry in page.entries)
+            if page.next_cursor is None:
+                break
+            pagination = CursorPagination(page_size=2, cursor=page.next_cursor, order=order)
+
+        assert received_ids == expected_ids
+
+    async def test_paginate_by_cursor_applies_user_notification_filtering(
+        self, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        created_notification = await notification_factory.create_pipeline(recipient_username=username)
+        await notification_factory.create_pipeline()
+        filtering = UserNotificationFiltering(recipient_username=username, project_code_any=set())
+
+        page = await notification_crud.paginate_by_cursor(CursorPagination(page_size=10), filtering)
+
+        assert [entry.id for entry in page.entries] == [created_notification.id]
+        assert page.next_cursor is None
+
+    @pytest.mark.parametrize(
+        'total_mode,total_cap,expected_total_mode,expected_count',
+        [
+            (TotalMode.EXACT, 1000, TotalMode.EXACT, 3),
+            (TotalMode.NONE, 1000, TotalMode.NONE, None),
+            (TotalMode.CAPPED, 2, TotalMode.CAPPED, 2),
+            (TotalMode.CAPPED, 3, TotalMode.EXACT, 3),
+        ],
+    )
+    async def test_paginate_computes_total_according_to_total_mode(
+        self, total_mode, total_cap, expected_total_mode, expected_count, notification_factory, notification_crud
+    ):
+        await notification_factory.bulk_create_project(3)
+        pagination = Pagination(page_size=1, total_mode=total_mode, total_cap=total_cap)
+
+        page = await notification_crud.paginate(pagination)
+
+        assert page.total_mode is expected_total_mode
+        assert page.count == expected_count
+        assert len(page.entries) == 1
+
+    async def test_paginate_returns_estimated_total_when_total_mode_is_estimated(
+        self, notification_factory, notification_crud
+    ):
+        created_notification = await notification_factory.create_pipeline()
+        filtering = UserNotificationFiltering(
+            recipient_username=created_notification.recipient_username, project_code_any=set()
+        )
+        pagination = Pagination(total_mode=TotalMode.ESTIMATED)
+
+        page = await notification_crud.paginate(pagination, filtering=filtering)
+
+        assert page.total_mode is TotalMode.ESTIMATED
+        assert isinstance(page.count, int)
+        assert page.count >= 0
+
+    @pytest.mark.parametrize('page,expected_entries_number', [(1, 2), (2, 1), (3, 0)])
+    async def test_paginate_returns_same_total_with_window_count_strategy_for_any_page(
+        self, page, expected_entries_number, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        await notification_factory.bulk_create_role_change(3, recipient_username=username)
+        await notification_factory.create_role_change()
+        filtering = NotificationFiltering(recipient_username=username)
+        pagination = Pagination(page=page, page_size=2, count_strategy=CountStrategy.WINDOW)
+
+        page = await notification_crud.paginate(pagination, filtering=filtering)
+
+        assert page.count == 3
+        assert len(page.entries) == expected_entries_number
+
+    @pytest.mark.parametrize('page', [1, 2, 3])
+    async def test_paginate_returns_same_user_feed_page_with_union_engine_as_with_or_engine(
+        self, page, db_session, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        created_at = [datetime.now(timezone.utc) - timedelta(minutes=minutes) for minutes in range(6)]
+        project_notification = await notification_factory.create_project(created_at=created_at[0])
+        await notification_factory.create_pipeline(recipient_username=username, created_at=created_at[1])
+        await notification_factory.create_maintenance(created_at=created_at[2])
+        await notification_factory.create_pipeline(recipient_username=username, created_at=created_at[3])
+        await notification_factory.create_pipeline(created_at=created_at[4])
+        await notification_factory.create_project(created_at=created_at[5])
+        filtering = UserNotificationFiltering(
+            recipient_username=username, project_code_any={project_notification.project_code}
+        )
+        sorting = Sorting(field='created_at', order=SortingOrder.DESC)
+        union_notification_crud = NotificationCRUD(db_session, user_feed_engine=UserFeedEngine.UNION)
+
+        expected_page = await notification_crud.paginate(Pagination(page=page, page_size=2), sorting, filtering)
+        received_page = await union_notification_crud.paginate(Pagination(page=page, page_size=2), sorting, filtering)
+
+        assert received_page.count == expected_page.count == 4
+        assert [entry.id for entry in received_page.entries] == [entry.id for entry in expected_page.entries]
+        assert [type(entry) for entry in received_page.entries] == [type(entry) for entry in expected_page.entries]
+
+    @pytest.mark.parametrize('page', [1, 2, 3])
+    async def test_paginate_returns_newest_user_feed_entries_first_with_union_engine_when_sorting_is_not_set(
+        self, page, db_session, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        created_at = [datetime.now(timezone.utc) - timedelta(minutes=minutes) for minutes in range(6)]
+        created_entries = []
+        for index in reversed(range(6)):
+            if index % 2:
+                entry = await notification_factory.create_maintenance(created_at=created_at[index])
+            else:
+                entry = await notification_factory.create_pipeline(
+                    recipient_username=username, created_at=created_at[index]
+                )
+            created_entries.insert(0, entry)
+        filtering = UserNotificationFiltering(recipient_username=username)
+        union_notification_crud = NotificationCRUD(db_session, user_feed_engine=UserFeedEngine.UNION)
+
+        received_page = await union_notification_crud.paginate(Pagination(page=page, page_size=2), None, filtering)
+
+        expected_ids = [entry.id for entry in created_entries[(page - 1) * 2 : page * 2]]
+        assert received_page.count == 6
+        assert [entry.id for entry in received_page.entries] == expected_ids
+
+    async def test_paginate_json_returns_entries_matching_response_schema_of_paginated_entries(
+        self, notification_factory, notification_crud
+    ):
+        await notification_factory.create_all_available()
+        sorting = Sorting(field='created_at', order=SortingOrder.DESC)
+
+        expected_page = await notification_crud.paginate(Pagination(), sorting)
+        received_page = await notification_crud.paginate_json(Pagination(), sorting)
+
+        expected_response = NotificationListResponseSchema.from_page(expected_page)
+        received_response = NotificationListResponseSchema.parse_raw(
+            NotificationListResponseSchema.json_from_page(received_page)
+        )
+
+        assert received_response == expected_response
+        assert received_response.total == 5
+
+    async def test_paginate_json_formats_created_at_the_same_way_as_response_schema(
+        self, notification_factory, notification_crud
+    ):
+        created_at = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+        await notification_factory.create_maintenance(created_at=created_at)
+        await notification_factory.create_maintenance(created_at=created_at + timedelta(microseconds=1500))
+        sorting = Sorting(field='created_at', order=SortingOrder.ASC)
+
+        received_page = await notification_crud.paginate_json(Pagination(), sorting)
+
+        received_created_at = [json.loads(entry)['created_at'] for entry in received_page.entries]
+        assert received_created_at == ['2024-01-01T12:30:00+00:00', '2024-01-01T12:30:00.001500+00:00']
+
+    @pytest.mark.parametrize('user_feed_engine', UserFeedEngine.values())
+    async def test_paginate_json_returns_user_feed_page_with_same_entries_as_paginate(
+        self, user_feed_engine, db_session, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        created_at = [datetime.now(timezone.utc) - timedelta(minutes=minutes) for minutes in range(5)]
+        project_notification = await notification_factory.create_project(created_at=created_at[0])
+        await notification_factory.create_pipeline(recipient_username=username, created_at=created_at[1])
+        await notification_factory.create_maintenance(created_at=created_at[2])
+        await notification_factory.create_pipeline(recipient_username=username, created_at=created_at[3])
+        await notification_factory.create_pipeline(created_at=created_at[4])
+        filtering = UserNotificationFiltering(
+            recipient_username=username, project_code_any={project_notification.project_code}
+        )
+        sorting = Sorting(field='created_at', order=SortingOrder.DESC)
+        notification_crud = NotificationCRUD(db_session, user_feed_engine=user_feed_engine)
+
+        expected_page = await notification_crud.paginate(Pagination(page=2, page_size=2), sorting, filtering)
+        received_page = await notification_crud.paginate_json(Pagination(page=2, page_size=2), sorting, filtering)
+
+        assert received_page.count == expected_page.count == 4
+        assert [json.loads(entry)['id'] for entry in received_page.entries] == [
+            str(entry.id) for entry in expected_page.entries
+        ]
+
+    @pytest.mark.parametrize('page,expected_entries_number', [(1, 2), (2, 1), (3, 0)])
+    async def test_paginate_json_returns_same_total_with_window_count_strategy_for_any_page(
+        self, page, expected_entries_number, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        await notification_factory.bulk_create_role_change(3, recipient_username=username)
+        await notification_factory.create_role_change()
+        filtering = NotificationFiltering(recipient_username=username)
+        pagination = Pagination(page=page, page_size=2, count_strategy=CountStrategy.WINDOW)
+
+        page = await notification_crud.paginate_json(pagination, filtering=filtering)
+
+        assert page.count == 3
+        assert len(page.entries) == expected_entries_number
+
+    async def test_export_json_yields_all_matching_notifications_in_chunks_of_given_size(
+        self, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        created_notifications = await notification_factory.bulk_create_role_change(5, recipient_username=username)
+        await notification_factory.create_role_change()
+        filtering = NotificationFiltering(recipient_username=username)
+
+        chunks = [chunk async for chunk in notification_crud.export_json(filtering=filtering, chunk_size=2)]
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        assert sorted(json.loads(document)['id'] for chunk in chunks for document in chunk) == sorted(
+            created_notifications.get_field_values('id', str)
+        )
+
+    async def test_release_finishes_read_transaction(self, notification_factory, notification_crud):
+        await notification_factory.create_pipeline()
+        await notification_crud.paginate(Pagination())
+
+        await notification_crud.release()
+
+        assert notification_crud.session.in_transaction() is False
+
+    async def test_release_keeps_loaded_entries_readable(self, notification_factory, notification_crud):
+        created_notification = await notification_factory.create_pipeline()
+        received_notification = await notification_crud.retrieve_by_id(created_notification.id)
+
+        await notification_crud.release()
+
+        assert received_notification.id == created_notification.id
+        assert received_notification.created_at == created_notification.created_at
+        assert received_notification.recipient_username == created_notification.recipient_username
+
+    async def test_count_unread_returns_cap_and_capped_mode_when_unread_notifications_exceed_cap(
+        self, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        await notification_factory.bulk_create_pipeline(3, recipient_username=username)
+        filtering = UserNotificationFiltering(recipient_username=username, project_code_any=set())
+
+        total, total_mode = await notification_crud.count_unread(filtering, cap=2)
+
+        assert total == 2
+        assert total_mode is TotalMode.CAPPED
+
+    async def test_mark_as_read_skips_notifications_outside_of_user_feed(self, notification_factory, notification_crud):
+        username = notification_factory.generate_username()
+        feed_notification = await notification_factory.create_role_change(recipient_username=username)
+        other_user_notification = await notification_factory.create_role_change()
+        filtering = UserNotificationFiltering(recipient_username=username, project_code_any=set())
+
+        await notification_crud.mark_as_read(filtering, [feed_notification.id, other_user_notification.id])
+
+        read_ids = await notification_crud.session.scalars(
+            select(NotificationRead.notification_id).where(NotificationRead.username == username)
+        )
+        assert read_ids.all() == [feed_notification.id]
+
+    async def test_mark_all_as_read_keeps_read_marker_when_moved_backwards(
+        self, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        await notification_factory.create_pipeline(
+            recipient_username=username, created_at=datetime.now(timezone.utc) - timedelta(days=1)
+        )
+        filtering = UserNotificationFiltering(recipient_username=username, project_code_any=set())
+
+        await notification_crud.mark_all_as_read(username)
+        await notification_crud.mark_all_as_read(username, datetime.now(timezone.utc) - timedelta(days=2))
+        total, _ = await notification_crud.count_unread(filtering, cap=10)
+
+        assert total == 0
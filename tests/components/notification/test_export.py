@@ -0,0 +1,35 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import AsyncIterator
+
+from notification.components.notification.export import iter_csv
+from notification.components.notification.export import iter_ndjson
+
+
+async def iterate(*chunks: list) -> AsyncIterator[list]:
+    for chunk in chunks:
+        yield chunk
+
+
+class TestIterNDJSON:
+    async def test_iter_ndjson_yields_one_line_per_document_for_each_chunk(self):
+        received_chunks = [chunk async for chunk in iter_ndjson(iterate(['{"a": 1}', '{"b": 2}'], ['{"c": 3}']))]
+
+        assert received_chunks == [b'{"a": 1}\n{"b": 2}\n', b'{"c": 3}\n']
+
+
+class TestIterCSV:
+    async def test_iter_csv_yields_header_before_chunks_of_rows(self):
+        chunks = iterate([('1', None, '{"a": "b, c"}')], [('2', 'x', '{}')])
+
+        received_chunks = [chunk async for chunk in iter_csv(('id', 'name', 'data'), chunks)]
+
+        assert received_chunks == [
+            b'id,name,data\r\n',
+            b'1,,"{""a"": ""b, c""}"\r\n',
+            b'2,x,{}\r\n',
+        ]
@@ -0,0 +1,38 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+
+from notification.components.notification.filtering import NotificationFiltering
+from notification.components.notification.filtering import UserNotificationFiltering
+from notification.components.notification.models import Notification
+from notification.components.pagination import CountStrategy
+
+
+class TestNotificationFiltering:
+    @pytest.mark.parametrize(
+        'parameters,expected_count_strategy',
+        [
+            ({}, CountStrategy.SEPARATE),
+            ({'project_code_any': {'code'}}, CountStrategy.SEPARATE),
+            ({'recipient_username': 'username'}, CountStrategy.WINDOW),
+        ],
+    )
+    def test_get_count_strategy_returns_window_strategy_only_for_filtering_by_recipient(
+        self, parameters, expected_count_strategy
+    ):
+        filtering = NotificationFiltering(**parameters)
+
+        assert filtering.get_count_strategy() is expected_count_strategy
+
+
+class TestUserNotificationFiltering:
+    def test_get_branches_returns_one_condition_per_group_of_accessible_notifications(self):
+        filtering = UserNotificationFiltering(recipient_username='username', project_code_any={'code'})
+
+        branches = filtering.get_branches(Notification)
+
+        assert len(branches) == 3
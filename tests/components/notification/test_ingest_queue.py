@@ -0,0 +1,95 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+from sqlalchemy.exc import DataError
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from notification.components.exceptions import IngestQueueFull
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.ingest_queue import NotificationIngestQueue
+
+
+class TestNotificationIngestQueue:
+    async def test_stop_writes_all_queued_entries_into_database(
+        self, ingest_queue, notification_factory, notification_crud
+    ):
+        await ingest_queue.start()
+
+        ingest_queue.put([notification_factory.generate_pipeline() for _ in range(3)])
+        await ingest_queue.stop()
+
+        created_entries = await notification_crud.list()
+        assert len(created_entries) == 3
+        assert ingest_queue.get_metrics()['flushed_entries'] == 3
+        assert ingest_queue.depth == 0
+
+    async def test_put_raises_ingest_queue_full_and_queues_nothing_when_there_is_not_enough_space(
+        self, ingest_queue, notification_factory
+    ):
+        with pytest.raises(IngestQueueFull):
+            ingest_queue.put([notification_factory.generate_pipeline() for _ in range(4)])
+
+        assert ingest_queue.depth == 0
+
+    async def test_put_queues_entries_without_limit_when_max_size_is_zero(self, db_uri, notification_factory):
+        ingest_queue = NotificationIngestQueue(
+            create_async_engine(db_uri),
+            max_size=0,
+            batch_size=2,
+            flush_interval=0.01,
+            chunk_size=10,
+            copy_threshold=100,
+        )
+
+        ingest_queue.put([notification_factory.generate_pipeline() for _ in range(10)])
+
+        assert ingest_queue.depth == 10
+        await ingest_queue.engine.dispose()
+
+    async def test_flush_retries_batch_which_failed_because_of_connection_error(
+        self, mocker, ingest_queue, notification_factory, notification_crud
+    ):
+        ingest = NotificationCRUD.ingest
+        calls = []
+
+        async def fail_first_ingest(crud, entries_create, **kwds):
+            calls.append(entries_create)
+            if len(calls) == 1:
+                raise OperationalError('INSERT', {}, ConnectionResetError())
+            await ingest(crud, entries_create, **kwds)
+
+        mocker.patch.object(NotificationCRUD, 'ingest', fail_first_ingest)
+        await ingest_queue.start()
+
+        ingest_queue.put([notification_factory.generate_pipeline() for _ in range(2)])
+        await ingest_queue.stop()
+
+        assert len(await notification_crud.list()) == 2
+        assert ingest_queue.get_metrics()['retries'] == 1
+        assert ingest_queue.get_metrics()['failed_entries'] == 0
+
+    async def test_flush_drops_only_entries_rejected_by_database(
+        self, mocker, ingest_queue, notification_factory, notification_crud
+    ):
+        entries = [notification_factory.generate_pipeline() for _ in range(2)]
+        ingest = NotificationCRUD.ingest
+
+        async def reject_first_entry(crud, entries_create, **kwds):
+            if entries[0] in entries_create:
+                raise DataError('INSERT', {}, ValueError())
+            await ingest(crud, entries_create, **kwds)
+
+        mocker.patch.object(NotificationCRUD, 'ingest', reject_first_entry)
+        await ingest_queue.start()
+
+        ingest_queue.put(entries)
+        await ingest_queue.stop()
+
+        created_entries = await notification_crud.list()
+        assert created_entries.get_field_values('recipient_username') == [entries[1].recipient_username]
+        assert ingest_queue.get_metrics()['failed_entries'] == 1
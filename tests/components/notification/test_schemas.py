@@ -4,6 +4,7 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import json
 from datetime import datetime
 from typing import Annotated
 from uuid import UUID
@@ -20,6 +21,7 @@ from notification.components.notification.schemas import KeyField
 from notification.components.notification.schemas import MaintenanceNotificationCreateSchema
 from notification.components.notification.schemas import NotificationCreateSchema
 from notification.components.notification.schemas import PipelineNotificationCreateSchema
+from notification.components.notification.schemas import set_idempotency_keys
 
 
 class TestNotificationCreateSchema:
@@ -39,6 +41,7 @@ class TestNotificationCreateSchema:
         expected_dict = {
             'type': schema.type.value,
             'recipient_username': schema.recipient_username,
+            'idempotency_key': None,
             'data': {
                 'some_id': str(schema.some_id),
                 'some_date': schema.some_date.isoformat(),
@@ -49,6 +52,38 @@ class TestNotificationCreateSchema:
 
         assert received_dict == expected_dict
 
+    def test_dict_returns_same_values_as_json_serialisation_for_all_notification_types(self, notification_factory):
+        for schema in notification_factory.generate_all_available():
+            expected_obj = json.loads(schema.json())
+
+            received_dict = schema.dict()
+
+            assert received_dict.pop('data') | received_dict == expected_obj
+
+    def test_get_key_fields_returns_fields_annotated_with_key_field(self):
+        received_fields = PipelineNotificationCreateSchema.get_key_fields()
+
+        assert received_fields == {'type', 'recipient_username', 'project_code', 'idempotency_key'}
+
+
+class TestSetIdempotencyKeys:
+    def test_sets_key_as_is_for_single_entry(self, notification_factory):
+        entries = [notification_factory.generate_project()]
+
+        received_entries = set_idempotency_keys(entries, 'key', is_batch=False)
+
+        assert received_entries[0].idempotency_key == 'key'
+
+    def test_sets_key_suffixed_with_position_for_batch_entries_without_own_key(self, notification_factory):
+        entries = [
+            notification_factory.generate_project(),
+            notification_factory.generate_project().copy(update={'idempotency_key': 'own'}),
+        ]
+
+        received_entries = set_idempotency_keys(entries, 'key', is_batch=True)
+
+        assert [entry.idempotency_key for entry in received_entries] == ['key:0', 'own']
+
 
 class TestPipelineNotificationCreateSchema:
     def test_destination_field_raises_value_error_for_none_value_when_action_is_copy(self, notification_factory):
@@ -158,6 +193,14 @@ class TestCopyRequestNotificationCreateSchema:
 
 
 class TestMaintenanceNotificationCreateSchema:
+    def test_dict_returns_announcement_id_outside_of_data(self, notification_factory):
+        schema = notification_factory.generate_maintenance()
+
+        received_dict = schema.dict()
+
+        assert received_dict['announcement_id'] == str(schema.announcement_id)
+        assert 'announcement_id' not in received_dict['data']
+
     def test_effective_date_field_raises_value_error_when_date_is_not_offset_aware(self, fake):
         with pytest.raises(ValueError, match='ensure this date is offset-aware'):
             MaintenanceNotificationCreateSchema(
@@ -0,0 +1,123 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import pytest
+
+from notification.components.exceptions import InvalidCursor
+from notification.components.notification.cache import MAINTENANCE_FEED
+from notification.components.notification.cache import get_user_feed
+from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.filtering import UserNotificationFiltering
+from notification.components.notification.stream import HEARTBEAT
+from notification.components.notification.stream import NotificationEvent
+from notification.components.notification.stream import NotificationSubscription
+from notification.components.notification.stream import decode_last_event_id
+from notification.components.notification.stream import iter_sse
+from notification.components.notification.stream import iter_user_events
+from notification.components.pagination import Cursor
+
+
+class TestNotificationSubscription:
+    async def test_put_closes_subscription_when_queue_is_full(self, notification_factory):
+        event = NotificationEvent(await notification_factory.create_role_change())
+        subscription = NotificationSubscription(['feed'], max_size=1)
+
+        subscription.put(event)
+        subscription.put(event)
+
+        assert subscription.closed is True
+        assert subscription.queue.get_nowait() is None
+
+
+class TestNotificationStream:
+    async def test_created_notification_is_delivered_only_to_subscriptions_of_feeds_including_it(
+        self, notification_stream, notification_factory, db_session
+    ):
+        username = notification_factory.generate_username()
+        subscription = notification_stream.subscribe([get_user_feed(username), MAINTENANCE_FEED])
+        other_subscription = notification_stream.subscribe([get_user_feed(notification_factory.generate_username())])
+        notification_crud = NotificationCRUD(db_session, notify_channel=notification_stream.channel)
+
+        entry = await notification_crud.create(notification_factory.generate_role_change(recipient_username=username))
+        await notification_crud.commit()
+
+        event = await asyncio.wait_for(subscription.queue.get(), 5)
+
+        assert event.entry_id == entry.id
+        assert event.sse == NotificationEvent(entry).sse
+        assert other_subscription.queue.empty()
+
+    async def test_iter_events_yields_resumed_events_and_skips_live_events_repeating_them(
+        self, notification_stream, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        resumed_entry = await notification_factory.create_role_change(recipient_username=username)
+        live_entry = await notification_factory.create_role_change(recipient_username=username)
+        subscription = notification_stream.subscribe([get_user_feed(username)])
+        subscription.put(NotificationEvent(resumed_entry))
+        subscription.put(NotificationEvent(live_entry))
+
+        events = notification_stream.iter_events(subscription, resumed_entries=[resumed_entry], heartbeat_interval=0.01)
+        received_events = [await events.__anext__() for _ in range(4)]
+        await events.aclose()
+
+        received_ids = [event and event.entry_id for event in received_events]
+
+        assert received_ids == [None, resumed_entry.id, live_entry.id, None]
+        assert notification_stream.subscribers == 0
+
+
+class TestIterUserEvents:
+    async def test_subscribes_only_when_iteration_starts_and_unsubscribes_when_closed(
+        self, notification_stream, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        resumed_entry = await notification_factory.create_role_change(recipient_username=username)
+        filtering = UserNotificationFiltering(recipient_username=username, project_code_any=set())
+        cursor = Cursor(created_at=resumed_entry.created_at - timedelta(seconds=1), id=resumed_entry.id)
+
+        events = iter_user_events(
+            notification_stream, notification_crud, filtering, cursor, resume_limit=10, heartbeat_interval=0.01
+        )
+
+        assert notification_stream.subscribers == 0
+
+        received_events = [await events.__anext__() for _ in range(2)]
+
+        assert notification_stream.subscribers == 1
+
+        await events.aclose()
+
+        assert [event and event.entry_id for event in received_events] == [None, resumed_entry.id]
+        assert notification_stream.subscribers == 0
+        assert not notification_stream.subscriptions
+
+
+class TestDecodeLastEventId:
+    def test_raises_invalid_cursor_when_last_event_id_cannot_be_decoded(self):
+        with pytest.raises(InvalidCursor):
+            decode_last_event_id('invalid')
+
+    def test_returns_none_when_client_is_not_resuming(self):
+        assert decode_last_event_id(None) is None
+
+
+class TestIterSSE:
+    async def test_converts_events_into_server_sent_events_and_heartbeat_comments(self, notification_factory):
+        event = NotificationEvent(await notification_factory.create_role_change())
+
+        async def generate_events() -> AsyncIterator[NotificationEvent | None]:
+            yield None
+            yield event
+
+        received_chunks = [chunk async for chunk in iter_sse(generate_events())]
+
+        assert received_chunks == [HEARTBEAT, event.sse]
+        assert event.sse.startswith(f'id: {event.event_id}\nevent: notification\n'.encode())
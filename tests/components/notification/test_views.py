@@ -4,6 +4,9 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import csv
+import io
+import json
 import random
 from datetime import datetime
 from datetime import timedelta
@@ -12,7 +15,11 @@ from enum import Enum
 
 import pytest
 
+from notification.components.notification.dependencies import get_notification_feed_cache
+from notification.components.notification.dependencies import get_notification_ingest_queue
 from notification.components.notification.parameters import NotificationSortByFields
+from notification.components.query_budget import QueryBudget
+from notification.components.query_budget import get_request_query_budget
 from notification.components.sorting import SortingOrder
 
 
@@ -64,6 +71,19 @@ class TestNotificationViews:
         assert len(received_notification_ids) == expected_count
         assert received_total == items_number
 
+    async def test_list_notifications_returns_no_total_when_total_mode_is_none(self, client, jq, notification_factory):
+        await notification_factory.bulk_create_pipeline(2)
+
+        response = await client.get('/v1/all/notifications/', params={'total_mode': 'none'})
+
+        assert response.status_code == 200
+
+        body = jq(response)
+        assert body('.total').first() is None
+        assert body('.num_of_pages').first() is None
+        assert body('.total_mode').first() == 'none'
+        assert len(body('.result[].id').all()) == 2
+
     @pytest.mark.parametrize('sort_by', NotificationSortByFields.values())
     @pytest.mark.parametrize('sort_order', SortingOrder.values())
     async def test_list_notifications_returns_results_sorted_by_field_with_proper_order(
@@ -124,6 +144,72 @@ class TestNotificationViews:
         assert set(received_project_codes) == set(project_codes)
         assert received_total == 2
 
+    async def test_export_notifications_returns_ndjson_line_for_each_notification_matching_filters(
+        self, client, notification_factory
+    ):
+        created_notifications = await notification_factory.bulk_create_project(3)
+        await notification_factory.create_pipeline()
+
+        response = await client.get('/v1/all/notifications/export', params={'type': 'project'})
+
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == 'application/x-ndjson'
+
+        received_ids = [json.loads(line)['id'] for line in response.text.splitlines()]
+
+        assert sorted(received_ids) == sorted(created_notifications.get_field_values('id', str))
+
+    async def test_export_notifications_returns_csv_with_header_and_row_for_each_notification(
+        self, client, notification_factory
+    ):
+        created_notification = await notification_factory.create_maintenance()
+
+        response = await client.get('/v1/all/notifications/export', params={'format': 'csv'})
+
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith('text/csv')
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+
+        assert len(rows) == 1
+        assert rows[0]['id'] == str(created_notification.id)
+        assert rows[0]['announcement_id'] == str(created_notification.announcement_id)
+        assert rows[0]['recipient_username'] == ''
+        assert json.loads(rows[0]['data'])['message'] == created_notification.message
+
+    async def test_list_notifications_returns_same_response_when_notifications_are_serialised_by_database(
+        self, client, mocker, settings, notification_factory
+    ):
+        await notification_factory.create_all_available()
+        expected_response = await client.get('/v1/all/notifications/', params={'sort_by': 'created_at'})
+
+        mocker.patch.object(settings, 'NOTIFICATIONS_LIST_SERIALISED_BY_DB', True)
+        received_response = await client.get('/v1/all/notifications/', params={'sort_by': 'created_at'})
+
+        assert received_response.status_code == 200
+        assert received_response.json() == expected_response.json()
+
+    async def test_list_notifications_returns_server_timing_header_with_executed_statements(
+        self, client, notification_factory
+    ):
+        await notification_factory.bulk_create_pipeline(2)
+
+        response = await client.get('/v1/all/notifications/')
+
+        assert response.status_code == 200
+        assert response.headers['Server-Timing'].startswith('db;dur=')
+
+    async def test_list_notifications_returns_504_when_statement_runs_longer_than_timeout(
+        self, client, override_dependencies, notification_factory
+    ):
+        await notification_factory.bulk_create_pipeline(2)
+
+        with override_dependencies({get_request_query_budget: lambda: QueryBudget(statement_timeout=1e-6)}):
+            response = await client.get('/v1/all/notifications/')
+
+        assert response.status_code == 504
+        assert response.json()['error']['code'] == 'global.query_timeout'
+
     async def test_list_notifications_returns_list_of_notifications_filtered_by_created_at_parameters(
         self, client, jq, fake, notification_factory
     ):
@@ -194,6 +280,169 @@ class TestNotificationViews:
             ('generate_maintenance', 'effective_date'),
         ],
     )
+    async def test_list_notifications_by_cursor_returns_all_notifications_page_by_page(
+        self, client, jq, notification_factory
+    ):
+        created_notifications = await notification_factory.bulk_create_pipeline(5)
+
+        received_ids = []
+        params = {'page_size': 2}
+        while True:
+            response = await client.get('/v1/all/notifications/cursor', params=params)
+            assert response.status_code == 200
+
+            body = jq(response)
+            received_ids.extend(body('.result[].id').all())
+            next_cursor = body('.next_cursor').first()
+            if next_cursor is None:
+                break
+            params['cursor'] = next_cursor
+
+        assert sorted(received_ids) == sorted(created_notifications.get_field_values('id', str))
+
+    async def test_list_user_notifications_by_cursor_returns_notifications_available_for_user(
+        self, client, jq, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        created_notification = await notification_factory.create_role_change(recipient_username=username)
+        await notification_factory.create_role_change()
+
+        response = await client.get(
+            '/v1/all/notifications/user/cursor', params={'recipient_username': username, 'project_code_any': ''}
+        )
+
+        assert response.status_code == 200
+
+        body = jq(response)
+        assert body('.result[].id').all() == [str(created_notification.id)]
+        assert body('.next_cursor').first() is None
+
+    async def test_list_notifications_by_cursor_returns_bad_request_for_malformed_cursor(self, client):
+        response = await client.get('/v1/all/notifications/cursor', params={'cursor': 'invalid'})
+
+        assert response.status_code == 400
+
+    async def test_stream_user_notifications_returns_service_unavailable_when_stream_is_disabled(self, client):
+        response = await client.get(
+            '/v1/all/notifications/user/stream', params={'recipient_username': 'user', 'project_code_any': ''}
+        )
+
+        assert response.status_code == 503
+        assert response.json()['error']['code'] == 'global.stream_unavailable'
+
+    async def test_count_unread_user_notifications_excludes_notifications_marked_as_read(
+        self, client, jq, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        created_notifications = await notification_factory.bulk_create_pipeline(3, recipient_username=username)
+        params = {'recipient_username': username, 'project_code_any': ''}
+
+        response = await client.post(
+            '/v1/all/notifications/user/read',
+            json={'recipient_username': username, 'notification_ids': [str(created_notifications[0].id)]},
+        )
+        assert response.status_code == 204
+
+        response = await client.get('/v1/all/notifications/user/unread-count', params=params)
+
+        assert response.status_code == 200
+
+        body = jq(response)
+        assert body('.total').first() == 2
+        assert body('.total_mode').first() == 'exact'
+
+    async def test_count_unread_user_notifications_returns_zero_after_marking_all_notifications_as_read(
+        self, client, jq, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        await notification_factory.create_role_change(recipient_username=username)
+        await notification_factory.create_maintenance()
+        params = {'recipient_username': username, 'project_code_any': ''}
+
+        response = await client.post('/v1/all/notifications/user/read-all', json={'recipient_username': username})
+        assert response.status_code == 204
+
+        response = await client.get('/v1/all/notifications/user/unread-count', params=params)
+
+        assert jq(response)('.total').first() == 0
+
+    async def test_list_user_notifications_returns_only_unread_notifications_when_unread_parameter_is_set(
+        self, client, jq, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        read_notification = await notification_factory.create_role_change(recipient_username=username)
+        unread_notification = await notification_factory.create_role_change(recipient_username=username)
+        await client.post(
+            '/v1/all/notifications/user/read',
+            json={'recipient_username': username, 'notification_ids': [str(read_notification.id)]},
+        )
+
+        response = await client.get(
+            '/v1/all/notifications/user',
+            params={'recipient_username': username, 'project_code_any': '', 'unread': True},
+        )
+
+        assert jq(response)('.result[].id').all() == [str(unread_notification.id)]
+
+    async def test_list_user_notifications_returns_not_modified_until_user_feed_is_changed(
+        self, client, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        params = {'recipient_username': username, 'project_code_any': ''}
+        await notification_factory.create_role_change(recipient_username=username)
+        response = await client.get('/v1/all/notifications/user', params=params)
+        headers = {'If-None-Match': response.headers['ETag']}
+
+        not_modified_response = await client.get('/v1/all/notifications/user', params=params, headers=headers)
+        other_page_response = await client.get(
+            '/v1/all/notifications/user', params=params | {'page': 1}, headers=headers
+        )
+        await notification_factory.create_role_change(recipient_username=username)
+        modified_response = await client.get('/v1/all/notifications/user', params=params, headers=headers)
+
+        assert not_modified_response.status_code == 304
+        assert other_page_response.status_code == 200
+        assert modified_response.status_code == 200
+
+    async def test_list_user_notifications_returns_cached_page_until_user_feed_is_changed(
+        self, client, jq, override_dependencies, feed_cache, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        params = {'recipient_username': username, 'project_code_any': ''}
+        created_notification = await notification_factory.create_role_change(recipient_username=username)
+
+        with override_dependencies({get_notification_feed_cache: lambda: feed_cache}):
+            first_response = await client.get('/v1/all/notifications/user', params=params)
+            second_response = await client.get('/v1/all/notifications/user', params=params)
+            payload = notification_factory.generate_role_change(recipient_username=username).to_payload()
+            await client.post('/v1/all/notifications/', json=payload)
+            third_response = await client.get('/v1/all/notifications/user', params=params)
+
+        assert first_response.content == second_response.content
+        assert jq(first_response)('.result[].id').all() == [str(created_notification.id)]
+        assert jq(third_response)('.total').first() == 2
+        assert feed_cache.get_metrics()['hits'] == 1
+
+    async def test_list_user_notifications_returns_current_page_with_etag_when_feeds_are_not_invalidated_yet(
+        self, client, jq, override_dependencies, feed_cache, notification_factory
+    ):
+        username = notification_factory.generate_username()
+        params = {'recipient_username': username, 'project_code_any': ''}
+        await notification_factory.create_role_change(recipient_username=username)
+
+        with override_dependencies({get_notification_feed_cache: lambda: feed_cache}):
+            first_response = await client.get('/v1/all/notifications/user', params=params)
+            # Notification is written by the factory without invalidating feeds of the cache.
+            await notification_factory.create_role_change(recipient_username=username)
+            second_response = await client.get('/v1/all/notifications/user', params=params)
+            third_response = await client.get(
+                '/v1/all/notifications/user', params=params, headers={'If-None-Match': second_response.headers['ETag']}
+            )
+
+        assert second_response.headers['ETag'] != first_response.headers['ETag']
+        assert jq(second_response)('.total').first() == 2
+        assert third_response.status_code == 304
+
     async def test_create_notification_creates_single_notification(
         self, factory_method, notification_field, client, notification_factory, notification_crud
     ):
@@ -267,3 +516,64 @@ class TestNotificationViews:
 
         received_notification_types = received_notifications.get_field_values('type')
         assert set(received_notification_types) == set(expected_notification_types)
+
+    async def test_create_notification_queues_notifications_when_ingest_queue_is_enabled(
+        self, client, override_dependencies, ingest_queue, notification_factory, notification_crud
+    ):
+        payload = [notification_factory.generate_pipeline().to_payload() for _ in range(2)]
+
+        await ingest_queue.start()
+        with override_dependencies({get_notification_ingest_queue: lambda: ingest_queue}):
+            response = await client.post('/v1/all/notifications/', json=payload)
+        await ingest_queue.stop()
+
+        assert response.status_code == 202
+
+        received_notifications = await notification_crud.list()
+        assert len(received_notifications) == 2
+
+    async def test_create_notification_returns_service_unavailable_when_ingest_queue_is_full(
+        self, client, override_dependencies, ingest_queue, notification_factory
+    ):
+        payload = [notification_factory.generate_pipeline().to_payload() for _ in range(4)]
+
+        with override_dependencies({get_notification_ingest_queue: lambda: ingest_queue}):
+            response = await client.post('/v1/all/notifications/', json=payload)
+
+        assert response.status_code == 503
+        assert response.json()['error']['code'] == 'global.ingest_queue_full'
+
+    async def test_create_notification_skips_notifications_repeated_with_same_idempotency_key_header(
+        self, client, notification_factory, notification_crud
+    ):
+        payload = [notification_factory.generate_pipeline().to_payload() for _ in range(2)]
+        headers = {'Idempotency-Key': notification_factory.fake.uuid4()}
+
+        for _ in range(2):
+            response = await client.post('/v1/all/notifications/', json=payload, headers=headers)
+            assert response.status_code == 204
+
+        received_notifications = await notification_crud.list()
+        assert len(received_notifications) == 2
+
+    async def test_create_notifications_from_ndjson_creates_valid_lines_and_reports_invalid_ones(
+        self, client, jq, notification_factory, notification_crud
+    ):
+        lines = [notification.json() for notification in notification_factory.generate_all_available()]
+        lines.insert(1, '{"type": "pipeline"}')
+        lines.insert(3, 'not json')
+        content = '\n'.join(lines)
+
+        response = await client.post(
+            '/v1/all/notifications/ndjson', content=content, headers={'Content-Type': 'application/x-ndjson'}
+        )
+
+        assert response.status_code == 200
+
+        body = jq(response)
+        assert body('.accepted').first() == 5
+        assert body('.rejected').first() == 2
+        assert body('[.errors[].line]').first() == [2, 4]
+
+        received_notifications = await notification_crud.list()
+        assert len(received_notifications) == 5
@@ -0,0 +1,40 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import json
+
+import pytest
+
+from notification.components.notification.filtering import UserNotificationFiltering
+from notification.components.notification.websocket import handle_message
+
+
+class TestHandleMessage:
+    async def test_read_message_marks_notifications_as_read_by_connected_user(
+        self, notification_factory, notification_crud
+    ):
+        username = notification_factory.generate_username()
+        read_notification = await notification_factory.create_role_change(recipient_username=username)
+        await notification_factory.create_role_change(recipient_username=username)
+        message = json.dumps({'type': 'read', 'notification_ids': [str(read_notification.id)]})
+        filtering = UserNotificationFiltering(recipient_username=username, project_code_any=set())
+
+        reply = await handle_message(notification_crud, filtering, message)
+
+        count, _ = await notification_crud.count_unread(filtering, 100)
+
+        assert reply.type == 'ack'
+        assert reply.request == 'read'
+        assert count == 1
+
+    @pytest.mark.parametrize('message', ['{"type": "read"', '{"type": "unknown"}', '{"type": "read", "ids": []}'])
+    async def test_returns_error_reply_for_invalid_message(self, message, notification_crud):
+        filtering = UserNotificationFiltering(recipient_username='username', project_code_any=set())
+
+        reply = await handle_message(notification_crud, filtering, message)
+
+        assert reply.type == 'error'
+        assert reply.details
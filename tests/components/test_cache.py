@@ -0,0 +1,149 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from typing import Any
+
+import pytest
+from redis.asyncio import Redis
+
+from notification.components.cache import LocalCacheBackend
+from notification.components.cache import RedisCacheBackend
+from notification.components.cache import VersionedCache
+
+
+class FakeRedisPipeline:
+    def __init__(self, client: 'FakeRedis') -> None:
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self) -> 'FakeRedisPipeline':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.commands = []
+
+    def incr(self, key: str) -> None:
+        self.commands.append(key)
+
+    async def execute(self) -> list[int]:
+        return [await self.client.incr(key) for key in self.commands]
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio.Redis used by the cache backend."""
+
+    def __init__(self) -> None:
+        self.values = {}
+        self.expirations = {}
+        self.closed = False
+
+    async def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: bytes, px: int) -> None:
+        self.values[key] = value
+        self.expirations[key] = px
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.values.get(key) for key in keys]
+
+    async def incr(self, key: str) -> int:
+        value = int(self.values.get(key, 0)) + 1
+        self.values[key] = str(value).encode()
+        return value
+
+    def pipeline(self, transaction: bool) -> FakeRedisPipeline:
+        return FakeRedisPipeline(self)
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def fake_redis(mocker) -> FakeRedis:
+    client = FakeRedis()
+    mocker.patch.object(Redis, 'from_url', return_value=client)
+    yield client
+
+
+class TestLocalCacheBackend:
+    async def test_get_returns_none_for_expired_value(self):
+        backend = LocalCacheBackend(max_bytes=1024)
+        await backend.set('key', b'value', ttl=0)
+
+        assert await backend.get('key') is None
+        assert backend.size == 0
+
+    async def test_set_evicts_least_recently_used_values_when_size_limit_is_reached(self):
+        backend = LocalCacheBackend(max_bytes=20)
+        await backend.set('a', b'123456789', ttl=60)
+        await backend.set('b', b'123456789', ttl=60)
+        await backend.get('a')
+
+        await backend.set('c', b'123456789', ttl=60)
+
+        assert await backend.get('a') == b'123456789'
+        assert await backend.get('b') is None
+        assert await backend.get('c') == b'123456789'
+        assert backend.get_metrics()['evictions'] == 1
+
+    async def test_set_skips_value_larger_than_size_limit(self):
+        backend = LocalCacheBackend(max_bytes=10)
+
+        await backend.set('key', b'1234567890', ttl=60)
+
+        assert await backend.get('key') is None
+        assert backend.size == 0
+
+
+class TestRedisCacheBackend:
+    async def test_set_stores_value_with_ttl_in_milliseconds(self, fake_redis):
+        backend = RedisCacheBackend('redis://localhost:6379/0')
+
+        await backend.set('key', b'value', ttl=1.5)
+
+        assert await backend.get('key') == b'value'
+        assert fake_redis.expirations['key'] == 1500
+
+    async def test_get_counters_returns_zero_for_missing_counters_after_incrementing_others(self, fake_redis):
+        backend = RedisCacheBackend('redis://localhost:6379/0')
+
+        await backend.increment_counters(['a', 'a', 'b'])
+
+        assert await backend.get_counters(['a', 'b', 'c']) == [2, 1, 0]
+
+    async def test_close_closes_client(self, fake_redis):
+        backend = RedisCacheBackend('redis://localhost:6379/0')
+
+        await backend.close()
+
+        assert fake_redis.closed is True
+
+
+class TestVersionedCache:
+    async def test_invalidate_changes_key_of_values_depending_on_invalidated_dependency(self):
+        cache = VersionedCache(LocalCacheBackend(max_bytes=1024), namespace='test', ttl=60)
+        key = await cache.get_key({'page': 0}, ['user:a', 'maintenance'])
+        unrelated_key = await cache.get_key({'page': 0}, ['user:b', 'maintenance'])
+        await cache.set(key, b'value')
+
+        await cache.invalidate(['user:a'])
+
+        assert await cache.get_key({'page': 0}, ['user:a', 'maintenance']) != key
+        assert await cache.get_key({'page': 0}, ['user:b', 'maintenance']) == unrelated_key
+
+    async def test_get_metrics_returns_hit_ratio(self):
+        cache = VersionedCache(LocalCacheBackend(max_bytes=1024), namespace='test', ttl=60)
+        await cache.set('key', b'value')
+
+        await cache.get('key')
+        await cache.get('missing')
+
+        metrics = cache.get_metrics()
+
+        assert metrics['hits'] == 1
+        assert metrics['misses'] == 1
+        assert metrics['hit_ratio'] == 0.5
@@ -0,0 +1,29 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+
+from notification.components.etag import create_etag
+from notification.components.etag import is_not_modified
+
+
+class TestIsNotModified:
+    @pytest.mark.parametrize(
+        'if_none_match,expected_result',
+        [
+            (None, False),
+            ('"other"', False),
+            ('*', True),
+            ('"other", {etag}', True),
+            ('W/{etag}', True),
+        ],
+    )
+    def test_returns_whether_etag_matches_any_tag_from_header(self, if_none_match, expected_result):
+        etag = create_etag('page=0', 1)
+        if if_none_match:
+            if_none_match = if_none_match.format(etag=etag)
+
+        assert is_not_modified(if_none_match, etag) is expected_result
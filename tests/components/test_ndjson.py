@@ -0,0 +1,32 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import AsyncIterator
+
+import pytest
+
+from notification.components.ndjson import iter_lines
+
+
+async def generate_chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+class TestIterLines:
+    @pytest.mark.parametrize(
+        'chunks,expected_lines',
+        [
+            ((b'{"a": 1}\n{"b"', b': 2}\n'), [b'{"a": 1}', b'{"b": 2}']),
+            ((b'{"a": 1}', b'\n', b'{"b": 2}'), [b'{"a": 1}', b'{"b": 2}']),
+            ((b'\n\n',), [b'', b'']),
+            ((), []),
+        ],
+    )
+    async def test_returns_lines_split_regardless_of_chunk_boundaries(self, chunks, expected_lines):
+        received_lines = [line async for line in iter_lines(generate_chunks(*chunks))]
+
+        assert received_lines == expected_lines
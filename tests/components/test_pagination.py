@@ -4,8 +4,15 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from notification.components.pagination import Cursor
 from notification.components.pagination import Page
 from notification.components.pagination import Pagination
+from notification.components.pagination import TotalMode
 
 
 class TestPagination:
@@ -30,3 +37,26 @@ class TestPage:
         pagination = Pagination(page_size=2)
         page = Page(pagination=pagination, count=2, entries=[])
         assert page.total_pages == 1
+
+    def test_total_pages_returns_none_when_count_is_unknown(self):
+        pagination = Pagination(page_size=2, total_mode=TotalMode.NONE)
+        page = Page(pagination=pagination, count=None, total_mode=TotalMode.NONE, entries=[])
+        assert page.total_pages is None
+
+
+class TestCursor:
+    def test_decode_returns_cursor_equal_to_encoded_one(self, fake):
+        cursor = Cursor(created_at=fake.date_time(tzinfo=timezone.utc), id=fake.uuid4(cast_to=None))
+
+        assert Cursor.decode(cursor.encode()) == cursor
+
+    def test_decode_keeps_microseconds_of_created_at(self, fake):
+        created_at = datetime(2022, 1, 1, 0, 0, 0, 123456, tzinfo=timezone.utc)
+        cursor = Cursor(created_at=created_at, id=fake.uuid4(cast_to=None))
+
+        assert Cursor.decode(cursor.encode()).created_at == created_at
+
+    @pytest.mark.parametrize('value', ['', 'invalid', 'aW52YWxpZA==', 'MjAyMi0wMS0wMXxpbnZhbGlk'])
+    def test_decode_raises_value_error_for_malformed_value(self, value):
+        with pytest.raises(ValueError, match='Invalid cursor'):
+            Cursor.decode(value)
@@ -5,8 +5,14 @@
 # You may not use this file except in compliance with the License.
 
 import inspect
+from datetime import timezone
 
+import pytest
+
+from notification.components.exceptions import InvalidCursor
+from notification.components.pagination import Cursor
 from notification.components.pagination import Pagination
+from notification.components.parameters import CursorPageParameters
 from notification.components.parameters import PageParameters
 from notification.components.parameters import SortByFields
 from notification.components.parameters import SortParameters
@@ -25,6 +31,23 @@ class TestPageParameters:
         assert pagination.page_size == page_size
 
 
+class TestCursorPageParameters:
+    def test_to_pagination_returns_cursor_pagination_with_decoded_cursor(self, fake):
+        cursor = Cursor(created_at=fake.date_time(tzinfo=timezone.utc), id=fake.uuid4(cast_to=None))
+        page_parameters = CursorPageParameters(page_size=10, cursor=cursor.encode())
+
+        pagination = page_parameters.to_pagination()
+
+        assert pagination.cursor == cursor
+        assert pagination.page_size == 10
+
+    def test_to_pagination_raises_invalid_cursor_for_malformed_cursor(self):
+        page_parameters = CursorPageParameters(cursor='invalid')
+
+        with pytest.raises(InvalidCursor):
+            page_parameters.to_pagination()
+
+
 class TestSortParameters:
     def test_with_sort_by_fields_returns_a_class_with_overridden_type_annotation_for_sort_by_field(self):
         class CustomSortByFields(SortByFields):
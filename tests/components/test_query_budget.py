@@ -0,0 +1,137 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from notification.components.exceptions import QueryBudgetExceeded
+from notification.components.exceptions import QueryCancelled
+from notification.components.exceptions import QueryTimeout
+from notification.components.query_budget import QueryBudget
+from notification.components.query_budget import get_query_budget
+from notification.components.query_budget import get_request_query_budget
+from notification.config import Settings
+
+
+async def run_statement(duration: float = 0) -> str:
+    await asyncio.sleep(duration)
+    return 'result'
+
+
+def create_request(method: str, received_messages: list) -> Request:
+    async def receive():
+        received_messages.append('message')
+        await asyncio.sleep(1)
+        return {'type': 'http.disconnect'}
+
+    scope = {'type': 'http', 'method': method, 'path': '/', 'headers': [], 'query_string': b''}
+
+    return Request(scope, receive)
+
+
+class TestQueryBudget:
+    async def test_run_returns_statement_result_and_accounts_it(self):
+        budget = QueryBudget(statement_timeout=1)
+
+        received_result = await budget.run(run_statement())
+
+        assert received_result == 'result'
+        assert budget.queries == 1
+        assert budget.query_time > 0
+
+    async def test_run_raises_query_timeout_when_statement_runs_longer_than_timeout(self):
+        budget = QueryBudget(statement_timeout=0.01)
+
+        with pytest.raises(QueryTimeout):
+            await budget.run(run_statement(1))
+
+    async def test_run_raises_query_timeout_when_total_query_time_is_spent(self):
+        budget = QueryBudget(statement_timeout=1, max_query_time=0.01)
+        with pytest.raises(QueryTimeout):
+            await budget.run(run_statement(1))
+
+        with pytest.raises(QueryTimeout):
+            await budget.run(run_statement())
+
+        assert budget.queries == 1
+
+    async def test_run_raises_query_budget_exceeded_when_number_of_queries_is_reached(self):
+        budget = QueryBudget(statement_timeout=1, max_queries=2)
+        await budget.run(run_statement())
+        await budget.run(run_statement())
+
+        with pytest.raises(QueryBudgetExceeded):
+            await budget.run(run_statement())
+
+    async def test_run_does_not_limit_queries_when_limits_are_disabled(self):
+        budget = QueryBudget(statement_timeout=0, max_queries=0, max_query_time=0)
+
+        for _ in range(100):
+            await budget.run(run_statement())
+
+        assert budget.get_timeout() is None
+
+    async def test_cancel_cancels_in_flight_statement_and_refuses_further_statements(self):
+        budget = QueryBudget(statement_timeout=1)
+        statement = asyncio.create_task(budget.run(run_statement(1)))
+        await asyncio.sleep(0)
+
+        budget.cancel()
+
+        with pytest.raises(QueryCancelled):
+            await statement
+        with pytest.raises(QueryCancelled):
+            await budget.run(run_statement())
+
+    async def test_cancel_on_disconnect_cancels_budget_when_client_disconnects(self):
+        budget = QueryBudget(statement_timeout=1)
+        messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}, {'type': 'http.disconnect'}])
+
+        async def receive():
+            return next(messages)
+
+        await budget.cancel_on_disconnect(receive)
+
+        assert budget.cancelled is True
+
+
+class TestGetQueryBudget:
+    async def test_returns_budget_with_route_limits_and_defaults_from_settings(self):
+        settings = Settings()
+        request = create_request('POST', [])
+        query_budgets = get_query_budget(max_queries=0)(request, settings)
+
+        budget = await query_budgets.__anext__()
+        await query_budgets.aclose()
+
+        assert budget.max_queries == 0
+        assert budget.statement_timeout == settings.RDS_STATEMENT_TIMEOUT
+        assert await get_request_query_budget(request) is budget
+
+    async def test_get_request_query_budget_returns_none_when_route_declares_no_budget(self):
+        assert await get_request_query_budget(create_request('GET', [])) is None
+
+    @pytest.mark.parametrize(
+        'method,streaming,expected_messages',
+        [
+            ('GET', False, 1),
+            ('POST', False, 0),
+            ('GET', True, 0),
+        ],
+    )
+    async def test_watches_disconnect_only_for_requests_without_body_and_not_streaming_response(
+        self, method, streaming, expected_messages
+    ):
+        received_messages = []
+        query_budgets = get_query_budget(streaming=streaming)(create_request(method, received_messages), Settings())
+
+        await query_budgets.__anext__()
+        await asyncio.sleep(0)
+        await query_budgets.aclose()
+
+        assert len(received_messages) == expected_messages
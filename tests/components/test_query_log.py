@@ -0,0 +1,61 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import logging
+
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy import literal
+from sqlalchemy.future import select
+
+from notification.components.notification.models import Notification
+from notification.components.notification.models import NotificationType
+from notification.components.query_log import SlowQueryLog
+
+
+class TestSlowQueryLog:
+    async def test_capture_logs_statement_with_parameters_and_execution_plan_in_background(self, db_engine, caplog):
+        slow_query_log = SlowQueryLog(db_engine, threshold=0, interval=60, explain_timeout=10)
+        statement = select(literal('value'))
+
+        with caplog.at_level(logging.WARNING):
+            slow_query_log.capture(statement, None, 1.5)
+            await slow_query_log.explainer
+
+        assert 'Slow query took 1500.0 ms' in caplog.text
+        assert "'param_1': 'value'" in caplog.text
+        assert '"Actual Total Time"' in caplog.text
+        assert slow_query_log.captured == 1
+
+    async def test_capture_skips_statements_within_interval_and_reports_them_with_next_capture(self, db_engine, caplog):
+        slow_query_log = SlowQueryLog(db_engine, threshold=0, interval=60, explain_timeout=10)
+        statement = select(literal(1))
+
+        slow_query_log.capture(statement, None, 1)
+        slow_query_log.capture(statement, None, 1)
+        slow_query_log.capture(statement, None, 1)
+        await slow_query_log.explainer
+
+        assert slow_query_log.get_metrics() == {'threshold': 0, 'captured': 1, 'skipped': 2}
+
+        slow_query_log.last_captured_at -= 60
+        with caplog.at_level(logging.WARNING):
+            slow_query_log.capture(statement, None, 1)
+            await slow_query_log.explainer
+
+        assert '2 slow queries skipped since the last capture' in caplog.text
+
+    async def test_capture_explains_data_modifying_statement_without_executing_it(self, db_engine, db_session, caplog):
+        slow_query_log = SlowQueryLog(db_engine, threshold=0, interval=60, explain_timeout=10)
+        statement = insert(Notification).values(type=NotificationType.PIPELINE, data={})
+
+        with caplog.at_level(logging.WARNING):
+            slow_query_log.capture(statement, None, 1)
+            await slow_query_log.explainer
+
+        assert '"Plan"' in caplog.text
+        assert '"Actual Total Time"' not in caplog.text
+        assert await db_session.scalar(select(func.count()).select_from(Notification)) == 0
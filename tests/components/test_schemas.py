@@ -4,13 +4,19 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import json
+from datetime import datetime
+from datetime import timezone
 from typing import Annotated
+from uuid import UUID
 
 import pytest
 from pydantic import BaseModel
 
 from notification.components.schemas import BaseSchema
 from notification.components.schemas import ParentOptionalFields
+from notification.components.schemas import to_json_compatible
+from notification.components.types import StrEnum
 
 
 class TestParentOptionalFields:
@@ -58,3 +64,30 @@ class TestBaseSchema:
         received_fields = CustomSchema.get_fields_annotated_with(CustomType)
 
         assert received_fields == ['field2']
+
+
+class TestToJsonCompatible:
+    def test_returns_same_values_as_model_json_serialisation(self):
+        class CustomEnum(StrEnum):
+            VALUE = 'value'
+
+        class NestedModel(BaseModel):
+            id: UUID
+            created_at: datetime
+
+        class CustomModel(BaseModel):
+            enum: CustomEnum
+            nested: list[NestedModel]
+            optional: NestedModel | None
+            names: set[str]
+
+        model = CustomModel(
+            enum=CustomEnum.VALUE,
+            nested=[NestedModel(id=UUID(int=1), created_at=datetime(2023, 1, 1, tzinfo=timezone.utc))],
+            optional=None,
+            names={'name'},
+        )
+
+        received_value = to_json_compatible(model)
+
+        assert received_value == json.loads(model.json())
@@ -0,0 +1,39 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from httpx import AsyncClient
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from notification.components.query_budget import QueryBudget
+from notification.components.server_timing import ServerTimingMiddleware
+
+
+def create_app(query_budget: QueryBudget | None) -> ServerTimingMiddleware:
+    async def app(scope, receive, send):
+        if query_budget:
+            Request(scope).state.query_budget = query_budget
+        await PlainTextResponse('ok')(scope, receive, send)
+
+    return ServerTimingMiddleware(app)
+
+
+class TestServerTimingMiddleware:
+    async def test_adds_header_with_duration_and_number_of_statements_executed_for_request(self):
+        query_budget = QueryBudget(statement_timeout=1)
+        query_budget.queries = 3
+        query_budget.query_time = 0.0125
+
+        async with AsyncClient(app=create_app(query_budget), base_url='http://notification') as client:
+            response = await client.get('/')
+
+        assert response.headers['Server-Timing'] == 'db;dur=12.5;desc="3 queries"'
+
+    async def test_does_not_add_header_when_request_has_no_query_budget(self):
+        async with AsyncClient(app=create_app(None), base_url='http://notification') as client:
+            response = await client.get('/')
+
+        assert 'Server-Timing' not in response.headers
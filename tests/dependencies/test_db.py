@@ -0,0 +1,98 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from notification.dependencies.db import GetDBEngine
+from notification.dependencies.db import StatementCacheCounters
+from notification.dependencies.db import create_db_engine
+
+
+class TestGetDBEngine:
+    async def test_start_opens_warm_up_connections_up_to_pool_size(self, settings):
+        settings = settings.copy(update={'RDS_POOL_SIZE': 3, 'RDS_POOL_WARM_UP_CONNECTIONS': 10})
+        get_db_engine = GetDBEngine()
+
+        await get_db_engine.start(settings)
+        try:
+            pool = get_db_engine.instance.sync_engine.pool
+
+            assert pool.checkedin() == 3
+            assert pool.checkedout() == 0
+        finally:
+            await get_db_engine.stop()
+
+        assert get_db_engine.instance is None
+        assert get_db_engine.statement_cache_counters is None
+
+    async def test_call_creates_instance_when_engine_is_not_started(self, settings):
+        get_db_engine = GetDBEngine()
+
+        engine = await get_db_engine(settings)
+
+        assert await get_db_engine(settings) is engine
+        assert engine.sync_engine.pool.checkedin() == 0
+
+        await get_db_engine.stop()
+
+
+class TestStatementCacheCounters:
+    async def test_get_metrics_counts_hits_of_repeated_statement(self, settings):
+        engine = create_db_engine(settings.copy(update={'RDS_POOL_SIZE': 1}))
+        counters = StatementCacheCounters(engine)
+
+        try:
+            for value in (1, 2):
+                async with engine.connect() as connection:
+                    await connection.execute(select(value))
+        finally:
+            counters.close()
+            await engine.dispose()
+
+        metrics = counters.get_metrics()
+
+        assert metrics['compiled_hits'] == 1
+        assert metrics['prepared_hits'] == 1
+        assert metrics['prepared_hit_ratio'] == 0.5
+
+    async def test_get_metrics_counts_no_prepared_statements_when_prepared_statement_cache_is_disabled(self, settings):
+        engine = create_db_engine(settings.copy(update={'RDS_POOL_SIZE': 1, 'RDS_PREPARED_STATEMENT_CACHE_SIZE': 0}))
+        counters = StatementCacheCounters(engine)
+
+        try:
+            for value in (1, 2):
+                async with engine.connect() as connection:
+                    await connection.execute(select(value))
+        finally:
+            counters.close()
+            await engine.dispose()
+
+        metrics = counters.get_metrics()
+
+        assert metrics['compiled_hits'] == 1
+        assert metrics['prepared_hits'] == 0
+        assert metrics['prepared_misses'] == 0
+
+    async def test_get_metrics_counts_no_prepared_statements_when_driver_cache_is_not_available(self):
+        engine = create_async_engine('postgresql+asyncpg://user@localhost/notification')
+        counters = StatementCacheCounters(engine)
+        dialect = engine.sync_engine.dialect
+        connection = SimpleNamespace(connection=SimpleNamespace(dbapi_connection=object()))
+        context = SimpleNamespace(cache_hit=dialect.CACHE_HIT, dialect=dialect)
+
+        try:
+            counters._on_execute(connection, object(), 'SELECT %s', (1,), context, False)
+        finally:
+            counters.close()
+
+        metrics = counters.get_metrics()
+
+        assert metrics['compiled_hits'] == 1
+        assert metrics['prepared_hits'] == 0
+        assert metrics['prepared_misses'] == 0
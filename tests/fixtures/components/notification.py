@@ -4,19 +4,24 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+import asyncio
 import random
 from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
 
+from notification.components.cache import LocalCacheBackend
 from notification.components.models import ModelList
 from notification.components.notification import CopyRequestNotification
 from notification.components.notification import PipelineNotification
 from notification.components.notification import ProjectNotification
 from notification.components.notification import RoleChangeNotification
+from notification.components.notification.cache import NotificationFeedCache
 from notification.components.notification.crud import NotificationCRUD
+from notification.components.notification.ingest_queue import NotificationIngestQueue
 from notification.components.notification.models import CopyRequestAction
 from notification.components.notification.models import InvolvementType
 from notification.components.notification.models import Location
@@ -32,6 +37,7 @@ from notification.components.notification.schemas import NotificationCreateSchem
 from notification.components.notification.schemas import PipelineNotificationCreateSchema
 from notification.components.notification.schemas import ProjectNotificationCreateSchema
 from notification.components.notification.schemas import RoleChangeNotificationCreateSchema
+from notification.components.notification.stream import NotificationStream
 from tests.fixtures.components._base_factory import BaseFactory
 
 
@@ -529,3 +535,30 @@ async def notification_factory(notification_crud, fake) -> NotificationFactory:
     notification_factory = NotificationFactory(notification_crud, fake)
     yield notification_factory
     await notification_factory.truncate_table()
+
+
+@pytest.fixture
+async def ingest_queue(db_uri) -> NotificationIngestQueue:
+    engine = create_async_engine(db_uri)
+    ingest_queue = NotificationIngestQueue(
+        engine, max_size=3, batch_size=2, flush_interval=0.01, chunk_size=10, copy_threshold=100, retry_backoff=0.01
+    )
+    yield ingest_queue
+    await engine.dispose()
+
+
+@pytest.fixture
+def feed_cache() -> NotificationFeedCache:
+    yield NotificationFeedCache(LocalCacheBackend(max_bytes=1024**2), namespace='test', ttl=60)
+
+
+@pytest.fixture
+async def notification_stream(db_uri) -> NotificationStream:
+    engine = create_async_engine(db_uri)
+    notification_stream = NotificationStream(engine, channel='test_notifications_created', queue_size=2)
+    await notification_stream.start()
+    while not notification_stream.listening:
+        await asyncio.sleep(0.01)
+    yield notification_stream
+    await notification_stream.stop()
+    await engine.dispose()
@@ -11,6 +11,7 @@ from pathlib import Path
 import pytest
 from alembic.command import upgrade
 from alembic.config import Config
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 from testcontainers.postgres import PostgresContainer
@@ -41,6 +42,16 @@ def db_uri(get_service_image, project_root) -> str:
         yield postgres_uri.replace('+psycopg2', '+asyncpg')
 
 
+@pytest.fixture
+async def db_engine(db_uri) -> AsyncEngine:
+    db_engine = create_async_engine(db_uri)
+
+    try:
+        yield db_engine
+    finally:
+        await db_engine.dispose()
+
+
 @pytest.fixture
 async def db_session(db_uri) -> AsyncSession:
     db_engine = create_async_engine(db_uri)